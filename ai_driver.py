@@ -0,0 +1,87 @@
+"""
+What an AI does every time it thinks, in game (AICar) and in the headless
+races (simulate.py) alike.
+
+An AI finds where it is on the track's racing line, steers at a point further
+along it, moved over to get round the cars ahead (avoidance.py), and slows
+down for its corners. Then the track's fixes from its spec brake or turn it at
+the places the line alone doesn't get round. An AI that falls below or flies
+above the track is put back on it, and one that hasn't moved since the last
+stuck check is nudged free.
+
+Works on the AI's slot in a vehicle batch. Doesn't use Ursina.
+"""
+import math
+
+from avoidance import avoidance_offset, OFFSET_RESPONSE
+
+# AI outside these heights are put back on the track
+RESET_BELOW = -100
+RESET_ABOVE = 100
+
+# Stuck checks: the first one after 5 seconds, then every second
+STUCK_FIRST_CHECK = 5
+STUCK_INTERVAL = 1
+STUCK_DISTANCE = 2
+
+def drive(vehicles, i, line, line_index, avoid_offset, fixes, dt, grid = None, me = None, speeds = ()):
+    """
+    Steers AI i of a vehicle batch along the racing line for dt seconds
+
+    line_index: the sample of the line the AI was nearest to
+    avoid_offset: how far to the right of the line it was driving to get round other cars
+    fixes: the track spec's AI fixes
+    grid, me, speeds: the spatial hash of the racing cars, the AI's index in it
+        and the speed of every car in it; without them the AI doesn't avoid anyone
+
+    Returns the new line_index and avoid_offset, and whether the AI left the
+    track and has to be reset.
+    """
+    x = vehicles.x[i]
+    z = vehicles.z[i]
+    line_index = line.track(line_index, x, z)
+
+    # Move over to get round the cars ahead
+    if me is not None:
+        offset = avoidance_offset(grid, me, vehicles.rotation_y[i], vehicles.speed[i], speeds)
+        avoid_offset += (offset - avoid_offset) * min(OFFSET_RESPONSE * dt, 1)
+    vehicles.target_rotation_y[i] = line.steer(line_index, x, z, vehicles.rotation_y[i], vehicles.speed[i], avoid_offset)
+    vehicles.target_speed[i] = line.target_speed(line_index)
+
+    # Track specific fixes
+    position = (x, vehicles.y[i], z)
+    for fix in fixes:
+        if math.dist(position, fix["point"]) < fix["radius"]:
+            if "brake" in fix:
+                vehicles.speed[i] -= fix["brake"] * dt
+            if "rotation_y" in fix:
+                vehicles.rotation_y[i] = vehicles.pivot_rotation_y[i] = fix["rotation_y"]
+
+    off_track = vehicles.y[i] <= RESET_BELOW or vehicles.y[i] >= RESET_ABOVE
+    return line_index, avoid_offset, off_track
+
+def unstick(vehicles, i, old_position, rng, dt):
+    """
+    Moves AI i of a vehicle batch randomly up and to the side if it's still
+    where it was at the last stuck check, so it doesn't get stuck on things
+
+    Returns the position to compare with at the next check and whether the AI was stuck.
+    """
+    position = (vehicles.x[i], vehicles.y[i], vehicles.z[i])
+    stuck = math.dist(position, old_position) <= STUCK_DISTANCE
+    if stuck:
+        vehicles.x[i] += rng.randint(-10, 10) * dt
+        vehicles.y[i] += 40 * dt
+        vehicles.z[i] += rng.randint(-10, 10) * dt
+    return tuple(round(value) for value in position), stuck
+
+def reset_position(position, spread, rng):
+    """
+    Where a reset AI is put back, spread out so reset AI don't land on each other
+    """
+    x, y, z = position
+    if spread:
+        x += rng.randint(-5, 5)
+        y += rng.randint(-3, 5)
+        z += rng.randint(-5, 5)
+    return x, y, z
@@ -0,0 +1,68 @@
+"""
+The pool of AI cars.
+
+Every AI a race can use is made once when the game starts, and races only
+enable, disable and move them, so starting a race doesn't build Entities.
+How many are made is "ai_pool" in settings.json.
+
+The AI that race line up on the starting grid (starting_grid.py).
+"""
+import os
+import json
+
+from objfile import GAME_FOLDER
+from starting_grid import grid_slots
+from ai import AICar
+
+SETTINGS_PATH = os.path.join(GAME_FOLDER, "settings.json")
+
+# Most AI a race can have, and how many are made without a setting
+MAX_AI = 32
+DEFAULT_AI_POOL = 16
+
+def ai_pool_size():
+    """
+    How many AI to make, from settings.json
+    """
+    try:
+        with open(SETTINGS_PATH, "r") as settings:
+            size = int(json.load(settings).get("ai_pool", DEFAULT_AI_POOL))
+    except (OSError, ValueError, TypeError, AttributeError):
+        # No settings, or settings that aren't an object or whose "ai_pool" isn't a number
+        size = DEFAULT_AI_POOL
+    return max(1, min(size, MAX_AI))
+
+def create_ai_pool(car, batch, size = None):
+    """
+    Makes every AI up front, disabled, and returns them in a list
+    """
+    ai_list = []
+    for i in range(ai_pool_size() if size is None else size):
+        ai_list.append(AICar(car, ai_list, batch))
+    return ai_list
+
+def set_ai_count(ai_list, count):
+    """
+    Picks how many of the pool race
+    """
+    for i, ai in enumerate(ai_list):
+        ai.set_enabled = i < count
+
+def spawn_ai(ai_list, track):
+    """
+    Lines up the AI that race on the grid of a track with new cars, and disables the rest
+    """
+    racing = [ai for ai in ai_list if ai.set_enabled]
+    slots, rotations = grid_slots(track.racing_line, track.grid_position, track.grid_rotation_y, len(racing))
+    for ai in ai_list:
+        ai.disable()
+    for ai, slot, rotation in zip(racing, slots, rotations):
+        ai.enable()
+        ai.position = tuple(slot)
+        ai.rotation = (0, rotation, 0)
+        ai.set_random_car()
+        ai.set_random_texture()
+        ai.racing_line = None
+        ai.speed = 0
+        ai.velocity_y = 0
+        ai.current_track = track
@@ -0,0 +1,256 @@
+"""
+Shared audio for every car.
+
+Ursina's Audio is an Entity per sound that searches the asset folders for its
+file whenever the clip changes, and passes every volume or pitch write to the
+mixer. The AudioManager owns a fixed pool of voices instead. Cars ask it for
+Sounds, which only hold the clip, volume and pitch they want. Once a frame the
+manager gives the voices to the loudest sounds that want to play (a far away
+AI engine gives its voice up to a closer one) and only passes volume and pitch
+on when they moved more than a threshold.
+
+Every clip file is looked up once and every voice loads it at most once.
+Panda keeps the decoded samples of a file cached, so a clip playing on several
+voices is decoded once too.
+"""
+from ursina import *
+from panda3d.core import Filename, AudioSound
+import profiler
+
+# Voices playing at the same time
+VOICES = 16
+
+# Changes smaller than these aren't sent to the mixer
+VOLUME_THRESHOLD = 0.01
+PITCH_THRESHOLD = 0.01
+
+# Sounds at an entity are at full volume up to NEAR_DISTANCE and silent from FAR_DISTANCE
+NEAR_DISTANCE = 10
+FAR_DISTANCE = 120
+
+# Found clip files, by name
+_paths = {}
+
+def clip_path(name):
+    """
+    The file of a clip, searched for the way Ursina's Audio does it (None if there is none)
+    """
+    if name in _paths:
+        return _paths[name]
+
+    file_types = ("",) if "." in name else (".ogg", ".wav")
+    path = None
+    for folder in (application.asset_folder, application.internal_audio_folder):
+        for suffix in file_types:
+            for f in folder.glob(f"**/{name}{suffix}"):
+                path = Filename.fromOsSpecific(str(f.resolve()))
+                break
+            if path:
+                break
+        if path:
+            break
+
+    if path is None:
+        print("no audio found with name:", name)
+    _paths[name] = path
+    return path
+
+class Sound:
+    """
+    A clip a car wants to hear, at an entity or everywhere
+    """
+    def __init__(self, manager, clip, loop = False, volume = 1, pitch = 1, emitter = None, priority = 0):
+        self.manager = manager
+        self._clip = clip
+        self.loop = loop
+        self.volume = volume
+        self.pitch = pitch
+        self.emitter = emitter
+        self.priority = priority
+        self.voice = None
+        self.wants_playing = False
+
+    @property
+    def clip(self):
+        return self._clip
+
+    @clip.setter
+    def clip(self, value):
+        if value == self._clip:
+            return
+        self._clip = value
+        if self.voice:
+            self.voice.start(self, self.manager.gain(self))
+
+    @property
+    def playing(self):
+        return self.wants_playing
+
+    def play(self):
+        self.wants_playing = True
+        if self.voice:
+            self.voice.start(self, self.manager.gain(self))
+        elif not self.loop:
+            # One-shots can't wait for the next frame, they play now or not at all
+            self.wants_playing = self.manager.start(self)
+
+    def stop(self):
+        self.wants_playing = False
+        if self.voice:
+            self.voice.release()
+
+class Voice:
+    """
+    One sound the mixer can play at a time
+    """
+    def __init__(self):
+        self.sounds = {}
+        self.sound = None
+        self.owner = None
+        self.volume = None
+        self.pitch = None
+
+    def start(self, owner, volume):
+        """
+        Plays the owner's clip from the start
+        """
+        if self.sound:
+            self.sound.stop()
+        self.owner = owner
+        owner.voice = self
+
+        sound = self.sounds.get(owner.clip)
+        if sound is None and owner.clip not in self.sounds:
+            path = clip_path(owner.clip)
+            sound = loader.loadSfx(path) if path else None
+            self.sounds[owner.clip] = sound
+        self.sound = sound
+        if sound is None:
+            return
+
+        self.volume = None
+        self.pitch = None
+        self.apply(volume, owner.pitch)
+        sound.setLoop(owner.loop)
+        sound.setTime(0)
+        sound.play()
+
+    def apply(self, volume, pitch):
+        """
+        Sends volume and pitch to the mixer if they changed by more than the thresholds
+        """
+        if self.sound is None:
+            return
+        volume = max(volume, 0)
+        if self.volume is None or abs(volume - self.volume) > VOLUME_THRESHOLD:
+            self.volume = volume
+            self.sound.setVolume(volume * Audio.volume_multiplier)
+        if self.pitch is None or abs(pitch - self.pitch) > PITCH_THRESHOLD:
+            self.pitch = pitch
+            self.sound.setPlayRate(pitch)
+
+    @property
+    def finished(self):
+        return self.sound is None or self.sound.status() != AudioSound.PLAYING
+
+    def release(self):
+        if self.sound:
+            self.sound.stop()
+        if self.owner:
+            self.owner.voice = None
+        self.owner = None
+        self.sound = None
+
+class AudioManager(Entity):
+    """
+    Shares a fixed pool of voices between every Sound
+    """
+    def __init__(self, voices = VOICES, listener = None):
+        super().__init__()
+
+        self.voices = [Voice() for i in range(voices)]
+        self.sounds = []
+        self.listener = listener if listener else camera
+        self.volume = 1
+
+    def sound(self, clip, loop = False, volume = 1, pitch = 1, emitter = None, priority = 0):
+        """
+        A new Sound; loud sounds and sounds with a higher priority get voices first
+        """
+        sound = Sound(self, clip, loop, volume, pitch, emitter, priority)
+        self.sounds.append(sound)
+        return sound
+
+    def remove(self, sound):
+        sound.stop()
+        if sound in self.sounds:
+            self.sounds.remove(sound)
+
+    def gain(self, sound):
+        """
+        How loud a sound would be at the listener
+        """
+        volume = max(sound.volume, 0) * self.volume
+        emitter = sound.emitter
+        if emitter is None or volume == 0:
+            return volume
+        if not emitter.enabled:
+            return 0
+        d = distance(emitter.world_position, self.listener.world_position)
+        if d <= NEAR_DISTANCE:
+            return volume
+        if d >= FAR_DISTANCE:
+            return 0
+        return volume * (FAR_DISTANCE - d) / (FAR_DISTANCE - NEAR_DISTANCE)
+
+    def start(self, sound):
+        """
+        Gives a sound a voice right away, taking it from the quietest sound if they are all used.
+        Returns whether it got one.
+        """
+        gain = self.gain(sound)
+        voice = next((voice for voice in self.voices if voice.owner is None), None)
+        if voice is None:
+            voice = min(self.voices, key = lambda voice: (voice.owner.priority, self.gain(voice.owner)))
+            if (voice.owner.priority, self.gain(voice.owner)) > (sound.priority, gain):
+                return False
+            voice.release()
+        voice.start(sound, gain)
+        return True
+
+    def update(self):
+        profiler.section("audio")
+
+        # Finished one-shots give their voices back
+        for voice in self.voices:
+            if voice.owner and not voice.owner.loop and voice.finished:
+                voice.owner.wants_playing = False
+                voice.release()
+
+        # The loudest sounds that want to play get the voices
+        wanted = []
+        for sound in self.sounds:
+            if sound.wants_playing:
+                if not sound.loop and sound.voice is None:
+                    sound.wants_playing = False
+                    continue
+                gain = self.gain(sound)
+                if gain > 0 or (sound.emitter is None and sound.voice):
+                    wanted.append((sound.priority, gain, sound))
+        wanted.sort(key = lambda item: (item[0], item[1]), reverse = True)
+        wanted = wanted[:len(self.voices)]
+        keep = {id(sound) for priority, gain, sound in wanted}
+
+        # Steal the voices of the ones that didn't make it
+        for voice in self.voices:
+            if voice.owner and id(voice.owner) not in keep:
+                voice.release()
+
+        free = [voice for voice in self.voices if voice.owner is None]
+        for priority, gain, sound in wanted:
+            if sound.voice is None and free:
+                free.pop().start(sound, gain)
+            if sound.voice:
+                sound.voice.apply(gain, sound.pitch)
+
+        profiler.end()
@@ -0,0 +1,50 @@
+"""
+How far an AI moves off the racing line to get round the cars in front of it.
+
+An AI looks at the cars the spatial hash finds near it. Every car ahead of it
+and close to its path pushes it to the other side, more the closer the car is,
+and the pushes add up to an offset across the racing line that the AI aims
+along instead of the line itself. A car it is catching is passed; a car pulling
+away is left alone.
+
+Doesn't use Ursina.
+"""
+import math
+
+# How far ahead the AI looks for cars, and how far to the side a car is still in its way
+AVOID_DISTANCE = 14
+AVOID_WIDTH = 3.5
+
+# Most the AI moves off the line
+MAX_OFFSET = 5
+
+# Cars faster than the AI by more than this aren't in its way for long
+CLOSING_SPEED = 2
+
+# How quickly the AI moves over to a new offset, per second
+OFFSET_RESPONSE = 3
+
+def avoidance_offset(grid, me, rotation_y, speed, speeds):
+    """
+    The offset to the right of the racing line (negative is left) that takes
+    car me of the spatial hash grid round the cars ahead of it
+    """
+    x = grid.x[me]
+    z = grid.z[me]
+    heading = math.radians(rotation_y)
+    forward_x, forward_z = math.sin(heading), math.cos(heading)
+
+    offset = 0
+    for other in grid.near(x, z, AVOID_DISTANCE):
+        if other == me or speeds[other] > speed + CLOSING_SPEED:
+            continue
+        dx = grid.x[other] - x
+        dz = grid.z[other] - z
+        ahead = dx * forward_x + dz * forward_z
+        side = dx * forward_z - dz * forward_x
+        if ahead <= 0 or abs(side) >= AVOID_WIDTH:
+            continue
+        # Closer cars push harder, towards the side the other car isn't on
+        push = (AVOID_WIDTH - abs(side)) * (1 - ahead / AVOID_DISTANCE)
+        offset -= push if side >= 0 else -push
+    return max(-MAX_OFFSET, min(offset, MAX_OFFSET))
@@ -1,26 +1,68 @@
 from ursina import *
 from ursina import curve
 from particles import Particles, TrailRenderer
+from physics import CarState, CarInputs, FixedTimestep, TICK, TrackWorld, step
+from replay import Replay, ReplayError, ReplayRecorder, ReplayPlayer, replay_duration
+from ghost import Ghost, GhostRecorder
+import profiler
+from audio_manager import AudioManager
+from car_definitions import CAR_DEFINITIONS, HANDLING, car_definition
+from car_models import car_model, set_car_model
+from collision_layers import CARS, SOLID, layer_raycast, set_collision_layer
 import json
 
 sign = lambda x: -1 if x < 0 else (1 if x > 0 else 0)
 Text.default_resolution = 1080 * Text.size
 
+def state_property(name):
+    """
+    Exposes a value of the car's physics state as an attribute of the car
+    """
+    return property(lambda self: getattr(self.state, name), lambda self, value: setattr(self.state, name, value))
+
 class Car(Entity):
+    # Values that live in the physics state
+    speed = state_property("speed")
+    velocity_y = state_property("velocity_y")
+    rotation_speed = state_property("rotation_speed")
+    drift_speed = state_property("drift_speed")
+    topspeed = state_property("topspeed")
+    acceleration = state_property("acceleration")
+    braking_strenth = state_property("braking_strength")
+    friction = state_property("friction")
+    drift_amount = state_property("drift_amount")
+    turning_speed = state_property("turning_speed")
+    min_drift_speed = state_property("min_drift_speed")
+    max_drift_speed = state_property("max_drift_speed")
+    max_rotation_speed = state_property("max_rotation_speed")
+    steering_amount = state_property("steering_amount")
+    driving = state_property("driving")
+    braking = state_property("braking")
+    hitting_wall = state_property("hitting_wall")
+
     def __init__(self, position = (0, 0, 4), rotation = (0, 0, 0), topspeed = 30, acceleration = 0.35, braking_strength = 30, friction = 0.6, camera_speed = 8, drift_speed = 35):
         super().__init__(
-            model = "sports-car.obj",
+            model = car_model("sports"),
             texture = "sports-red.png",
             collider = "box",
             position = position,
             rotation = rotation,
         )
+        set_collision_layer(self, CARS)
 
         # Rotation parent
         self.rotation_parent = Entity()
 
         # Controls
         self.controls = "wasd"
+        self.inputs = CarInputs()
+
+        # Physics runs at a fixed tick, the car is drawn between the last two ticks
+        self.state = CarState(self.position, self.rotation_y)
+        self.previous_state = self.state.copy()
+        self.timestep = FixedTimestep()
+        self.world = RaycastWorld(self)
+        self.rendered_transform = None
 
         # Car's values
         self.speed = 0
@@ -38,7 +80,6 @@ class Car(Entity):
         self.turning_speed = 5
         self.max_drift_speed = 40
         self.min_drift_speed = 20
-        self.pivot_rotation_distance = 1
 
         # Camera Follow
         self.camera_angle = "top"
@@ -49,10 +90,7 @@ class Car(Entity):
         self.c_pivot = Entity()
         self.camera_pivot = Entity(parent = self.c_pivot, position = self.camera_offset)
 
-        # Pivot for drifting
-        self.pivot = Entity()
-        self.pivot.position = self.position
-        self.pivot.rotation = self.rotation
+        # Drifting
         self.drifting = False
 
         # Car Type
@@ -80,23 +118,20 @@ class Car(Entity):
         self.volume = 1
         self.start_sound = True
         self.start_fall = True
-        self.drive_sound = Audio("rally.mp3", loop = True, autoplay = False, volume = 0.5)
-        self.dirt_sound = Audio("dirt-skid.mp3", loop = True, autoplay = False, volume = 0.8)
-        self.skid_sound = Audio("skid.mp3", loop = True, autoplay = False, volume = 0.5)
-        self.hit_sound = Audio("hit.wav", autoplay = False, volume = 0.5)
-        self.drift_swush = Audio("unlock.mp3", autoplay = False, volume = 0.8)
+        # Every sound in the game shares the manager's voices, the player's come first
+        self.audio_manager = AudioManager()
+        self.drive_sound = self.audio_manager.sound("rally.mp3", loop = True, volume = 0.5, priority = 1)
+        self.dirt_sound = self.audio_manager.sound("dirt-skid.mp3", loop = True, volume = 0.8, priority = 1)
+        self.skid_sound = self.audio_manager.sound("skid.mp3", loop = True, volume = 0.5, priority = 1)
+        self.hit_sound = self.audio_manager.sound("hit.wav", volume = 0.5, priority = 1)
+        self.drift_swush = self.audio_manager.sound("unlock.mp3", volume = 0.8, priority = 1)
 
         # Collision
         self.copy_normals = False
-        self.hitting_wall = False
 
-        # Making tracks accessible in update
-        self.sand_track = None
-        self.grass_track = None
-        self.snow_track = None
-        self.forest_track = None
-        self.savannah_track = None
-        self.lake_track = None
+        # Every track, and the one enabled last (tracks/track.py sets it)
+        self.tracks = []
+        self.current_track = None
 
         # Cosmetics
         self.current_cosmetic = "none"
@@ -134,7 +169,6 @@ class Car(Entity):
         self.start_time = False
         self.laps = 0
         self.laps_hs = 0
-        self.anti_cheat = 1
 
         # Drift Gamemode
         self.drift_text = Text(text = "", origin = (0, 0), color = color.white, size = 0.05, scale = (1.1, 1.1), position = (0, 0.43), visible = False)
@@ -147,12 +181,9 @@ class Car(Entity):
         self.get_thousand = False
         self.get_fivethousand = False
 
-        # Bools
-        self.driving = False
-        self.braking = False
-
         self.ai = False
         self.ai_list = []
+        self.race_tracker = None
 
         # Multiplayer
         self.multiplayer = False
@@ -171,6 +202,23 @@ class Car(Entity):
         # Get highscore from json file
         path = os.path.dirname(sys.argv[0])
         self.highscore_path = os.path.join(path, "./highscore/highscore.json")
+
+        # Replays of the laps
+        self.replay_path = os.path.join(path, "./replays")
+        self.recorder = None
+        self.replay_car = None
+        # Picks the replay seeds without touching the random numbers the rest of the game uses
+        self.replay_random = random.Random()
+
+        # Ghost of the best lap
+        self.ghost_mode = True
+        self.ghost_path = os.path.join(path, "./ghosts")
+        self.ghost_recorder = GhostRecorder()
+        self.recording_ghost = False
+        self.ghost = None
+        self.ghost_name = None
+        self.ghost_time = 0.0
+        self.ghost_car = None
         
         try:
             with open(self.highscore_path, "r") as hs:
@@ -229,115 +277,41 @@ class Car(Entity):
         invoke(self.set_unlocked, delay = 1)
         invoke(self.update_model_path, delay = 3)
 
-    def sports_car(self):
-        self.car_type = "sports"
-        self.model = "sports-car.obj"
-        self.texture = "sports-red.png"
-        self.drive_sound.clip = "sports.mp3"
-        self.topspeed = 30
-        self.acceleration = 0.38
-        self.drift_amount = 5
-        self.turning_speed = 5
-        self.min_drift_speed = 18
-        self.max_drift_speed = 38
-        self.max_rotation_speed = 3
-        self.steering_amount = 8
-        self.particle_pivot.position = (0, -1, -1.5)
-        self.trail_pivot.position = (0, -1, 1.5)
+    def set_car(self, car_type):
+        """
+        Switches to a car type from cars.json
+        """
+        definition = car_definition(car_type)
+        self.car_type = car_type
+        set_car_model(self, car_type)
+        self.drive_sound.clip = definition["sound"]
+        for name in HANDLING:
+            setattr(self, name, definition[name])
+        self.particle_pivot.position = (0, -1, -definition["particle_offset"])
+        self.trail_pivot.position = (0, -1, definition["particle_offset"])
         for cosmetic in self.cosmetics:
-            cosmetic.y = 0
+            cosmetic.y = definition["cosmetic_y"]
+
+    def sports_car(self):
+        self.set_car("sports")
 
     def muscle_car(self):
-        self.car_type = "muscle"
-        self.model = "muscle-car.obj"
-        self.texture = "muscle-orange.png"
-        self.drive_sound.clip = "muscle.mp3"
-        self.topspeed = 38
-        self.acceleration = 0.32
-        self.drift_amount = 6
-        self.turning_speed = 10
-        self.min_drift_speed = 22
-        self.max_drift_speed = 40
-        self.max_rotation_speed = 3
-        self.steering_amount = 8.5
-        self.particle_pivot.position = (0, -1, -1.8)
-        self.trail_pivot.position = (0, -1, 1.8)
-        for cosmetic in self.cosmetics:
-            cosmetic.y = 0
+        self.set_car("muscle")
 
     def limo(self):
-        self.car_type = "limo"
-        self.model = "limousine.obj"
-        self.texture = "limo-black.png"
-        self.drive_sound.clip = "limo.mp3"
-        self.topspeed = 30
-        self.acceleration = 0.33
-        self.drift_amount = 5.5
-        self.turning_speed = 8
-        self.min_drift_speed = 20
-        self.max_drift_speed = 40
-        self.max_rotation_speed = 3
-        self.steering_amount = 8
-        self.particle_pivot.position = (0, -1, -3.5)
-        self.trail_pivot.position = (0, -1, 3.5)
-        for cosmetic in self.cosmetics:
-            cosmetic.y = 0.1
+        self.set_car("limo")
 
     def lorry(self):
-        self.car_type = "lorry"
-        self.model = "lorry.obj"
-        self.texture = "lorry-white.png"
-        self.drive_sound.clip = "lorry.mp3"
-        self.topspeed = 30
-        self.acceleration = 0.3
-        self.drift_amount = 7
-        self.turning_speed = 7
-        self.min_drift_speed = 20
-        self.max_drift_speed = 40
-        self.max_rotation_speed = 3
-        self.steering_amount = 7.5
-        self.particle_pivot.position = (0, -1, -3.5)
-        self.trail_pivot.position = (0, -1, 3.5)
-        for cosmetic in self.cosmetics:
-            cosmetic.y = 1.5
+        self.set_car("lorry")
 
     def hatchback(self):
-        self.car_type = "hatchback"
-        self.model = "hatchback.obj"
-        self.texture = "hatchback-green.png"
-        self.drive_sound.clip = "hatchback.mp3"
-        self.topspeed = 28
-        self.acceleration = 0.43
-        self.drift_amount = 6
-        self.turning_speed = 15
-        self.min_drift_speed = 20
-        self.max_drift_speed = 40
-        self.max_rotation_speed = 3
-        self.steering_amount = 8.5
-        self.particle_pivot.position = (0, -1, -1.5)
-        self.trail_pivot.position = (0, -1, 1.5)
-        for cosmetic in self.cosmetics:
-            cosmetic.y = 0.4
+        self.set_car("hatchback")
 
     def rally_car(self):
-        self.car_type = "rally"
-        self.model = "rally-car.obj"
-        self.texture = "rally-red.png"
-        self.drive_sound.clip = "rally.mp3"
-        self.topspeed = 34
-        self.acceleration = 0.46
-        self.drift_amount = 4
-        self.turning_speed = 7
-        self.min_drift_speed = 22
-        self.max_drift_speed = 40
-        self.max_rotation_speed = 3
-        self.steering_amount = 8.5
-        self.particle_pivot.position = (0, -1, -1.5)
-        self.trail_pivot.position = (0, -1, 1.5)
-        for cosmetic in self.cosmetics:
-            cosmetic.y = 0.3
+        self.set_car("rally")
 
     def update(self):
+        profiler.section("car.hud")
         # Stopwatch/Timer
         # Race Gamemode
         if self.gamemode == "race":
@@ -363,18 +337,9 @@ class Car(Entity):
 
                     self.laps = 0
 
-                    if self.sand_track.enabled:
-                        self.sand_track_laps = self.laps_hs
-                    elif self.grass_track.enabled:
-                        self.grass_track_laps = self.laps_hs
-                    elif self.snow_track.enabled:
-                        self.snow_track_laps = self.laps_hs
-                    elif self.forest_track.enabled:
-                        self.forest_track_laps = self.laps_hs
-                    elif self.savannah_track.enabled:
-                        self.savannah_track_laps = self.laps_hs
-                    elif self.lake_track.enabled:
-                        self.lake_track_laps = self.laps_hs
+                    track = self.active_track()
+                    if track is not None:
+                        setattr(self, f"{track.name}_laps", self.laps_hs)
 
                     self.start_time = False
 
@@ -430,11 +395,39 @@ class Car(Entity):
         else:
             self.reset_count_timer.text = str(int(self.reset_count))
 
+        profiler.section("car.username")
         # Read the username
         with open(self.username_path, "r") as username:
             self.username_text = username.read()
 
-        self.pivot.position = self.position
+        profiler.section("car.physics")
+        # Physics
+        self.sync_state()
+        if self.visible:
+            self.read_inputs()
+            if self.recorder is not None:
+                self.recorder.check(self.state)
+            for i in range(self.timestep.advance(time.dt)):
+                self.previous_state.copy_from(self.state)
+                if self.recorder is not None:
+                    self.recorder.record(self.inputs)
+                step(self.state, self.inputs, TICK, self.world)
+            if self.recorder is not None:
+                self.recorder.stepped(self.state)
+            self.interpolate()
+        else:
+            self.timestep.reset()
+        self.rendered_transform = (tuple(self.position), self.rotation_y)
+
+        profiler.section("car.ghost")
+        # Ghost
+        if self.ghost_mode:
+            self.update_ghost()
+
+        profiler.section("car.camera")
+        state = self.state
+        pivot_rotation_distance = state.pivot_rotation_distance
+
         self.c_pivot.position = self.position
         self.c_pivot.rotation_y = self.rotation_y
         self.camera_pivot.position = self.camera_offset
@@ -476,48 +469,14 @@ class Car(Entity):
                 camera.world_position = lerp(camera.world_position, self.world_position + (0.5, 0, 0), time.dt * 30)
                 camera.world_rotation = lerp(camera.world_rotation, self.world_rotation, time.dt * 30)
 
-        # The y rotation distance between the car and the pivot
-        self.pivot_rotation_distance = (self.rotation_y - self.pivot.rotation_y)
-
-        # Drifting
-        if self.pivot.rotation_y != self.rotation_y:
-            if self.pivot.rotation_y > self.rotation_y:
-                self.pivot.rotation_y -= (self.drift_speed * ((self.pivot.rotation_y - self.rotation_y) / 40)) * time.dt
-                if self.speed > 1 or self.speed < -1:
-                    self.speed += self.pivot_rotation_distance / self.drift_amount * time.dt
-                self.camera_rotation -= self.pivot_rotation_distance / 3 * time.dt
-                self.rotation_speed -= 1 * time.dt
-                if self.pivot_rotation_distance >= 50 or self.pivot_rotation_distance <= -50:
-                    self.drift_speed += self.pivot_rotation_distance / 5 * time.dt
-                else:
-                    self.drift_speed -= self.pivot_rotation_distance / 5 * time.dt
-            if self.pivot.rotation_y < self.rotation_y:
-                self.pivot.rotation_y += (self.drift_speed * ((self.rotation_y - self.pivot.rotation_y) / 40)) * time.dt
-                if self.speed > 1 or self.speed < -1:
-                    self.speed -= self.pivot_rotation_distance / self.drift_amount * time.dt
-                self.camera_rotation += self.pivot_rotation_distance / 3 * time.dt
-                self.rotation_speed += 1 * time.dt
-                if self.pivot_rotation_distance >= 50 or self.pivot_rotation_distance <= -50:
-                    self.drift_speed -= self.pivot_rotation_distance / 5 * time.dt
-                else:
-                    self.drift_speed += self.pivot_rotation_distance / 5 * time.dt
-
-        # Gravity
-        movementY = self.velocity_y / 50
-        direction = (0, sign(movementY), 0)
-
-        # Main raycast for collision
-        y_ray = raycast(origin = self.world_position, direction = (0, -1, 0), ignore = [self, ])
-
-        if y_ray.distance <= 5:
-            # Driving
-            if held_keys[self.controls[0]] or held_keys["up arrow"]:
-                self.speed += self.acceleration * 50 * time.dt
-                self.speed += -self.velocity_y * 4 * time.dt
+        # The camera tilts while drifting and accelerating
+        self.camera_rotation += abs(pivot_rotation_distance) / 3 * time.dt
 
+        if state.on_ground:
+            if state.driving:
                 self.camera_rotation -= self.acceleration * 30 * time.dt
-                self.driving = True
 
+                profiler.section("car.particles")
                 # Particles
                 self.particle_time += time.dt
                 if self.particle_time >= self.particle_amount:
@@ -525,10 +484,11 @@ class Car(Entity):
                     self.particles = Particles(self, self.particle_pivot.world_position - (0, 1, 0))
                     self.particles.destroy(1)
             
+                profiler.section("car.trails")
                 # TrailRenderer / Skid Marks
                 if self.graphics != "ultra fast":
                     if self.drift_speed <= self.min_drift_speed + 2 and self.start_trail:   
-                        if self.pivot_rotation_distance > 60 or self.pivot_rotation_distance < -60 and self.speed > 10:
+                        if pivot_rotation_distance > 60 or pivot_rotation_distance < -60 and self.speed > 10:
                             for trail in self.trails:
                                 trail.start_trail()
                             if self.audio:
@@ -539,33 +499,21 @@ class Car(Entity):
                         else:
                             self.drifting = False
                     elif self.drift_speed > self.min_drift_speed + 2 and not self.start_trail:
-                        if self.pivot_rotation_distance < 60 or self.pivot_rotation_distance > -60:
+                        if pivot_rotation_distance < 60 or pivot_rotation_distance > -60:
                             for trail in self.trails:
                                 if trail.trailing:
                                     trail.end_trail()
                             if self.audio:
-                                self.skid_sound.stop(False)
+                                self.skid_sound.stop()
                             self.start_trail = True
                             self.drifting = False
                         self.drifting = False
                     if self.speed < 10:
                         self.drifting = False
             else:
-                self.driving = False
-                if self.speed > 1:
-                    self.speed -= self.friction * 5 * time.dt
-                elif self.speed < -1:
-                    self.speed += self.friction * 5 * time.dt
                 self.camera_rotation += self.friction * 20 * time.dt
 
-            # Braking
-            if held_keys[self.controls[2] or held_keys["down arrow"]]:
-                self.speed -= self.braking_strenth * time.dt
-                self.drift_speed -= 20 * time.dt
-                self.braking = True
-            else:
-                self.braking = False
-
+            profiler.section("car.audio")
             # Audio
             if self.driving or self.braking:
                 if self.start_sound and self.audio:
@@ -582,86 +530,26 @@ class Car(Entity):
                 elif self.speed < 0:
                     self.drive_sound.volume = -self.speed / 80 * self.volume
 
-                if self.pivot_rotation_distance > 0:
-                    self.dirt_sound.volume = self.pivot_rotation_distance / 110 * self.volume
-                elif self.pivot_rotation_distance < 0:
-                    self.dirt_sound.volume = -self.pivot_rotation_distance / 110 * self.volume
+                if pivot_rotation_distance > 0:
+                    self.dirt_sound.volume = pivot_rotation_distance / 110 * self.volume
+                elif pivot_rotation_distance < 0:
+                    self.dirt_sound.volume = -pivot_rotation_distance / 110 * self.volume
             else:
                 self.drive_sound.volume -= 0.5 * time.dt
                 self.dirt_sound.volume -= 0.5 * time.dt
                 if self.skid_sound.playing:
-                    self.skid_sound.stop(False)
-
-            # Hand Braking
-            if held_keys["space"]:
-                if self.rotation_speed < 0:
-                    self.rotation_speed -= 3 * time.dt
-                elif self.rotation_speed > 0:
-                    self.rotation_speed += 3 * time.dt
-                self.drift_speed -= 40 * time.dt
-                self.speed -= 20 * time.dt
-                self.max_rotation_speed = 3.0
+                    self.skid_sound.stop()
 
+        profiler.section("car.trails")
         # If Car is not hitting the ground, stop the trail
         if self.graphics != "ultra fast":
-            if y_ray.distance > 2.5:
+            if state.ground_distance > 2.5:
                 if self.trail_renderer1.trailing:
                     for trail in self.trails:
                         trail.end_trail()
                     self.start_trail = True
 
-        # Steering
-        self.rotation_y += self.rotation_speed * 50 * time.dt
-
-        if self.rotation_speed > 0:
-            self.rotation_speed -= self.speed / 6 * time.dt
-        elif self.rotation_speed < 0:
-            self.rotation_speed += self.speed / 6 * time.dt
-
-        if self.speed > 1 or self.speed < -1:
-            if held_keys[self.controls[1]] or held_keys["left arrow"]:
-                self.rotation_speed -= self.steering_amount * time.dt
-                self.drift_speed -= 5 * time.dt
-                if self.speed > 1:
-                    self.speed -= self.turning_speed * time.dt
-                elif self.speed < 0:
-                    self.speed += self.turning_speed / 5 * time.dt
-            elif held_keys[self.controls[3]] or held_keys["right arrow"]:
-                self.rotation_speed += self.steering_amount * time.dt
-                self.drift_speed -= 5 * time.dt
-                if self.speed > 1:
-                    self.speed -= self.turning_speed * time.dt
-                elif self.speed < 0:
-                    self.speed += self.turning_speed / 5 * time.dt
-            else:
-                self.drift_speed += 15 * time.dt
-                if self.rotation_speed > 0:
-                    self.rotation_speed -= 5 * time.dt
-                elif self.rotation_speed < 0:
-                    self.rotation_speed += 5 * time.dt
-        else:
-            self.rotation_speed = 0
-
-        # Cap the speed
-        if self.speed >= self.topspeed:
-            self.speed = self.topspeed
-        if self.speed <= -15:
-            self.speed = -15
-        if self.speed <= 0:
-            self.pivot.rotation_y = self.rotation_y
-
-        # Cap the drifting
-        if self.drift_speed <= self.min_drift_speed:
-            self.drift_speed = self.min_drift_speed
-        if self.drift_speed >= self.max_drift_speed:
-            self.drift_speed = self.max_drift_speed
-
-        # Cap the steering
-        if self.rotation_speed >= self.max_rotation_speed:
-            self.rotation_speed = self.max_rotation_speed
-        if self.rotation_speed <= -self.max_rotation_speed:
-            self.rotation_speed = -self.max_rotation_speed
-
+        profiler.section("car.respawn")
         # Respawn
         if held_keys["g"]:
             self.reset_car()
@@ -674,6 +562,7 @@ class Car(Entity):
         if self.y >= 300:
             self.reset_car()
 
+        profiler.section("car.camera")
         # Cap the camera rotation
         if self.camera_rotation >= 40:
             self.camera_rotation = 40
@@ -683,10 +572,10 @@ class Car(Entity):
         # Camera Shake
         if self.speed >= 1 and self.driving:
             self.can_shake = True
-            if self.pivot_rotation_distance > 0:
-                self.shake_amount = self.speed * self.pivot_rotation_distance / 200
-            elif self.pivot_rotation_distance < 0:
-                self.shake_amount = self.speed * -self.pivot_rotation_distance / 200
+            if pivot_rotation_distance > 0:
+                self.shake_amount = self.speed * pivot_rotation_distance / 200
+            elif pivot_rotation_distance < 0:
+                self.shake_amount = self.speed * -pivot_rotation_distance / 200
         else:
             self.can_shake = False
 
@@ -700,33 +589,19 @@ class Car(Entity):
         if self.can_shake and self.camera_shake_option and self.camera_angle != "first-person":
             self.shake_camera()
 
+        profiler.section("car.tilt")
         # Rotation
         self.rotation_parent.position = self.position
 
-        # Lerps the car's rotation to the rotation parent's rotation (Makes it smoother)
-        self.rotation_x = lerp(self.rotation_x, self.rotation_parent.rotation_x, 20 * time.dt)
-        self.rotation_z = lerp(self.rotation_z, self.rotation_parent.rotation_z, 20 * time.dt)
-
-        # Check if car is hitting the ground
+        # Rotates the car according to the ground's normals
         if self.visible:
-            if y_ray.distance <= self.scale_y * 1.7 + abs(movementY):
-                self.velocity_y = 0
-                # Check if hitting a wall or steep slope
-                if y_ray.world_normal.y > 0.7 and y_ray.world_point.y - self.world_y < 0.5:
-                    # Set the y value to the ground's y value
-                    self.y = y_ray.world_point.y + 1.4
-                    self.hitting_wall = False
-                else:
-                    # Car is hitting a wall
-                    self.hitting_wall = True
-
+            if state.touching_ground:
                 if self.copy_normals:
-                    self.ground_normal = self.position + y_ray.world_normal
+                    self.ground_normal = self.position + state.ground_normal
                 else:
                     self.ground_normal = self.position + (0, 180, 0)
 
-                # Rotates the car according to the grounds normals
-                if not self.hitting_wall:
+                if not state.hitting_wall:
                     self.rotation_parent.look_at(self.ground_normal, axis = "up")
                     self.rotation_parent.rotate((0, self.rotation_y + 180, 0))
                 else:
@@ -737,56 +612,194 @@ class Car(Entity):
                     self.hit_sound.play()
                     self.start_fall = False
             else:
-                self.y += movementY * 50 * time.dt
-                self.velocity_y -= 50 * time.dt
                 self.rotation_parent.rotation = self.rotation
                 self.start_fall = True
 
-        # Movement
-        movementX = self.pivot.forward[0] * self.speed * time.dt
-        movementZ = self.pivot.forward[2] * self.speed * time.dt
+        # Lerps the car's rotation to the rotation parent's rotation (Makes it smoother)
+        self.rotation_x = lerp(self.rotation_x, self.rotation_parent.rotation_x, 20 * time.dt)
+        self.rotation_z = lerp(self.rotation_z, self.rotation_parent.rotation_z, 20 * time.dt)
+
+        profiler.end()
+
+    def read_inputs(self):
+        """
+        Reads the controls the physics will use this frame
+        """
+        self.inputs.forward = bool(held_keys[self.controls[0]] or held_keys["up arrow"])
+        self.inputs.left = bool(held_keys[self.controls[1]] or held_keys["left arrow"])
+        self.inputs.brake = bool(held_keys[self.controls[2]] or held_keys["down arrow"])
+        self.inputs.right = bool(held_keys[self.controls[3]] or held_keys["right arrow"])
+        self.inputs.handbrake = bool(held_keys["space"])
+
+    def sync_state(self):
+        """
+        If something else moved the car (respawns, menus), moves the physics state there too
+        """
+        if self.rendered_transform != (tuple(self.position), self.rotation_y):
+            self.state.position = tuple(self.position)
+            self.state.rotation_y = self.rotation_y
+            self.previous_state.copy_from(self.state)
+
+    def interpolate(self):
+        """
+        Places the car between the last two physics ticks
+        """
+        alpha = self.timestep.alpha
+        previous = self.previous_state
+        current = self.state
+        self.position = Vec3(lerp(previous.x, current.x, alpha), lerp(previous.y, current.y, alpha), lerp(previous.z, current.z, alpha))
+        self.rotation_y = lerp(previous.rotation_y, current.rotation_y, alpha)
 
-        # Collision Detection
-        if movementX != 0:
-            direction = (sign(movementX), 0, 0)
-            x_ray = raycast(origin = self.world_position, direction = direction, ignore = [self, ])
+    def active_track(self):
+        """
+        The track that is being driven on, or None in the menus
+        """
+        track = self.current_track
+        if track is not None and track.enabled:
+            return track
+        return None
+
+    def active_track_name(self):
+        track = self.active_track()
+        if track is None:
+            return None
+        return track.name
+
+    def start_recording(self):
+        """
+        Starts recording the inputs of a lap, seeding the AI's random throttle so the run can be repeated
+        """
+        seed = self.replay_random.randrange(2 ** 32)
+        # Every AI shares one batch, seed it once
+        for batch in {ai.batch for ai in self.ai_list}:
+            batch.seed(seed)
+        self.recorder = ReplayRecorder(self.state, self.car_type, self.active_track_name() or "", self.gamemode, seed)
 
-            if x_ray.distance > self.scale_x / 2 + abs(movementX):
-                self.x += movementX
+    def best_replay_path(self):
+        return os.path.join(self.replay_path, f"best_{self.active_track_name()}_{self.gamemode.replace(' ', '_')}.rly")
 
-        if movementZ != 0:
-            direction = (0, 0, sign(movementZ))
-            z_ray = raycast(origin = self.world_position, direction = direction, ignore = [self, ])
+    def quickest_lap(self):
+        """
+        Whether the lap being recorded is quicker than the best replay of this track and gamemode
+        """
+        if self.recorder is None or self.recorder.ticks == 0:
+            return False
+        path = self.best_replay_path()
+        if not os.path.isfile(path):
+            return True
+        try:
+            return self.recorder.replay.duration < replay_duration(path)
+        except ReplayError:
+            return True
+
+    def toggle_replay(self):
+        """
+        Shows or hides the best replay of the track and gamemode next to the car
+        """
+        if self.replay_car is not None:
+            destroy(self.replay_car)
+            self.replay_car = None
+            return
+        track = self.active_track()
+        if track is None:
+            return
+        path = self.best_replay_path()
+        if not os.path.isfile(path):
+            return
+        try:
+            replay = Replay.load(path)
+        except ReplayError as e:
+            print("couldn't show replay", e)
+            return
+        self.replay_car = ReplayCar(replay, TrackWorld(track.heightfield, track.walls))
 
-            if z_ray.distance > self.scale_z / 2 + abs(movementZ):
-                self.z += movementZ
+    def start_ghost_lap(self, best = False):
+        """
+        Keeps the lap that just ended as the ghost if it was the best one, then
+        starts sampling the next lap and racing against the ghost
+        """
+        name = f"{self.active_track_name()}_{self.gamemode.replace(' ', '_')}"
+        path = os.path.join(self.ghost_path, name + ".ghost")
+
+        if self.recording_ghost and best and self.ghost_name == name:
+            ghost = self.ghost_recorder.ghost(self.car_type)
+            if ghost is not None:
+                try:
+                    ghost.save(path)
+                except OSError as e:
+                    print("couldn't save ghost", e)
+                self.ghost = ghost
+
+        if self.ghost_name != name:
+            self.ghost = Ghost.load(path)
+            self.ghost_name = name
+
+        self.ghost_recorder.reset()
+        self.recording_ghost = True
+
+        if self.ghost is not None:
+            if self.ghost_car is None:
+                self.ghost_car = CarRepresentation(self)
+            if self.ghost.car_type in CAR_DEFINITIONS:
+                set_car_model(self.ghost_car, self.ghost.car_type, f"{self.ghost.car_type}-red.png")
+            self.ghost_car.alpha = 0.4
+            self.ghost_time = 0.0
+            self.ghost_car.enable()
+
+    def update_ghost(self):
+        """
+        Samples the car for the next ghost and moves the ghost along the best lap
+        """
+        if self.recording_ghost:
+            self.ghost_recorder.update(time.dt, self.x, self.y, self.z, self.rotation_y)
+
+        if self.ghost_car is not None and self.ghost_car.enabled:
+            self.ghost_time += time.dt
+            if self.ghost_time > self.ghost.duration:
+                self.ghost_car.disable()
+                return
+            x, y, z, rotation_y = self.ghost.transform_at(self.ghost_time)
+            self.ghost_car.position = Vec3(x, y, z)
+            self.ghost_car.rotation_y = rotation_y
+
+    def input(self, key):
+        # Replay of the best lap
+        if key == "f5":
+            self.toggle_replay()
+
+    def finish_recording(self, best = False):
+        """
+        Saves the lap that was being recorded as the last (and maybe best) replay of this track and gamemode
+        """
+        if self.recorder is None or self.recorder.ticks == 0:
+            return
+        replay = self.recorder.replay
+        name = f"{replay.track}_{replay.gamemode.replace(' ', '_')}.rly"
+        try:
+            replay.save(os.path.join(self.replay_path, "last_" + name))
+            if best:
+                replay.save(os.path.join(self.replay_path, "best_" + name))
+        except OSError as e:
+            print("couldn't save replay", e)
+        self.recorder = None
 
     def reset_car(self):
         """
         Resets the car
         """
-        if self.sand_track.enabled:
-            self.position = (-63, -40, -7)
-            self.rotation = (0, 90, 0)
-        elif self.grass_track.enabled:
-            self.position = (-80, -30, 18.5)
-            self.rotation = (0, 90, 0)
-        elif self.snow_track.enabled:
-            self.position = (-5, -35, 93)
-            self.rotation = (0, 90, 0)
-        elif self.forest_track.enabled:
-            self.position = (12, -35, 76)
-            self.rotation = (0, 90, 0)
-        elif self.savannah_track.enabled:
-            self.position = (-14, -35, 42)
-            self.rotation = (0, 90, 0)
-        elif self.lake_track.enabled:
-            self.position = (-121, -40, 158)
-            self.rotation = (0, 90, 0)
+        track = self.active_track()
+        if track is not None:
+            self.position = track.spawn_position
+            self.rotation = (0, track.spawn_rotation_y, 0)
         camera.world_rotation_y = self.rotation_y
         self.speed = 0
         self.velocity_y = 0
-        self.anti_cheat = 1
+        self.recorder = None
+        self.recording_ghost = False
+        if self.ghost_car is not None:
+            self.ghost_car.disable()
+        if self.race_tracker is not None:
+            self.race_tracker.restart_lap(self)
         self.timer_running = False
         if self.gamemode == "race":
             self.count = 0.0
@@ -805,34 +818,19 @@ class Car(Entity):
         self.start_sound = True
         if self.audio:
             if self.skid_sound.playing:
-                self.skid_sound.stop(False)
+                self.skid_sound.stop()
             if self.dirt_sound.playing:
-                self.dirt_sound.stop(False)
+                self.dirt_sound.stop()
 
-    def simple_intersects(self, entity):
+    def finish_lap(self):
         """
-        A faster AABB intersects for detecting collision with
-        simple objects, doesn't take rotation into account
+        Crossed the finish line after every checkpoint of the lap, or for the first time
         """
-        minXA = self.x - self.scale_x
-        maxXA = self.x + self.scale_x
-        minYA = self.y - self.scale_y + (self.scale_y / 2)
-        maxYA = self.y + self.scale_y - (self.scale_y / 2)
-        minZA = self.z - self.scale_z
-        maxZA = self.z + self.scale_z
-
-        minXB = entity.x - entity.scale_x + (entity.scale_x / 2)
-        maxXB = entity.x + entity.scale_x - (entity.scale_x / 2)
-        minYB = entity.y - entity.scale_y + (entity.scale_y / 2)
-        maxYB = entity.y + entity.scale_y - (entity.scale_y / 2)
-        minZB = entity.z - entity.scale_z + (entity.scale_z / 2)
-        maxZB = entity.z + entity.scale_z - (entity.scale_z / 2)
-        
-        return (
-            (minXA <= maxXB and maxXA >= minXB) and
-            (minYA <= maxYB and maxYA >= minYB) and
-            (minZA <= maxZB and maxZA >= minZB)
-        )
+        self.timer_running = True
+        if self.gamemode != "drift":
+            invoke(self.reset_timer, delay = 3)
+
+        self.check_highscore()
 
     def check_highscore(self):
         """
@@ -856,18 +854,9 @@ class Car(Entity):
                     self.highscore_count = self.last_count
                     self.animate_text(self.highscore)
 
-            if self.sand_track.enabled:
-                self.sand_track_hs = float(self.highscore_count)
-            elif self.grass_track.enabled:
-                self.grass_track_hs = float(self.highscore_count)
-            elif self.snow_track.enabled:
-                self.snow_track_hs = float(self.highscore_count)
-            elif self.forest_track.enabled:
-                self.forest_track_hs = float(self.highscore_count)
-            elif self.savannah_track.enabled:
-                self.savannah_track_hs = float(self.highscore_count)
-            elif self.lake_track.enabled:
-                self.lake_track_hs = float(self.highscore_count)
+            track = self.active_track()
+            if track is not None:
+                setattr(self, f"{track.name}_hs", float(self.highscore_count))
             self.save_highscore()
 
         elif self.gamemode == "time trial":
@@ -895,21 +884,24 @@ class Car(Entity):
             
             self.highscore.text = str(int(self.highscore_count))
             
-            if self.sand_track.enabled:
-                self.sand_track_drift = int(self.highscore_count)
-            elif self.grass_track.enabled:
-                self.grass_track_drift = int(self.highscore_count)
-            elif self.snow_track.enabled:
-                self.snow_track_drift = int(self.highscore_count)
-            elif self.forest_track.enabled:
-                self.forest_track_drift = int(self.highscore_count)
-            elif self.savannah_track.enabled:
-                self.savannah_track_drift = int(self.highscore_count)
-            elif self.lake_track.enabled:
-                self.lake_track_drift = int(self.highscore_count)
+            track = self.active_track()
+            if track is not None:
+                setattr(self, f"{track.name}_drift", int(self.highscore_count))
 
             self.save_highscore()
 
+        # Save the replay and ghost of the lap that just ended and record the next one
+        if self.gamemode == "race":
+            best = self.last_count == self.highscore_count
+        elif self.gamemode == "time trial":
+            best = self.quickest_lap()
+        else:
+            best = False
+        self.finish_recording(best = best)
+        self.start_recording()
+        if self.ghost_mode:
+            self.start_ghost_lap(best = best)
+
     def save_highscore(self):
         """
         Saves the highscore to a json file
@@ -977,12 +969,8 @@ class Car(Entity):
         """
         Declares variables with data from a json file
         """
-        self.sand_track.unlocked = self.unlocked["tracks"]["sand_track"]
-        self.grass_track.unlocked = self.unlocked["tracks"]["grass_track"]
-        self.snow_track.unlocked = self.unlocked["tracks"]["snow_track"]
-        self.forest_track.unlocked = self.unlocked["tracks"]["forest_track"]
-        self.savannah_track.unlocked = self.unlocked["tracks"]["savannah_track"]
-        self.lake_track.unlocked = self.unlocked["tracks"]["lake_track"]
+        for track in self.tracks:
+            track.unlocked = self.unlocked["tracks"][track.name]
 
         self.beat_mandaw_sand_track = self.unlocked["beat_mandaw"]["sand_track"]
         self.beat_mandaw_grass_track = self.unlocked["beat_mandaw"]["grass_track"]
@@ -1052,14 +1040,7 @@ class Car(Entity):
         Saves the unlocks to a json file
         """
         self.unlocked_dict = {
-            "tracks": {
-                "sand_track": self.sand_track.unlocked,
-                "grass_track": self.grass_track.unlocked,
-                "snow_track": self.snow_track.unlocked,
-                "forest_track": self.forest_track.unlocked,
-                "savannah_track": self.savannah_track.unlocked,
-                "lake_track": self.lake_track.unlocked
-            },
+            "tracks": {track.name: track.unlocked for track in self.tracks},
             "beat_mandaw": {
                 "sand_track": self.beat_mandaw_sand_track,
                 "grass_track": self.beat_mandaw_grass_track,
@@ -1177,18 +1158,9 @@ class Car(Entity):
         self.drift_multiplier = 20
         self.drifting = False
 
-        if self.sand_track.enabled:
-            self.drift_time = 25.0
-        elif self.grass_track.enabled:
-            self.drift_time = 30.0
-        elif self.snow_track.enabled:
-            self.drift_time = 50.0
-        elif self.forest_track.enabled:
-            self.drift_time = 40.0
-        elif self.savannah_track.enabled:
-            self.drift_time = 25.0
-        elif self.lake_track.enabled:
-            self.drift_time = 75.0
+        track = self.active_track()
+        if track is not None:
+            self.drift_time = float(track.drift_time)
 
     def animate_text(self, text, top = 1.2, bottom = 0.6):
         """
@@ -1217,6 +1189,40 @@ class Car(Entity):
         self.model_path = str(self.model).replace("render/scene/car/", "")
         invoke(self.update_model_path, delay = 3)
 
+# Answers the physics' ground and wall queries from the active track's baked
+# heightfield and wall field, or with raycasts against the ground and wall
+# layers when no track is active
+class RaycastWorld:
+    def __init__(self, car):
+        self.car = car
+
+    def ground(self, x, y, z):
+        track = self.car.active_track()
+        if track is not None:
+            return track.heightfield.ground(x, y, z)
+        y_ray = layer_raycast((x, y, z), (0, -1, 0), SOLID)
+        if not y_ray.hit:
+            return y_ray.distance, y, (0, 1, 0)
+        return y_ray.distance, y_ray.world_point.y, tuple(y_ray.world_normal)
+
+    def move(self, x, y, z, dx, dz, radius_x, radius_z):
+        track = self.car.active_track()
+        if track is not None:
+            new_x, new_z = track.walls.move(x, y, z, dx, dz, max(radius_x, radius_z))
+            return track.heightfield.stop_at_slopes(x, y, z, new_x, new_z)
+
+        if dx != 0:
+            x_ray = layer_raycast((x, y, z), (sign(dx), 0, 0), SOLID)
+            if x_ray.distance > radius_x + abs(dx):
+                x += dx
+
+        if dz != 0:
+            z_ray = layer_raycast((x, y, z), (0, 0, sign(dz)), SOLID)
+            if z_ray.distance > radius_z + abs(dz):
+                z += dz
+
+        return x, z
+
 # Class for copying the car's position, rotation for multiplayer
 class CarRepresentation(Entity):
     def __init__(self, car, position = (0, 0, 0), rotation = (0, 65, 0)):
@@ -1260,6 +1266,33 @@ class CarRepresentation(Entity):
 
         invoke(self.update_representation, delay = 5)
 
+# Drives a recorded replay on the track by re-simulating its inputs
+class ReplayCar(Entity):
+    def __init__(self, replay, world, loop = True):
+        super().__init__(
+            parent = scene,
+            model = car_model(replay.car_type if replay.car_type in CAR_DEFINITIONS else "sports"),
+            texture = f"{replay.car_type}-red.png" if replay.car_type in CAR_DEFINITIONS else "sports-red.png",
+            alpha = 0.6
+        )
+
+        self.replay = replay
+        self.world = world
+        self.loop = loop
+        self.player = ReplayPlayer(replay, world)
+
+    def update(self):
+        self.player.advance(time.dt)
+        if self.player.finished and self.loop:
+            self.player = ReplayPlayer(self.replay, self.world)
+
+        # Between the last two ticks, like the player's car
+        alpha = self.player.timestep.alpha
+        previous = self.player.previous_state
+        current = self.player.state
+        self.position = Vec3(lerp(previous.x, current.x, alpha), lerp(previous.y, current.y, alpha), lerp(previous.z, current.z, alpha))
+        self.rotation_y = lerp(previous.rotation_y, current.rotation_y, alpha)
+
 # Username shown above the car
 class CarUsername(Text):
     def __init__(self, car):
@@ -0,0 +1,76 @@
+from ursina import *
+import numpy as np
+from car_collision import CarCollisions
+from car_definitions import car_definition
+import profiler
+
+# The player turns by rotation_speed * 50 degrees a second
+ROTATION_SPEED_SCALE = 50
+
+# Hits that change the player's speed by more than this shake the camera
+SHAKE_SPEED = 5
+
+# Stops the cars driving through each other: the player, the AI and the other
+# players in multiplayer, who push but aren't pushed (the network moves them)
+class CarCollider(Entity):
+    def __init__(self, car, batch):
+        super().__init__()
+
+        self.car = car
+        self.batch = batch
+        self.multiplayer = None
+        self.collisions = CarCollisions()
+
+    def update(self):
+        track = self.car.active_track()
+        if track is None or not self.car.visible:
+            return
+
+        profiler.section("car.collisions")
+        batch = self.batch
+        vehicles = batch.vehicles
+        racing = np.nonzero([ai.enabled for ai in batch.cars])[0]
+        players = [player for player in getattr(self.multiplayer, "players", {}).values() if player.enabled]
+        state = self.car.state
+        footprint = car_definition(self.car.car_type)["footprint"]
+        remote = car_definition("sports")["footprint"]
+
+        hit = self.collisions.solve(
+            np.concatenate((vehicles.x[racing], [state.x], [player.x for player in players])),
+            np.concatenate((vehicles.z[racing], [state.z], [player.z for player in players])),
+            np.concatenate((vehicles.rotation_y[racing], [state.rotation_y], [player.rotation_y for player in players])),
+            np.concatenate((vehicles.pivot_rotation_y[racing], [state.pivot_rotation_y], [player.rotation_y for player in players])),
+            np.concatenate((vehicles.speed[racing], [state.speed], [0] * len(players))),
+            np.concatenate((vehicles.half_width[racing], [footprint[0]], [remote[0]] * len(players))),
+            np.concatenate((vehicles.half_length[racing], [footprint[1]], [remote[1]] * len(players))),
+            np.concatenate((vehicles.mass[racing], [car_definition(self.car.car_type)["mass"]], [inf] * len(players)))
+        )
+        if hit.any():
+            collisions = self.collisions
+            count = len(racing)
+
+            # AI
+            bumped = np.nonzero(hit[:count])[0]
+            if len(bumped):
+                batch.bump(racing[bumped], collisions.push_x[bumped], collisions.push_z[bumped], collisions.speed[bumped], collisions.spin[bumped], track.walls)
+
+            # Player
+            if hit[count]:
+                self.bump_player(collisions.push_x[count], collisions.push_z[count], collisions.speed[count], collisions.spin[count])
+        profiler.end()
+
+    def bump_player(self, push_x, push_z, speed, spin):
+        """
+        Pushes the player's car out of the cars it hit and feeds the hit into its speed and turning
+        """
+        state = self.car.state
+        previous = self.car.previous_state
+        x, z = self.car.world.move(state.x, state.y, state.z, push_x, push_z, 1, 1)
+        previous.x += x - state.x
+        previous.z += z - state.z
+        state.x, state.z = x, z
+
+        if abs(speed - state.speed) > SHAKE_SPEED:
+            self.car.shake_camera()
+        state.speed = speed
+        state.rotation_speed = clamp(state.rotation_speed + spin / ROTATION_SPEED_SCALE, -state.max_rotation_speed, state.max_rotation_speed)
@@ -0,0 +1,132 @@
+"""
+Car to car collisions.
+
+Cars are boxes on the ground plane: their footprint (half width and half
+length from cars.json) turned by their rotation_y. Every tick:
+
+    broad phase   the spatial hash pairs up the cars whose bounding circles
+                  could touch
+    narrow phase  the separating axis test on the two boxes of every pair,
+                  all pairs at once, finds the ones that overlap, how far and
+                  along which axis
+    response      overlapping cars are pushed apart, and cars moving into each
+                  other get an impulse along that axis, which changes their
+                  speed and, when it lands off centre, spins them
+
+A car with infinite mass (a remote player the network moves) pushes others
+but isn't moved itself. Nothing in here touches Ursina, so the game and a
+headless server can both use it.
+"""
+import numpy as np
+
+from spatial_hash import SpatialHash
+
+# How bouncy hits are, 0 to 1
+RESTITUTION = 0.3
+
+# Most a hit can change a car's turning speed, in degrees per second
+MAX_SPIN = 150
+
+class CarCollisions:
+    """
+    Finds and resolves the hits between any number of cars
+    """
+    def __init__(self):
+        self.grid = SpatialHash()
+        self.resize(0)
+
+    def resize(self, count):
+        self.push_x = np.zeros(count)
+        self.push_z = np.zeros(count)
+        self.speed = np.zeros(count)
+        self.spin = np.zeros(count)
+        self.hit = np.zeros(count, dtype = bool)
+
+    def solve(self, x, z, rotation_y, heading, speed, half_width, half_length, mass):
+        """
+        Works out the hits between cars at x, z facing rotation_y and moving at
+        speed towards heading (their drift pivot). Afterwards push_x and push_z
+        hold how far to move every car, speed its new speed, spin how much its
+        turning speed changes and hit whether it hit anything. Returns hit.
+        """
+        x = np.asarray(x, dtype = np.float64)
+        z = np.asarray(z, dtype = np.float64)
+        speed = np.asarray(speed, dtype = np.float64)
+        half_width = np.asarray(half_width, dtype = np.float64)
+        half_length = np.asarray(half_length, dtype = np.float64)
+        count = len(x)
+        self.resize(count)
+        self.speed = speed.copy()
+        if count < 2:
+            return self.hit
+
+        # Broad phase: pairs whose bounding circles might overlap
+        radius = np.hypot(half_width, half_length)
+        self.grid.build(x, z)
+        first, second = self.grid.pairs(2 * radius.max())
+        dx = x[second] - x[first]
+        dz = z[second] - z[first]
+        close = np.hypot(dx, dz) <= radius[first] + radius[second]
+        first, second, dx, dz = first[close], second[close], dx[close], dz[close]
+        if len(first) == 0:
+            return self.hit
+
+        # Narrow phase: separating axes are the forward and right axes of both boxes
+        angle = np.radians(np.asarray(rotation_y, dtype = np.float64))
+        forward = np.stack((np.sin(angle), np.cos(angle)), axis = 1)
+        right = np.stack((forward[:, 1], -forward[:, 0]), axis = 1)
+        axes = np.stack((forward[first], right[first], forward[second], right[second]), axis = 1)
+
+        def extent(car):
+            return (half_length[car, None] * np.abs((axes * forward[car, None]).sum(axis = 2))
+                + half_width[car, None] * np.abs((axes * right[car, None]).sum(axis = 2)))
+
+        along = axes[:, :, 0] * dx[:, None] + axes[:, :, 1] * dz[:, None]
+        overlap = extent(first) + extent(second) - np.abs(along)
+        touching = overlap.min(axis = 1) > 0
+        if not touching.any():
+            return self.hit
+        first, second, dx, dz = first[touching], second[touching], dx[touching], dz[touching]
+        axes, along, overlap = axes[touching], along[touching], overlap[touching]
+
+        # The axis they overlap least along, pointing from the first car to the second
+        least = np.argmin(overlap, axis = 1)
+        rows = np.arange(len(first))
+        depth = overlap[rows, least]
+        normal = axes[rows, least] * np.where(along[rows, least] < 0, -1, 1)[:, None]
+
+        # Push apart, the lighter car further
+        inverse_mass = 1 / np.asarray(mass, dtype = np.float64)
+        total_inverse = np.maximum(inverse_mass[first] + inverse_mass[second], 1e-9)
+        push = normal * (depth / total_inverse)[:, None]
+        self.push_x = self.total(second, push[:, 0], count) - self.total(first, push[:, 0], count)
+        self.push_z = self.total(second, push[:, 1], count) - self.total(first, push[:, 1], count)
+        self.push_x *= inverse_mass
+        self.push_z *= inverse_mass
+
+        # Impulse along the normal for cars moving into each other
+        heading = np.radians(np.asarray(heading, dtype = np.float64))
+        direction = np.stack((np.sin(heading), np.cos(heading)), axis = 1)
+        velocity = direction * speed[:, None]
+        closing = ((velocity[second] - velocity[first]) * normal).sum(axis = 1)
+        impulse = np.where(closing < 0, -(1 + RESTITUTION) * closing / total_inverse, 0)
+        change_x = (self.total(second, impulse * normal[:, 0], count) - self.total(first, impulse * normal[:, 0], count)) * inverse_mass
+        change_z = (self.total(second, impulse * normal[:, 1], count) - self.total(first, impulse * normal[:, 1], count)) * inverse_mass
+        self.speed = (velocity[:, 0] + change_x) * direction[:, 0] + (velocity[:, 1] + change_z) * direction[:, 1]
+
+        # Off centre hits spin the cars: they meet halfway between their centres
+        inertia = (half_width ** 2 + half_length ** 2) / 3
+        torque = impulse * (dx * normal[:, 1] - dz * normal[:, 0]) / 2
+        spin = (self.total(first, torque, count) + self.total(second, torque, count)) * inverse_mass / inertia
+        self.spin = np.clip(np.degrees(spin), -MAX_SPIN, MAX_SPIN)
+
+        self.hit[first] = True
+        self.hit[second] = True
+        return self.hit
+
+    @staticmethod
+    def total(cars, values, count):
+        """
+        Adds up the values of the pairs per car
+        """
+        return np.bincount(cars, weights = values, minlength = count)
@@ -0,0 +1,32 @@
+"""
+The car types, read once from cars.json.
+
+Every car type has its model, default texture, engine sound, handling,
+where its particles and cosmetics sit, and the half width and half length
+(footprint) and mass it collides with. Doesn't use Ursina, so headless tools
+can look up car types too.
+"""
+import os
+import json
+
+from objfile import GAME_FOLDER
+
+DEFINITIONS_PATH = os.path.join(GAME_FOLDER, "cars.json")
+
+# The values of a definition that are copied onto the player's car
+HANDLING = (
+    "topspeed", "acceleration", "drift_amount", "turning_speed",
+    "min_drift_speed", "max_drift_speed", "max_rotation_speed", "steering_amount",
+)
+
+with open(DEFINITIONS_PATH, "r") as definitions:
+    CAR_DEFINITIONS = json.load(definitions)
+
+# In the order of the garage
+CAR_TYPES = tuple(CAR_DEFINITIONS)
+
+def car_definition(car_type):
+    """
+    The definition of a car type, the sports car's if there is no such type
+    """
+    return CAR_DEFINITIONS.get(car_type, CAR_DEFINITIONS["sports"])
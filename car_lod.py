@@ -0,0 +1,88 @@
+"""
+Simpler versions of every car model, for drawing cars far away.
+
+Each model is read the way Ursina reads it (objfile.py) and simplified into
+the levels of mesh_lod.py, which car_models.py puts under an LODNode next to
+the full model.
+
+Levels are baked the first time a car type is loaded and cached in
+cache/cars. To bake every car ahead of time run:
+
+    python car_lod.py
+
+Doesn't use Ursina.
+"""
+import os
+import numpy as np
+
+from objfile import GAME_FOLDER, load_obj, mesh_corners, source_stamp, save_cache, load_cache, BakedCache
+from mesh_lod import LOD_RATIOS, lod_chain
+from car_definitions import CAR_TYPES, car_definition
+
+CACHE_FOLDER = os.path.join(GAME_FOLDER, "cache", "cars")
+
+# Bump when the bake changes so old caches are rebuilt
+VERSION = 1
+
+def bake_car_lods(model):
+    """
+    The simpler levels of a car model, (vertices, triangles) each with the rows of objfile.mesh_corners()
+    """
+    corners = mesh_corners(load_obj(model))
+    vertices, index = np.unique(corners, axis = 0, return_inverse = True)
+    return lod_chain(vertices, index.reshape(-1, 3).astype(np.uint32))
+
+def save_levels(path, levels, key = ""):
+    arrays = {}
+    for i, (vertices, triangles) in enumerate(levels):
+        arrays[f"vertices_{i}"] = vertices
+        arrays[f"triangles_{i}"] = triangles
+    save_cache(path, key, count = np.array(len(levels)), **arrays)
+
+def load_levels(path, key = None):
+    """
+    Loads saved levels, or returns None if they're missing or were baked from something else
+    """
+    def read(data):
+        return [(data[f"vertices_{i}"], data[f"triangles_{i}"]) for i in range(int(data["count"]))]
+    return load_cache(path, read, key)
+
+class CarLods(BakedCache):
+    """
+    The simpler levels of one car type, baked or loaded from the cache the first time they're needed
+    """
+    description = "car levels"
+
+    def __init__(self, car_type):
+        self.model = car_definition(car_type)["model"]
+        super().__init__(os.path.join(CACHE_FOLDER, os.path.splitext(self.model)[0] + ".npz"))
+
+    def key(self):
+        return f"{VERSION}|{source_stamp(self.model)}|{LOD_RATIOS}"
+
+    def bake(self):
+        return bake_car_lods(self.model)
+
+    def load(self, key):
+        return load_levels(self.path, key)
+
+    def save(self, levels, key):
+        save_levels(self.path, levels, key)
+
+CAR_LODS = {car_type: CarLods(car_type) for car_type in CAR_TYPES}
+
+def car_lods(car_type):
+    """
+    The levels of a car type, the sports car's if there is no such type (like car_definition)
+    """
+    return CAR_LODS.get(car_type, CAR_LODS["sports"])
+
+if __name__ == "__main__":
+    import time
+
+    for car_type, lods in CAR_LODS.items():
+        if os.path.isfile(lods.path):
+            os.remove(lods.path)
+        start = time.perf_counter()
+        levels = lods.get()
+        print(f"{car_type}: {[len(triangles) for vertices, triangles in levels]} triangles in {len(levels)} levels in {time.perf_counter() - start:.2f}s")
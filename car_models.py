@@ -0,0 +1,85 @@
+"""
+Shared car geometry.
+
+Each car model is loaded once into a template. A car Entity gets a small node
+of its own with the template instanced under it (instanceTo), so every car of
+a type draws the same geometry and switching cars doesn't look anything up.
+Textures and colours are set on the car's own node, which the instanced
+geometry inherits, so cars of the same type can still have different colours.
+
+A template is an LODNode with the full model and its simpler levels
+(car_lod.py) under it, so cars far away draw fewer triangles. How far each
+level reaches depends on the graphics setting (CAR_LOD_DISTANCES).
+"""
+from ursina import *
+from panda3d.core import LODNode
+from car_definitions import CAR_TYPES, car_definition
+from car_lod import car_lods
+from scenery import mesh_geom, geom_node, set_lod_switches
+
+# How far away each level stops being drawn on each graphics setting, the last level is drawn from there on
+CAR_LOD_DISTANCES = {
+    "fancy": (40, 100),
+    "fast": (20, 60),
+    "ultra fast": (10, 30),
+}
+
+_templates = {}
+_textures = {}
+_graphics = "fancy"
+
+def car_template(car_type):
+    """
+    The loaded model of a car type and its simpler levels under an LODNode, kept off the scene graph
+    """
+    template = _templates.get(car_type)
+    if template is None:
+        template = NodePath(LODNode(car_type))
+        load_model(car_definition(car_type)["model"]).reparentTo(template)
+        for i, (vertices, triangles) in enumerate(car_lods(car_type).get()):
+            template.attachNewNode(geom_node(f"{car_type} {i + 1}", mesh_geom(vertices, triangles)))
+        set_lod_switches(template.node(), template.getNumChildren(), CAR_LOD_DISTANCES[_graphics])
+        _templates[car_type] = template
+    return template
+
+def car_model(car_type):
+    """
+    A new node with the car type's model instanced under it, to use as an Entity's model
+    """
+    definition = car_definition(car_type)
+    model = NodePath(definition["model"])
+    car_template(car_type).instanceTo(model)
+    return model
+
+def car_texture(name):
+    """
+    A texture loaded once (None if it's missing, which is remembered too)
+    """
+    if name not in _textures:
+        _textures[name] = load_texture(name)
+    return _textures[name]
+
+def set_car_model(entity, car_type, texture = None):
+    """
+    Gives an Entity the model of a car type with a texture (the type's default one if None)
+    """
+    entity.model = car_model(car_type)
+    texture = car_texture(texture if texture else car_definition(car_type)["texture"])
+    if texture:
+        entity.texture = texture
+
+def set_car_graphics(graphics):
+    """
+    Switches every car's levels at the distances of a graphics setting
+    """
+    global _graphics
+    _graphics = graphics
+    for template in _templates.values():
+        set_lod_switches(template.node(), template.getNumChildren(), CAR_LOD_DISTANCES[graphics])
+
+def preload_car_models():
+    """
+    Loads every car model, so the first garage click or AI spawn doesn't
+    """
+    for car_type in CAR_TYPES:
+        car_template(car_type)
@@ -0,0 +1,172 @@
+"""
+Lap validation and sector times from an ordered list of checkpoints.
+
+A track's checkpoints (the "checkpoints" of its spec) are gates across the
+road: a line width wide, standing height tall, driven through in the direction
+the gate faces. The first one is the finish line. A lap only counts when a car
+drives through every gate in order and then the finish line again; the time
+between two gates is a sector.
+
+Each tick every car is only tested against the gate it has to reach next: the
+line it drove along since the last tick is tested for crossing the gate, for
+all cars at once. Where on that line it crossed times the crossing between
+ticks. A car that jumps further than a car can drive in a tick was reset or
+respawned, and starts again at the finish line.
+
+Doesn't use Ursina, so the same checks can run on a server.
+"""
+import math
+import numpy as np
+
+# Moving further than this in one tick is a reset or respawn, not driving
+JUMP_DISTANCE = 30
+
+class Checkpoints:
+    """
+    Sector and lap times of any number of cars through a track's checkpoints
+    """
+    def __init__(self, gates):
+        self.names = [gate["name"] for gate in gates]
+        self.count = len(gates)
+        position = np.array([gate["position"] for gate in gates], dtype = np.float64).reshape(-1, 3)
+        rotation = np.radians([gate["rotation_y"] for gate in gates])
+        self.x = position[:, 0]
+        self.y = position[:, 1]
+        self.z = position[:, 2]
+        # The way through the gate, and along the gate to its right
+        self.forward_x = np.sin(rotation)
+        self.forward_z = np.cos(rotation)
+        self.half_width = np.array([gate["width"] for gate in gates], dtype = np.float64) / 2
+        self.half_height = np.array([gate["height"] for gate in gates], dtype = np.float64) / 2
+
+        self.time = 0.0
+        self.keys = []
+        self.slots = {}
+        self.resize(0)
+
+    def resize(self, count):
+        self.last_x = np.zeros(count)
+        self.last_y = np.zeros(count)
+        self.last_z = np.zeros(count)
+        # The gate each car has to drive through next, 0 is the finish line
+        self.next = np.zeros(count, dtype = np.int64)
+        # When each car started its lap and its last sector, nan until it crosses the finish line
+        self.lap_start = np.full(count, np.nan)
+        self.sector_start = np.full(count, np.nan)
+
+        self.sectors = [[] for i in range(count)]
+        self.last_sectors = [[] for i in range(count)]
+        self.best_sectors = [[math.inf] * self.count for i in range(count)]
+        self.last_lap = np.full(count, np.nan)
+        self.best_lap = np.full(count, np.inf)
+        self.laps = np.zeros(count, dtype = np.int64)
+
+    def realign(self, keys, x, y, z):
+        """
+        Keeps the times of cars that were already tracked and starts the new ones where they are
+        """
+        old_slots = self.slots
+        old = (self.last_x, self.last_y, self.last_z, self.next, self.lap_start, self.sector_start, self.last_lap, self.best_lap, self.laps)
+        old_lists = (self.sectors, self.last_sectors, self.best_sectors)
+        self.keys = list(keys)
+        self.slots = {key: i for i, key in enumerate(self.keys)}
+        self.resize(len(self.keys))
+
+        for i, key in enumerate(self.keys):
+            slot = old_slots.get(key)
+            if slot is not None:
+                self.last_x[i], self.last_y[i], self.last_z[i], self.next[i], self.lap_start[i], self.sector_start[i], self.last_lap[i], self.best_lap[i], self.laps[i] = (value[slot] for value in old)
+                self.sectors[i], self.last_sectors[i], self.best_sectors[i] = (value[slot] for value in old_lists)
+            else:
+                self.last_x[i], self.last_y[i], self.last_z[i] = x[i], y[i], z[i]
+
+    def restart(self, key):
+        """
+        Throws away a car's lap so far; its next lap starts at the finish line
+        """
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.start_over(slot)
+
+    def start_over(self, slot):
+        self.next[slot] = 0
+        self.lap_start[slot] = np.nan
+        self.sector_start[slot] = np.nan
+        self.sectors[slot] = []
+
+    def update(self, keys, x, y, z, dt):
+        """
+        Moves every car (keys, any hashable, in the same order as the arrays)
+        and returns its crossings in order: (key, gate, sector, lap) with the
+        index of the gate, the time of the sector it finished (None when the
+        crossing starts a lap) and the lap time when it finished a lap
+        """
+        # Copies, they're kept for the next tick
+        x = np.array(x, dtype = np.float64)
+        y = np.array(y, dtype = np.float64)
+        z = np.array(z, dtype = np.float64)
+        if keys != self.keys:
+            self.realign(keys, x, y, z)
+        start = self.time
+        self.time += dt
+        if not self.keys or not self.count:
+            return []
+
+        jumped = (x - self.last_x) ** 2 + (z - self.last_z) ** 2 > JUMP_DISTANCE * JUMP_DISTANCE
+        for slot in np.nonzero(jumped)[0]:
+            self.start_over(slot)
+
+        # How far in front of its next gate every car was last tick and is now
+        gate = self.next
+        before = (self.last_x - self.x[gate]) * self.forward_x[gate] + (self.last_z - self.z[gate]) * self.forward_z[gate]
+        after = (x - self.x[gate]) * self.forward_x[gate] + (z - self.z[gate]) * self.forward_z[gate]
+        crossed = (before < 0) & (after >= 0) & ~jumped
+
+        # Where it crossed, which has to be on the gate
+        t = np.where(crossed, before / np.where(crossed, before - after, 1), 0)
+        cross_x = self.last_x + (x - self.last_x) * t
+        cross_y = self.last_y + (y - self.last_y) * t
+        cross_z = self.last_z + (z - self.last_z) * t
+        along = (cross_x - self.x[gate]) * self.forward_z[gate] - (cross_z - self.z[gate]) * self.forward_x[gate]
+        crossed &= (np.abs(along) <= self.half_width[gate]) & (np.abs(cross_y - self.y[gate]) <= self.half_height[gate])
+
+        self.last_x, self.last_y, self.last_z = x, y, z
+
+        crossings = []
+        for slot in np.nonzero(crossed)[0]:
+            crossings.append(self.cross(slot, start + t[slot] * dt))
+        return crossings
+
+    def cross(self, slot, now):
+        """
+        Times a car's crossing of its next gate and moves it on to the one after
+        """
+        gate = int(self.next[slot])
+        sector = None
+        lap = None
+        if not np.isnan(self.sector_start[slot]):
+            sector = float(now - self.sector_start[slot])
+            self.sectors[slot].append(sector)
+            best = self.best_sectors[slot]
+            best[gate - 1] = min(best[gate - 1], sector)
+
+        if gate == 0:
+            # A whole lap through every gate in order
+            if not np.isnan(self.lap_start[slot]):
+                lap = float(now - self.lap_start[slot])
+                self.last_lap[slot] = lap
+                self.best_lap[slot] = min(self.best_lap[slot], lap)
+                self.last_sectors[slot] = self.sectors[slot]
+                self.laps[slot] += 1
+            self.lap_start[slot] = now
+            self.sectors[slot] = []
+
+        self.sector_start[slot] = now
+        self.next[slot] = (gate + 1) % self.count
+        return self.keys[slot], gate, sector, lap
+
+    def get(self, key):
+        """
+        The slot of a car, or None if it isn't tracked
+        """
+        return self.slots.get(key)
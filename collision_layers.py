@@ -0,0 +1,77 @@
+"""
+Collision layers.
+
+Every collider is put on a layer with a Panda3D collide mask, and rays only
+test the layers they ask for. Panda skips the solids of other layers while
+traversing, so a ray doesn't need an ignore list and never hits the car that
+casts it.
+
+Ursina's raycast() walks the whole scene, then filters the hits against an
+ignore list plus every entity without collision, which it rebuilds on every
+call. LayerRaycaster keeps one ray and traverser and reuses them.
+"""
+from ursina import *
+from ursina.hit_info import HitInfo
+from panda3d.core import BitMask32, CollisionTraverser, CollisionHandlerQueue, CollisionNode, CollisionRay
+
+# Layers
+GROUND = BitMask32.bit(1)
+WALLS = BitMask32.bit(2)
+CARS = BitMask32.bit(3)
+
+# What the cars drive on and bump into
+SOLID = GROUND | WALLS
+
+def set_collision_layer(entity, layer):
+    """
+    Puts an entity's collider on a layer
+    """
+    if entity.collider:
+        entity.collider.node_path.node().setIntoCollideMask(layer)
+
+class LayerRaycaster:
+    """
+    Casts rays that only test some layers
+    """
+    def __init__(self):
+        self.traverser = CollisionTraverser()
+        self.queue = CollisionHandlerQueue()
+        self.ray = CollisionRay()
+        self.node = CollisionNode("layer_raycaster")
+        self.node.addSolid(self.ray)
+        self.node.setIntoCollideMask(BitMask32.allOff())
+        self.node_path = render.attachNewNode(self.node)
+        self.traverser.addCollider(self.node_path, self.queue)
+
+    def raycast(self, origin, direction, layers = SOLID, distance = inf):
+        """
+        The nearest hit of a ray on the layers, as a HitInfo like raycast() returns
+        """
+        self.node.setFromCollideMask(layers)
+        self.ray.setOrigin(Vec3(*origin))
+        self.ray.setDirection(Vec3(*direction))
+        self.traverser.traverse(render)
+
+        if self.queue.getNumEntries() == 0:
+            return HitInfo(hit = False, distance = distance)
+        self.queue.sortEntries()
+        entry = self.queue.getEntry(0)
+        world_point = Vec3(*entry.getSurfacePoint(render))
+        hit_distance = (world_point - Vec3(*origin)).length()
+        if hit_distance > distance:
+            return HitInfo(hit = False, distance = distance)
+
+        world_normal = Vec3(*entry.getSurfaceNormal(render)).normalized()
+        return HitInfo(hit = True, distance = hit_distance, world_point = world_point, world_normal = world_normal)
+
+# Shared by everything that casts rays
+_raycaster = None
+
+def layer_raycast(origin, direction, layers = SOLID, distance = inf):
+    """
+    Casts a ray against the given layers only
+    """
+    global _raycaster
+    if _raycaster is None:
+        _raycaster = LayerRaycaster()
+    return _raycaster.raycast(origin, direction, layers, distance)
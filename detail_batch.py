@@ -0,0 +1,206 @@
+"""
+A track's details (trees, rocks, cacti, grass) merged into one mesh per texture.
+
+Every detail model is read once, moved into world space with its transform
+and merged with the other details drawn with the same texture (and shown on
+the same graphics settings, see "fast" in the spec), so a track's scenery is a
+handful of Geoms under one node instead of an Entity per model.
+Corners are built the way Ursina's importer builds them (mirrored x, the
+file's normals and uvs, the material's colour) and corners that come out the
+same are shared between triangles.
+
+Most detail models are one tree or rock copied all over the track. Those
+copies (repeated_meshes.py) are kept as one prototype and a matrix per copy
+instead, and drawn with hardware instancing; only the pieces that aren't
+copies of anything are merged. Prototypes also get simpler levels
+(mesh_lod.py) to draw far away, and trees a flat impostor (scenery.py).
+
+Batches are baked the first time a track is loaded and cached in
+cache/details. To bake every track ahead of time run:
+
+    python detail_batch.py
+
+Doesn't use Ursina, scenery.py turns the batches into Geoms.
+"""
+import os
+import json
+import numpy as np
+
+from objfile import GAME_FOLDER, CORNER_STRIDE, load_obj, mesh_corners, source_stamp, asset_exists, save_cache, load_cache, BakedCache
+from repeated_meshes import mesh_pieces, find_repeats
+from mesh_lod import lod_chain
+from track_definitions import TRACK_SPECS
+
+CACHE_FOLDER = os.path.join(GAME_FOLDER, "cache", "details")
+
+# Bump when the bake changes so old caches are rebuilt
+VERSION = 3
+
+# Floats per corner: position, normal, uv and colour
+STRIDE = CORNER_STRIDE
+
+# Floats per copy of an instanced batch: the x, y and z rows of its 3x4 matrix
+TRANSFORM_STRIDE = 12
+
+class DetailBatch:
+    """
+    The details of a track that share a texture, as one indexed mesh
+
+    texture: the texture file they're drawn with
+    names: the details (spec names) merged into it
+    fast: whether it's drawn on fast graphics too, or only on fancy
+    vertices: (n, STRIDE) float32, position, normal, uv and colour of every corner
+    triangles: (m, 3) uint32 indices into vertices
+    transforms: None for merged details in world space, or (k, TRANSFORM_STRIDE)
+        float32 for a prototype drawn once per row, each row the x, y and z rows of
+        the matrix that moves the prototype into world space
+    lods: simpler (vertices, triangles) of a prototype, for drawing further away
+    impostor: whether furthest away a prototype is drawn as a flat picture of itself
+    """
+    def __init__(self, texture, names, fast, vertices, triangles, transforms = None, lods = (), impostor = False):
+        self.texture = texture
+        self.names = names
+        self.fast = fast
+        self.vertices = vertices
+        self.triangles = triangles
+        self.transforms = transforms
+        self.lods = list(lods)
+        self.impostor = impostor
+
+    def positions(self):
+        """
+        Where every copy stands, (k, 3), for culling copies by distance
+        """
+        return self.transforms[:, 3::4]
+
+def detail_corners(detail, mesh):
+    """
+    Every corner of every triangle of a detail's model in world space, as (m * 3, STRIDE) rows
+    """
+    return mesh_corners(mesh, detail["position"], detail["rotation_y"], detail["scale"])
+
+def bake_details(details):
+    """
+    Merges details (spec parts with model, texture and transform) into one batch per texture and graphics setting
+    """
+    groups = {}
+    for detail in details:
+        groups.setdefault((detail["texture"], detail["fast"]), []).append(detail)
+
+    batches = []
+    for (texture, fast), group in groups.items():
+        # Every model of the group as one mesh, so copies are found across models too
+        meshes = [load_obj(detail["model"]) for detail in group]
+        corners = np.concatenate([detail_corners(detail, mesh) for detail, mesh in zip(group, meshes)])
+        offsets = np.cumsum([0] + [len(mesh.vertices) for mesh in meshes])
+        triangles = np.concatenate([mesh.triangles + offset for mesh, offset in zip(meshes, offsets)])
+        detail_of = np.repeat(np.arange(len(group)), [len(mesh.triangles) for mesh in meshes])
+
+        pieces = mesh_pieces(triangles)
+        repeats, alone = find_repeats(triangles, corners, pieces)
+
+        for repeat in repeats:
+            vertices, index = np.unique(repeat.corners, axis = 0, return_inverse = True)
+            triangles = index.reshape(-1, 3).astype(np.uint32)
+            used = sorted(set(detail_of[pieces[i][0]] for i in repeat.pieces))
+            batches.append(DetailBatch(
+                texture,
+                [group[i]["name"] for i in used],
+                fast,
+                vertices,
+                triangles,
+                repeat.matrices.transpose(0, 2, 1).reshape(-1, TRANSFORM_STRIDE).astype(np.float32),
+                lod_chain(vertices, triangles),
+                any(group[i]["impostor"] for i in used)
+            ))
+
+        if alone:
+            triangle_rows = np.sort(np.concatenate([pieces[i] for i in alone]))
+            rows = (triangle_rows[:, None] * 3 + np.arange(3)).ravel()
+            vertices, index = np.unique(corners[rows], axis = 0, return_inverse = True)
+            batches.append(DetailBatch(
+                texture,
+                [group[i]["name"] for i in np.unique(detail_of[triangle_rows])],
+                fast,
+                vertices,
+                index.reshape(-1, 3).astype(np.uint32)
+            ))
+    return batches
+
+def save_batches(path, batches, key = ""):
+    info = [
+        {"texture": batch.texture, "names": batch.names, "fast": batch.fast, "instanced": batch.transforms is not None, "lods": len(batch.lods), "impostor": batch.impostor}
+        for batch in batches
+    ]
+    arrays = {}
+    for i, batch in enumerate(batches):
+        arrays[f"vertices_{i}"] = batch.vertices
+        arrays[f"triangles_{i}"] = batch.triangles
+        if batch.transforms is not None:
+            arrays[f"transforms_{i}"] = batch.transforms
+        for level, (vertices, triangles) in enumerate(batch.lods):
+            arrays[f"lod_vertices_{i}_{level}"] = vertices
+            arrays[f"lod_triangles_{i}_{level}"] = triangles
+    save_cache(path, key, info = np.array(json.dumps(info)), **arrays)
+
+def load_batches(path, key = None):
+    """
+    Loads saved batches, or returns None if they're missing or were baked from something else
+    """
+    def read(data):
+        info = json.loads(str(data["info"]))
+        return [
+            DetailBatch(
+                batch["texture"], batch["names"], batch["fast"], data[f"vertices_{i}"], data[f"triangles_{i}"],
+                data[f"transforms_{i}"] if batch["instanced"] else None,
+                [(data[f"lod_vertices_{i}_{level}"], data[f"lod_triangles_{i}_{level}"]) for level in range(batch["lods"])],
+                batch["impostor"]
+            )
+            for i, batch in enumerate(info)
+        ]
+    return load_cache(path, read, key)
+
+class TrackDetails(BakedCache):
+    """
+    The detail batches of one track, baked or loaded from the cache the first time they're needed
+    """
+    description = "detail batches"
+
+    def __init__(self, name, details):
+        super().__init__(os.path.join(CACHE_FOLDER, name + ".npz"))
+        # Ursina leaves out models that aren't there, so the batches do too
+        self.details = [detail for detail in details if asset_exists(detail["model"])]
+
+    def key(self):
+        parts = [f"{d['name']}:{d['texture']}:{d['fast']}:{d['impostor']}:{d['position']}:{d['rotation_y']}:{d['scale']}" for d in self.details]
+        return f"{VERSION}|{source_stamp(*(detail['model'] for detail in self.details))}|{';'.join(parts)}"
+
+    def bake(self):
+        return bake_details(self.details)
+
+    def load(self, key):
+        return load_batches(self.path, key)
+
+    def save(self, batches, key):
+        save_batches(self.path, batches, key)
+
+TRACK_DETAILS = {name: TrackDetails(name, spec["details"]) for name, spec in TRACK_SPECS.items()}
+
+def track_details(name):
+    return TRACK_DETAILS[name]
+
+if __name__ == "__main__":
+    import time
+
+    for name, track in TRACK_DETAILS.items():
+        if os.path.isfile(track.path):
+            os.remove(track.path)
+        start = time.perf_counter()
+        batches = track.get()
+        instanced = [batch for batch in batches if batch.transforms is not None]
+        copies = sum(len(batch.transforms) for batch in instanced)
+        vertices = sum(len(batch.vertices) for batch in batches)
+        drawn = sum(len(batch.vertices) * (len(batch.transforms) if batch.transforms is not None else 1) for batch in batches)
+        levels = sum(len(batch.lods) for batch in batches)
+        impostors = sum(batch.impostor for batch in batches)
+        print(f"{name}: {len(track.details)} details in {len(batches)} batches ({copies} copies of {len(instanced)} prototypes, {levels} simpler levels, {impostors} impostors), {vertices} vertices drawn as {drawn} in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,133 @@
+"""
+Ghost car of the best lap.
+
+While a lap is driven the car's transform is sampled at a fixed interval into
+a preallocated buffer, so sampling never allocates. Laps longer than the buffer
+aren't kept. When the lap beats the best one it is kept as a Ghost, saved per
+track and gamemode as a small binary file and played back next to the car on
+the following laps.
+"""
+import os
+import struct
+import numpy as np
+
+MAGIC = b"RLYG"
+VERSION = 1
+
+# Samples per second
+SAMPLE_RATE = 20
+
+# Ten minutes of driving
+CAPACITY = SAMPLE_RATE * 600
+
+_header = struct.Struct("<4sHfIf")
+
+class GhostRecorder:
+    """
+    Samples x, y, z and rotation_y into a preallocated buffer, stopping when it's full
+    """
+    def __init__(self, capacity = CAPACITY, sample_rate = SAMPLE_RATE):
+        # Flat so a sample is four item writes, without creating row views
+        self.buffer = np.zeros(capacity * 4, dtype = np.float32)
+        self.samples = self.buffer.reshape(capacity, 4)
+        self.capacity = capacity
+        self.interval = 1 / sample_rate
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.overflowed = False
+        self.time = 0.0
+        self.next_sample = 0.0
+
+    def update(self, dt, x, y, z, rotation_y):
+        """
+        Advances the lap time and takes the samples that are due
+        """
+        self.time += dt
+        while self.next_sample <= self.time:
+            if self.count == self.capacity:
+                # The lap is longer than the buffer
+                self.overflowed = True
+                return
+            i = self.count * 4
+            buffer = self.buffer
+            buffer[i] = x
+            buffer[i + 1] = y
+            buffer[i + 2] = z
+            buffer[i + 3] = rotation_y
+            self.count += 1
+            self.next_sample += self.interval
+
+    def ghost(self, car_type = ""):
+        """
+        The samples of the lap in order, as a Ghost (None if the lap didn't fit in the buffer)
+        """
+        if self.count == 0 or self.overflowed:
+            return None
+        return Ghost(self.samples[:self.count].copy(), self.interval, self.time, car_type)
+
+class Ghost:
+    """
+    A lap as evenly spaced transform samples
+    """
+    def __init__(self, samples, interval, lap_time, car_type = ""):
+        self.samples = samples
+        self.interval = interval
+        self.lap_time = lap_time
+        self.car_type = car_type
+
+    @property
+    def duration(self):
+        return (len(self.samples) - 1) * self.interval
+
+    def transform_at(self, t):
+        """
+        The interpolated (x, y, z, rotation_y) t seconds into the lap
+        """
+        position = min(max(t / self.interval, 0.0), len(self.samples) - 1)
+        index = int(position)
+        if index >= len(self.samples) - 1:
+            x, y, z, rotation_y = self.samples[-1]
+            return float(x), float(y), float(z), float(rotation_y)
+        f = position - index
+        a = self.samples[index]
+        b = self.samples[index + 1]
+        return (
+            float(a[0] + (b[0] - a[0]) * f),
+            float(a[1] + (b[1] - a[1]) * f),
+            float(a[2] + (b[2] - a[2]) * f),
+            float(a[3] + (b[3] - a[3]) * f),
+        )
+
+    def save(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        car_type = self.car_type.encode("utf-8")
+        with open(path, "wb") as file:
+            file.write(_header.pack(MAGIC, VERSION, self.interval, len(self.samples), self.lap_time))
+            file.write(struct.pack("<B", len(car_type)) + car_type)
+            file.write(self.samples.astype("<f4").tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a saved ghost, or returns None if there is none
+        """
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as file:
+            data = file.read()
+        try:
+            magic, version, interval, count, lap_time = _header.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                return None
+            offset = _header.size
+            length = data[offset]
+            car_type = data[offset + 1:offset + 1 + length].decode("utf-8")
+            offset += 1 + length
+            samples = np.frombuffer(data, dtype = "<f4", count = count * 4, offset = offset).reshape(count, 4).astype(np.float32)
+        except (struct.error, ValueError, IndexError):
+            return None
+        return cls(samples, interval, lap_time, car_type)
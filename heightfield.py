@@ -0,0 +1,391 @@
+"""
+Baked ground heights for the tracks.
+
+Every track mesh is rasterized once into a regular grid of heights and
+normals, so finding the ground under a car is a lookup and a bilinear blend
+instead of a raycast. Bridges and overhangs are kept as a second layer; a
+query uses the highest layer that is not above the car, or the lowest one if
+the car is below all of them. Ground higher than the car stops it the way
+the old sideways raycasts against the track did (stop_at_slopes).
+
+Grids are baked the first time a track is driven on and cached in
+cache/heightfields. To bake every track ahead of time run:
+
+    python heightfield.py
+"""
+import os
+import numpy as np
+
+from objfile import GAME_FOLDER, load_obj, transform_points, source_stamp, save_cache, load_cache, BakedCache
+from track_definitions import TRACK_SPECS
+
+CACHE_FOLDER = os.path.join(GAME_FOLDER, "cache", "heightfields")
+
+# Bump when the bake changes so old caches are rebuilt
+VERSION = 1
+
+CELL_SIZE = 1.0
+LAYERS = 2
+
+# Surfaces closer together than this are treated as the same layer
+LAYER_GAP = 4.0
+
+# How far above the car a surface can be and still count as its ground
+# (the ground just ahead can be a bit higher when driving uphill)
+STEP_HEIGHT = 2.0
+
+INF = float("inf")
+UP = (0.0, 1.0, 0.0)
+
+class Heightfield:
+    """
+    A grid of ground heights and normals
+
+    heights: (layers, rows, columns) float32, NaN where there is no ground
+    normals: (layers, rows, columns, 3) float32
+    Node (row, column) is at x = origin_x + column * cell_size, z = origin_z + row * cell_size
+    """
+    def __init__(self, origin_x, origin_z, cell_size, heights, normals):
+        self.origin_x = float(origin_x)
+        self.origin_z = float(origin_z)
+        self.cell_size = float(cell_size)
+        self.heights = heights
+        self.normals = normals
+        self.rows = heights.shape[1]
+        self.columns = heights.shape[2]
+
+    @classmethod
+    def bake(cls, triangles, cell_size = CELL_SIZE):
+        """
+        Rasterizes world space triangles ((m, 3, 3) array) into a heightfield
+        """
+        triangles = np.asarray(triangles, dtype = np.float64)
+        low = triangles.reshape(-1, 3).min(axis = 0)
+        high = triangles.reshape(-1, 3).max(axis = 0)
+        origin_x = np.floor(low[0] / cell_size) * cell_size
+        origin_z = np.floor(low[2] / cell_size) * cell_size
+        columns = int(np.ceil((high[0] - origin_x) / cell_size)) + 1
+        rows = int(np.ceil((high[2] - origin_z) / cell_size)) + 1
+
+        # Face normals, flipped to point up
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        lengths = np.linalg.norm(normals, axis = 1)
+        usable = (lengths > 1e-9) & (np.abs(normals[:, 1]) > 1e-9)
+        normals[usable] /= lengths[usable, None]
+        normals[normals[:, 1] < 0] *= -1
+
+        sample_nodes = []
+        sample_heights = []
+        sample_triangles = []
+
+        for i in np.nonzero(usable)[0]:
+            a, b, c = triangles[i]
+            # Grid nodes inside the triangle's bounding box
+            first_column = int(np.ceil((min(a[0], b[0], c[0]) - origin_x) / cell_size))
+            last_column = int(np.floor((max(a[0], b[0], c[0]) - origin_x) / cell_size))
+            first_row = int(np.ceil((min(a[2], b[2], c[2]) - origin_z) / cell_size))
+            last_row = int(np.floor((max(a[2], b[2], c[2]) - origin_z) / cell_size))
+            if last_column < first_column or last_row < first_row:
+                continue
+
+            column, row = np.meshgrid(np.arange(first_column, last_column + 1), np.arange(first_row, last_row + 1))
+            column = column.ravel()
+            row = row.ravel()
+            x = origin_x + column * cell_size
+            z = origin_z + row * cell_size
+
+            # Barycentric coordinates on the xz plane
+            area = (b[0] - a[0]) * (c[2] - a[2]) - (c[0] - a[0]) * (b[2] - a[2])
+            if abs(area) < 1e-12:
+                continue
+            u = ((b[0] - x) * (c[2] - z) - (c[0] - x) * (b[2] - z)) / area
+            v = ((c[0] - x) * (a[2] - z) - (a[0] - x) * (c[2] - z)) / area
+            w = 1 - u - v
+            inside = (u >= -1e-9) & (v >= -1e-9) & (w >= -1e-9)
+            if not inside.any():
+                continue
+
+            sample_nodes.append(row[inside] * columns + column[inside])
+            sample_heights.append(u[inside] * a[1] + v[inside] * b[1] + w[inside] * c[1])
+            sample_triangles.append(np.full(inside.sum(), i))
+
+        heights = np.full((LAYERS, rows * columns), np.nan, dtype = np.float32)
+        node_normals = np.zeros((LAYERS, rows * columns, 3), dtype = np.float32)
+        node_normals[..., 1] = 1
+
+        if sample_nodes:
+            nodes = np.concatenate(sample_nodes)
+            node_heights = np.concatenate(sample_heights)
+            node_triangles = np.concatenate(sample_triangles)
+
+            # Highest surface first at every node
+            order = np.lexsort((-node_heights, nodes))
+            nodes = nodes[order]
+            node_heights = node_heights[order]
+            node_triangles = node_triangles[order]
+
+            for layer in range(LAYERS):
+                if len(nodes) == 0:
+                    break
+                first = np.ones(len(nodes), dtype = bool)
+                first[1:] = nodes[1:] != nodes[:-1]
+                heights[layer, nodes[first]] = node_heights[first]
+                node_normals[layer, nodes[first]] = normals[node_triangles[first]]
+
+                # Keep only surfaces clearly below the one just stored
+                top = np.full(rows * columns, np.inf)
+                top[nodes[first]] = node_heights[first]
+                below = node_heights < top[nodes] - LAYER_GAP
+                nodes = nodes[below]
+                node_heights = node_heights[below]
+                node_triangles = node_triangles[below]
+
+        return cls(
+            origin_x, origin_z, cell_size,
+            heights.reshape(LAYERS, rows, columns),
+            node_normals.reshape(LAYERS, rows, columns, 3)
+        )
+
+    def ground(self, x, y, z):
+        """
+        The distance down to the ground, its height and its normal under a point
+        """
+        gx = (x - self.origin_x) / self.cell_size
+        gz = (z - self.origin_z) / self.cell_size
+        column = int(gx // 1)
+        row = int(gz // 1)
+        if column < 0 or row < 0 or column >= self.columns - 1 or row >= self.rows - 1:
+            return INF, y, UP
+        fx = gx - column
+        fz = gz - row
+
+        total_weight = 0.0
+        height = 0.0
+        nx = ny = nz = 0.0
+        for corner_row, corner_column, weight in (
+            (row, column, (1 - fx) * (1 - fz)),
+            (row, column + 1, fx * (1 - fz)),
+            (row + 1, column, (1 - fx) * fz),
+            (row + 1, column + 1, fx * fz),
+        ):
+            for layer in range(LAYERS):
+                corner_height = self.heights[layer, corner_row, corner_column]
+                if corner_height != corner_height:
+                    break
+                if corner_height <= y + STEP_HEIGHT:
+                    normal = self.normals[layer, corner_row, corner_column]
+                    total_weight += weight
+                    height += corner_height * weight
+                    nx += normal[0] * weight
+                    ny += normal[1] * weight
+                    nz += normal[2] * weight
+                    break
+
+        if total_weight <= 0:
+            # The car is below every surface around it (it drove into a hillside):
+            # the lowest of them is the ground, so it stops there instead of falling through
+            for corner_row, corner_column, weight in (
+                (row, column, (1 - fx) * (1 - fz)),
+                (row, column + 1, fx * (1 - fz)),
+                (row + 1, column, (1 - fx) * fz),
+                (row + 1, column + 1, fx * fz),
+            ):
+                for layer in range(LAYERS - 1, -1, -1):
+                    corner_height = self.heights[layer, corner_row, corner_column]
+                    if corner_height == corner_height:
+                        normal = self.normals[layer, corner_row, corner_column]
+                        total_weight += weight
+                        height += corner_height * weight
+                        nx += normal[0] * weight
+                        ny += normal[1] * weight
+                        nz += normal[2] * weight
+                        break
+
+        if total_weight <= 0:
+            return INF, y, UP
+
+        height /= total_weight
+        length = (nx * nx + ny * ny + nz * nz) ** 0.5
+        normal = (float(nx / length), float(ny / length), float(nz / length))
+        return max(y - float(height), 0.0), float(height), normal
+
+    def ground_many(self, x, y, z):
+        """
+        ground() for arrays of points, returns (distance, height, normals)
+        """
+        x = np.asarray(x, dtype = np.float64)
+        y = np.asarray(y, dtype = np.float64)
+        z = np.asarray(z, dtype = np.float64)
+        gx = (x - self.origin_x) / self.cell_size
+        gz = (z - self.origin_z) / self.cell_size
+        column = np.floor(gx).astype(np.int64)
+        row = np.floor(gz).astype(np.int64)
+        outside = (column < 0) | (row < 0) | (column >= self.columns - 1) | (row >= self.rows - 1)
+        column = np.clip(column, 0, self.columns - 2)
+        row = np.clip(row, 0, self.rows - 2)
+        fx = gx - column
+        fz = gz - row
+
+        total_weight = np.zeros_like(x)
+        height = np.zeros_like(x)
+        normal = np.zeros(x.shape + (3, ))
+        for row_offset, column_offset, weight in (
+            (0, 0, (1 - fx) * (1 - fz)),
+            (0, 1, fx * (1 - fz)),
+            (1, 0, (1 - fx) * fz),
+            (1, 1, fx * fz),
+        ):
+            corner_heights = self.heights[:, row + row_offset, column + column_offset]
+            corner_normals = self.normals[:, row + row_offset, column + column_offset]
+            # First layer (from the top) that is not above the point
+            usable = corner_heights <= y + STEP_HEIGHT
+            layer = np.argmax(usable, axis = 0)
+            found = np.take_along_axis(usable, layer[None], axis = 0)[0]
+            weight = np.where(found & ~outside, weight, 0)
+            corner_height = np.take_along_axis(corner_heights, layer[None], axis = 0)[0]
+            corner_normal = np.take_along_axis(corner_normals, layer[None, ..., None], axis = 0)[0]
+            total_weight += weight
+            height += np.where(weight > 0, corner_height, 0) * weight
+            normal += corner_normal * weight[..., None]
+
+        # Points below every surface around them (cars that drove into a hillside)
+        # stand on the lowest of them instead of falling through
+        buried = (total_weight <= 0) & ~outside
+        if buried.any():
+            for row_offset, column_offset, weight in (
+                (0, 0, (1 - fx) * (1 - fz)),
+                (0, 1, fx * (1 - fz)),
+                (1, 0, (1 - fx) * fz),
+                (1, 1, fx * fz),
+            ):
+                corner_heights = self.heights[:, row + row_offset, column + column_offset]
+                corner_normals = self.normals[:, row + row_offset, column + column_offset]
+                present = corner_heights == corner_heights
+                layer = LAYERS - 1 - np.argmax(present[::-1], axis = 0)
+                found = np.take_along_axis(present, layer[None], axis = 0)[0]
+                weight = np.where(found & buried, weight, 0)
+                corner_height = np.take_along_axis(corner_heights, layer[None], axis = 0)[0]
+                corner_normal = np.take_along_axis(corner_normals, layer[None, ..., None], axis = 0)[0]
+                total_weight += weight
+                height += np.where(weight > 0, corner_height, 0) * weight
+                normal += corner_normal * weight[..., None]
+
+        hit = total_weight > 0
+        safe_weight = np.where(hit, total_weight, 1)
+        height = np.where(hit, height / safe_weight, y)
+        normal = np.where(hit[..., None], normal / np.linalg.norm(np.where(hit[..., None], normal, 1), axis = -1, keepdims = True), UP)
+        distance = np.where(hit, np.maximum(y - height, 0), np.inf)
+        return distance, height, normal
+
+    def stop_at_slopes(self, x, y, z, new_x, new_z):
+        """
+        Where a car moving from (x, z) to (new_x, new_z) ends up when ground
+        higher than it (a hillside too steep to drive up) stops it, sliding
+        along x or z alone if one of them is free
+        """
+        start = self.ground(x, y, z)[1]
+        for end_x, end_z in ((new_x, new_z), (new_x, z), (x, new_z)):
+            height = self.ground(end_x, y, end_z)[1]
+            if height <= y or height <= start:
+                return end_x, end_z
+        return x, z
+
+    def stop_at_slopes_many(self, x, y, z, new_x, new_z):
+        """
+        stop_at_slopes() for arrays of cars, returns the new (x, z) arrays
+        """
+        x = np.asarray(x, dtype = np.float64)
+        y = np.asarray(y, dtype = np.float64)
+        z = np.asarray(z, dtype = np.float64)
+        start = self.ground_many(x, y, z)[1]
+        end_x = np.array(x)
+        end_z = np.array(z)
+        moving = np.ones(x.shape, dtype = bool)
+        for try_x, try_z in ((new_x, new_z), (new_x, z), (x, new_z)):
+            try_x = np.broadcast_to(try_x, x.shape)
+            try_z = np.broadcast_to(try_z, x.shape)
+            height = self.ground_many(try_x, y, try_z)[1]
+            free = moving & ((height <= y) | (height <= start))
+            end_x[free] = try_x[free]
+            end_z[free] = try_z[free]
+            moving &= ~free
+            if not moving.any():
+                break
+        return end_x, end_z
+
+    def save(self, path, key = ""):
+        save_cache(
+            path, key,
+            grid = np.array((self.origin_x, self.origin_z, self.cell_size)),
+            heights = self.heights,
+            normals = self.normals.astype(np.float16)
+        )
+
+    @classmethod
+    def load(cls, path, key = None):
+        """
+        Loads a saved heightfield, or returns None if it's missing or was baked from something else
+        """
+        def read(data):
+            origin_x, origin_z, cell_size = data["grid"]
+            return cls(origin_x, origin_z, cell_size, data["heights"], data["normals"].astype(np.float32))
+        return load_cache(path, read, key)
+
+class TrackHeightfield(BakedCache):
+    """
+    The heightfield of one track model, baked or loaded from the cache the first time it's needed
+    """
+    description = "heightfield"
+
+    def __init__(self, model, position = (0, 0, 0), rotation_y = 0, scale = 1, cell_size = CELL_SIZE):
+        super().__init__(os.path.join(CACHE_FOLDER, os.path.splitext(model)[0] + ".npz"))
+        self.model = model
+        self.position = position
+        self.rotation_y = rotation_y
+        self.scale = scale
+        self.cell_size = cell_size
+
+    def key(self):
+        return f"{VERSION}|{source_stamp(self.model)}|{self.position}|{self.rotation_y}|{self.scale}|{self.cell_size}"
+
+    def bake(self):
+        mesh = load_obj(self.model)
+        points = transform_points(mesh.vertices, self.position, self.rotation_y, self.scale)
+        return Heightfield.bake(points[mesh.triangles], self.cell_size)
+
+    def load(self, key):
+        return Heightfield.load(self.path, key)
+
+    def save(self, heightfield, key):
+        heightfield.save(self.path, key)
+
+    def ground(self, x, y, z):
+        return self.get().ground(x, y, z)
+
+    def ground_many(self, x, y, z):
+        return self.get().ground_many(x, y, z)
+
+    def stop_at_slopes(self, x, y, z, new_x, new_z):
+        return self.get().stop_at_slopes(x, y, z, new_x, new_z)
+
+    def stop_at_slopes_many(self, x, y, z, new_x, new_z):
+        return self.get().stop_at_slopes_many(x, y, z, new_x, new_z)
+
+# From the track specs, so they match the track Entities
+TRACK_HEIGHTFIELDS = {
+    name: TrackHeightfield(spec["model"], position = spec["position"], rotation_y = spec["rotation_y"], scale = spec["scale"])
+    for name, spec in TRACK_SPECS.items()
+}
+
+def track_heightfield(name):
+    return TRACK_HEIGHTFIELDS[name]
+
+if __name__ == "__main__":
+    import time
+
+    for name, track in TRACK_HEIGHTFIELDS.items():
+        if os.path.isfile(track.path):
+            os.remove(track.path)
+        start = time.perf_counter()
+        heightfield = track.get()
+        print(f"{name}: {heightfield.columns}x{heightfield.rows} nodes in {time.perf_counter() - start:.2f}s")
@@ -2,21 +2,23 @@ from ursina import *
 from direct.stdpy import thread
 
 from car import Car
-from ai import AICar
+from car_models import preload_car_models
+from ai import AIBatch
+from ai_roster import create_ai_pool, set_ai_count
 
 from multiplayer import Multiplayer
 from main_menu import MainMenu
 
 from sun import SunLight
+from profiler_overlay import ProfilerOverlay
+from race_tracker import RaceTracker
+from car_collider import CarCollider
+from track_loader import TrackLoader
+from trigger_manager import TriggerManager
 
 from achievements import RallyAchievements
 
-from tracks.sand_track import SandTrack
-from tracks.grass_track import GrassTrack
-from tracks.snow_track import SnowTrack
-from tracks.forest_track import ForestTrack
-from tracks.savannah_track import SavannahTrack
-from tracks.lake_track import LakeTrack
+from tracks.track import Track
 
 Text.default_font = "./assets/Roboto.ttf"
 Text.default_resolution = 1080 * Text.size
@@ -43,19 +45,10 @@ else:
 # Starting new thread for assets
 
 def load_assets():
+    # The tracks' own files are loaded by the TrackLoader when they're needed
     models_to_load = [
-        # Cars
-        "sports-car.obj", "muscle-car.obj", "limousine.obj", "lorry.obj", "hatchback.obj", "rally-car.obj",
-        # Tracks
-        "sand_track.obj", "grass_track.obj", "snow_track.obj",
-        "forest_track.obj", "savannah_track.obj", "lake_track.obj", "particles.obj",
-        # Track Bounds
-        "sand_track_bounds.obj", "grass_track_bounds.obj", "snow_track_bounds.obj", 
-        "forest_track_bounds.obj", "savannah_track_bounds.obj", "lake_track_bounds.obj",
-        # Track Details
-        "rocks-sand.obj", "cacti-sand.obj", "trees-grass.obj", "thintrees-grass.obj", "rocks-grass.obj", "grass-grass_track.obj", "trees-snow.obj", 
-        "thintrees-snow.obj", "rocks-snow.obj", "trees-forest.obj", "thintrees-forest.obj", "rocks-savannah.obj", "trees-savannah.obj",
-        "trees-lake.obj", "thintrees-lake.obj", "rocks-lake.obj", "bigrocks-lake.obj", "grass-lake.obj", "lake_bounds.obj",
+        # Particles
+        "particles.obj",
         # Cosmetics
         "viking_helmet.obj", "duck.obj", "banana.obj", "surfinbird.obj", "surfboard.obj"
     ]
@@ -76,13 +69,6 @@ def load_assets():
         "hatchback-red.png", "hatchback-orange.png", "hatchback-green.png", "hatchback-white.png", "hatchback-black.png", "hatchback-blue.png",
         # Rally Car
         "rally-red.png", "rally-orange.png", "rally-green.png", "rally-white.png", "rally-black.png", "rally-blue.png",
-        # Track Textures
-        "sand_track.png", "grass_track.png", "snow_track.png", "forest_track.png",
-        "savannah_track.png", "lake_track.png",
-        # Track Detail Textures
-        "rock-sand.png", "cactus-sand.png", "tree-grass.png", "thintree-grass.png", "rock-grass.png", "grass-grass_track.png", "tree-snow.png", 
-        "thintree-snow.png", "rock-snow.png", "tree-forest.png", "thintree-forest.png", "rock-savannah.png", "tree-savannah.png", 
-        "tree-lake.png", "rock-lake.png", "grass-lake.png", "thintree-lake.png", "bigrock-lake.png",
         # Particle Textures
         "particle_sand_track.png", "particle_grass_track.png", "particle_snow_track", 
         "particle_forest_track.png", "particle_savannah_track.png", "particle_lake_track.png",
@@ -102,43 +88,49 @@ try:
 except Exception as e:
     print("error starting thread", e)
 
-# Car
+# Car (the car models are loaded here, on the main thread, and shared by every car)
+preload_car_models()
 car = Car()
 car.sports_car()
 
-# Tracks
-sand_track = SandTrack(car)
-grass_track = GrassTrack(car)
-snow_track = SnowTrack(car)
-forest_track = ForestTrack(car)
-savannah_track = SavannahTrack(car)
-lake_track = LakeTrack(car)
-
-car.sand_track = sand_track
-car.grass_track = grass_track
-car.snow_track = snow_track
-car.forest_track = forest_track
-car.savannah_track = savannah_track
-car.lake_track = lake_track
+# Tracks, each built from its spec in tracks/
+sand_track = Track(car, "sand_track")
+grass_track = Track(car, "grass_track")
+snow_track = Track(car, "snow_track")
+forest_track = Track(car, "forest_track")
+savannah_track = Track(car, "savannah_track")
+lake_track = Track(car, "lake_track")
+
+tracks = [sand_track, grass_track, snow_track, forest_track, savannah_track, lake_track]
+car.tracks = tracks
+
+# Builds the tracks the first time they're shown and unloads the ones left behind
+track_loader = TrackLoader(tracks)
 
 # AI
-ai_list = []
+ai_batch = AIBatch()
 
-ai = AICar(car, ai_list, sand_track, grass_track, snow_track, forest_track, savannah_track, lake_track)
-ai1 = AICar(car, ai_list, sand_track, grass_track, snow_track, forest_track, savannah_track, lake_track)
-ai2 = AICar(car, ai_list, sand_track, grass_track, snow_track, forest_track, savannah_track, lake_track)
+# Car to car hits, after the player and the AI have moved
+car_collider = CarCollider(car, ai_batch)
 
-ai_list.append(ai)
-ai_list.append(ai1)
-ai_list.append(ai2)
+# Every AI a race can have, made now so starting a race doesn't make any
+ai_list = create_ai_pool(car, ai_batch)
+set_ai_count(ai_list, 1)
 
 car.ai_list = ai_list
 
+# Places of every car in the race
+race_tracker = RaceTracker(car)
+car.race_tracker = race_tracker
+
+# The track's triggers (the lake), for every car on the track
+trigger_manager = TriggerManager(car, race_tracker)
+
 # Main menu
 main_menu = MainMenu(car, ai_list, sand_track, grass_track, snow_track, forest_track, savannah_track, lake_track)
 
 # Achievements
-achievements = RallyAchievements(car, main_menu, sand_track, grass_track, snow_track, forest_track, savannah_track, lake_track)
+achievements = RallyAchievements(car, main_menu, tracks)
 
 # Lighting + shadows
 sun = SunLight(direction = (-0.7, -0.9, 0.5), resolution = 3072, car = car)
@@ -147,15 +139,21 @@ ambient = AmbientLight(color = Vec4(0.5, 0.55, 0.66, 0) * 0.75)
 render.setShaderAuto() # type: ignore
 
 main_menu.sun = sun
+main_menu.track_loader = track_loader
 
 # Sky
 Sky(texture = "sky")
 
+# Frame profiler (F3 to show, F4 to save)
+profiler_overlay = ProfilerOverlay(car)
+
 def update():
     # If multiplayer, Call the Multiplayer class
     if car.multiplayer:
         global multiplayer
         multiplayer = Multiplayer(car)
+        race_tracker.multiplayer = multiplayer
+        car_collider.multiplayer = multiplayer
         car.multiplayer_update = True
         car.multiplayer = False
     
@@ -1,6 +1,8 @@
 from ursina import *
 from ursina import curve
 from server import Server
+from ai_roster import spawn_ai, set_ai_count
+from car_models import set_car_graphics
 import os
 
 Text.default_resolution = 1080 * Text.size
@@ -46,8 +48,9 @@ class MainMenu(Entity):
         self.lake_track = lake_track
         self.ai_list = ai_list
         self.sun = None
+        self.track_loader = None
 
-        self.click = Audio("click.wav", False, False, volume = 10)
+        self.click = car.audio_manager.sound("click.wav", volume = 10, priority = 1)
 
         self.tracks = [
             self.sand_track, self.grass_track, self.snow_track, self.forest_track, self.savannah_track, self.lake_track
@@ -74,48 +77,22 @@ class MainMenu(Entity):
 
         self.car.position = (-80, -42, 18.8)
         self.car.visible = True
-        self.grass_track.enable()
-        for track in self.grass_track.track:
-            track.enable()
-        for detail in self.grass_track.details:
-            detail.enable()
+        self.show_track(self.grass_track)
 
         def singleplayer():
             car.multiplayer = False
             self.start_menu.disable()
             self.main_menu.enable()
-            grass_track.enable()
             self.car.position = (0, 0, 4)
             self.car.visible = False
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.grass_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in self.grass_track.details:
-                    detail.enable()
-            if self.car.graphics == "fast":
-                self.grass_track.grass.disable()
+            self.show_track(self.grass_track)
 
         def multiplayer():
             self.start_menu.disable()
             self.host_menu.enable()
             self.car.visible = True
             self.car.position = (-3, -44.5, 92)
-            grass_track.disable()
-            snow_track.enable()
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.snow_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                self.snow_track.trees.enable()
+            self.show_track(self.snow_track)
 
         def quit():
             application.quit()
@@ -158,37 +135,15 @@ class MainMenu(Entity):
                 self.car.visible = True
                 self.car.position = (-63, -40, -7)
                 self.car.rotation = (0, 90, 0)
-                snow_track.disable()
-                sand_track.enable()
                 back_button_server.disable()
-                for track in self.tracks:
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-                for track in self.sand_track.track:
-                    track.enable()
-                if self.car.graphics != "ultra fast":
-                    for detail in self.sand_track.details:
-                        detail.enable()
+                self.show_track(self.sand_track)
 
         def join_server_func():
             self.host_menu.disable()
             self.server_menu.enable()
             self.car.visible = True
             self.car.position = (-105, -50, -59)
-            snow_track.disable()
-            sand_track.enable()
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.sand_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in self.sand_track.details:
-                    detail.enable()
+            self.show_track(self.sand_track)
 
         def back_host():
             self.host_menu.disable()
@@ -196,20 +151,7 @@ class MainMenu(Entity):
             self.car.position = (-80, -42, 18.8)
             self.car.rotation = (0, 90, 0)
             self.car.visible = True
-            self.grass_track.enable()
-            self.snow_track.disable()
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.grass_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in self.grass_track.details:
-                    detail.enable()
-            if self.car.graphics == "fast":
-                self.grass_track.grass.disable()
+            self.show_track(self.grass_track)
         
         self.car.host_ip = InputField(default_value = "IP", limit_content_to = "0123456789.localhost", color = color.black, alpha = 100, y = 0.1, parent = self.host_menu)
         self.car.host_port = InputField(default_value = "PORT", limit_content_to = "0123456789", color = color.black, alpha = 100, y = 0.02, parent = self.host_menu)
@@ -234,20 +176,7 @@ class MainMenu(Entity):
             self.car.camera_offset = (20, 40, -50)
             camera.rotation = (35, -20, 0)
             self.car.visible = False
-            self.sand_track.disable()
-            self.grass_track.enable()
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.grass_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in self.grass_track.details:
-                    detail.enable()
-            if self.car.graphics == "fast":
-                self.grass_track.grass.disable()
+            self.show_track(self.grass_track)
 
         def stop_server():
             application.quit()
@@ -268,43 +197,19 @@ class MainMenu(Entity):
                 car.multiplayer = True
                 self.server_menu.disable()
                 self.main_menu.enable()
-                grass_track.enable()
-                sand_track.disable()
                 self.car.position = (0, 0, 4)
                 self.car.camera_offset = (20, 40, -50)
                 camera.rotation = (35, -20, 0)
                 self.car.visible = False
                 self.car.connected = False
-                for track in self.tracks:
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-                for track in self.grass_track.track:
-                    track.enable()
-                if self.car.graphics != "ultra fast":
-                    for detail in self.grass_track.details:
-                        detail.enable()
-                if self.car.graphics == "fast":
-                    self.grass_track.grass.disable()
+                self.show_track(self.grass_track)
 
         def back_server():
             self.host_menu.enable()
             self.server_menu.disable()
             self.car.visible = True
             self.car.position = (-3, -44.5, 92)
-            sand_track.disable()
-            snow_track.enable()
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.snow_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in self.snow_track.details:
-                    detail.enable()
+            self.show_track(self.snow_track)
 
         car.username = InputField(default_value = car.username_text, color = color.black, alpha = 100, y = 0.18, parent = self.server_menu)
         car.ip = InputField(default_value = "IP", limit_content_to = "0123456789.localhost", color = color.black, alpha = 100, y = 0.1, parent = self.server_menu)
@@ -321,23 +226,11 @@ class MainMenu(Entity):
             self.car.position = (-80, -42, 18.8)
             self.car.rotation = (0, 90, 0)
             self.car.visible = True
-            self.grass_track.enable()
             self.start_menu.enable()
             self.main_menu.disable()
             if self.car.multiplayer_update:
                 self.car.multiplayer_update = False
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.grass_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in self.grass_track.details:
-                    detail.enable()
-            if self.car.graphics == "fast":
-                self.grass_track.grass.disable()
+            self.show_track(self.grass_track)
 
         title = Entity(model = "quad", scale = (0.5, 0.2, 0.2), texture = "rally-logo", parent = self.main_menu, y = 0.3)
 
@@ -364,21 +257,10 @@ class MainMenu(Entity):
                 
             self.car.position = (0, 0, 4)
             unlocked_text.disable()
+            self.track_loader.load(grass_track)
             for track in self.tracks:
                 track.alpha = 255
-                track.disable()
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.grass_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in self.grass_track.details:
-                    detail.enable()
-            if self.car.graphics == "fast":
-                self.grass_track.grass.disable()
-            grass_track.enable()
+            self.show_track(self.grass_track)
 
         def ai_func():
             self.car.ai = not self.car.ai
@@ -389,498 +271,81 @@ class MainMenu(Entity):
                 ai_button.text = "AI: Off"
                 self.ai_slider.disable()
 
-        def sand_track_func():
-            if sand_track.unlocked:
-                self.car.visible = True
-                mouse.locked = True
-                self.maps_menu.disable()
-                self.car.position = (-63, -30, -7)
-                self.car.rotation = (0, 90, 0)
-                self.car.reset_count_timer.enable()
-                        
-                for track in self.tracks:
-                    track.disable()
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-
-                sand_track.enable()
-                sand_track.played = True
-
-                for s in sand_track.track:
-                    s.enable()
-                    s.alpha = 255
-                if self.car.graphics != "ultra fast":
-                    for detail in sand_track.details:
-                        detail.enable()
-                        detail.alpha = 255
-
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-63, -40, -7) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 65, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.sap1
-                        ai.check_track()
-
-                if self.car.gamemode == "race":
-                    self.car.highscore_count = float(self.car.sand_track_hs)
-                elif self.car.gamemode == "time trial":
-                    self.car.highscore_count = float(self.car.sand_track_laps)
-                elif self.car.gamemode == "drift":
-                    self.car.drift_time = 25
-                    self.car.highscore_count = float(self.car.sand_track_drift)
-                    self.car.highscore.text = str(int(self.car.highscore_count))
-            else:
-                unlocked_text.shake()
-
-        def grass_track_func():
-            if grass_track.unlocked:
-                self.car.visible = True
-                mouse.locked = True
-                self.maps_menu.disable()
-                self.car.position = (-80, -30, 18.5)
-                self.car.rotation = (0, 90, 0)
-                self.car.reset_count_timer.enable()
-
-                for track in self.tracks:
-                    track.disable()
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-
-                grass_track.enable()
-                grass_track.played = True
-
-                for g in grass_track.track:
-                    g.enable()
-                    g.alpha = 255
-                if self.car.graphics != "ultra fast":
-                    for detail in grass_track.details:
-                        detail.enable()
-                        detail.alpha = 255
-                if self.car.graphics == "fast":
-                    grass_track.grass.disable()
-
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-80, -30, 18.5) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.gp1
-                        ai.check_track()
-
-                if self.car.gamemode == "race":
-                    self.car.highscore_count = float(self.car.grass_track_hs)
-                elif self.car.gamemode == "time trial":
-                    self.car.highscore_count = float(self.car.grass_track_laps)
-                elif self.car.gamemode == "drift":
-                    self.car.drift_time = 30
-                    self.car.highscore_count = float(self.car.grass_track_drift)
-                    self.car.highscore.text = str(int(self.car.highscore_count))
-            else:
-                unlocked_text.shake()
-
-        def snow_track_func():
-            if snow_track.unlocked:
-                self.car.visible = True
-                mouse.locked = True
-                self.maps_menu.disable()
-                self.car.position = (-5, -35, 93)
-                self.car.rotation = (0, 90, 0)
-                self.car.reset_count_timer.enable()
-                        
-                for track in self.tracks:
-                    track.disable()
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-
-                snow_track.enable()
-                snow_track.played = True
-
-                for s in snow_track.track:
-                    s.enable()
-                    s.alpha = 255
-                if self.car.graphics != "ultra fast":
-                    for detail in snow_track.details:
-                        detail.enable()
-                        detail.alpha = 255
-
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-5, -40, 90) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.snp1
-                        ai.check_track()
-
-                if self.car.gamemode == "race":
-                    self.car.highscore_count = float(self.car.snow_track_hs)
-                elif self.car.gamemode == "time trial":
-                    self.car.highscore_count = float(self.car.snow_track_laps)
-                elif self.car.gamemode == "drift":
-                    self.car.drift_time = 50
-                    self.car.highscore_count = float(self.car.snow_track_drift)
-                    self.car.highscore.text = str(int(self.car.highscore_count))
-            else:
-                unlocked_text.shake()
-
-        def forest_track_func():
-            if forest_track.unlocked:
-                self.car.visible = True
-                mouse.locked = True
-                self.maps_menu.disable()
-                self.car.position = (12, -35, 76)
-                self.car.rotation = (0, 90, 0)
-                self.car.reset_count_timer.enable()
-
-                for track in self.tracks:
-                    track.disable()
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-
-                forest_track.enable()
-                forest_track.played = True
-                
-                for f in forest_track.track:
-                    f.enable()
-                    f.alpha = 255
-                if self.car.graphics != "ultra fast":
-                    for detail in forest_track.details:
-                        detail.enable()
-                        detail.alpha = 255
-
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (12, -35, 76) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.fp1
-                        ai.check_track()
-
-                if self.car.gamemode == "race":
-                    self.car.highscore_count = float(self.car.forest_track_hs)
-                elif self.car.gamemode == "time trial":
-                    self.car.highscore_count = float(self.car.forest_track_laps)
-                elif self.car.gamemode == "drift":
-                    self.car.drift_time = 40
-                    self.car.highscore_count = float(self.car.forest_track_drift)
-                    self.car.highscore.text = str(int(self.car.highscore_count))
-            else:
-                unlocked_text.shake()
-
-        def savannah_track_func():
-            if savannah_track.unlocked:
-                self.car.visible = True
-                mouse.locked = True
-                self.maps_menu.disable()
-                self.car.position = (-14, -35, 42)
-                self.car.rotation = (0, 90, 0)
-                self.car.reset_count_timer.enable()
-
-                for track in self.tracks:
-                    track.disable()
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-
-                savannah_track.enable()
-                savannah_track.played = True
-
-                for s in savannah_track.track:
-                    s.enable()
-                    s.alpha = 255
-                if self.car.graphics != "ultra fast":
-                    for detail in savannah_track.details:
-                        detail.enable()
-                        detail.alpha = 255
-
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-14, -35, 42) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.svp1
-                        ai.check_track()
-
-                if self.car.gamemode == "race":
-                    self.car.highscore_count = float(self.car.savannah_track_hs)
-                elif self.car.gamemode == "time trial":
-                    self.car.highscore_count = float(self.car.savannah_track_laps)
-                elif self.car.gamemode == "drift":
-                    self.car.drift_time = 25
-                    self.car.highscore_count = float(self.car.savannah_track_drift)
-                    self.car.highscore.text = str(int(self.car.highscore_count))
-            else:
+        def track_func(track):
+            """
+            Starts driving on a track picked in the maps menu, if it's unlocked
+            """
+            if not track.unlocked:
                 unlocked_text.shake()
-            
-        def lake_track_func():
-            if lake_track.unlocked:
-                self.car.visible = True
-                mouse.locked = True
-                self.maps_menu.disable()
-                self.car.position = (-121, -40, 158)
-                self.car.rotation = (0, 90, 0)
-                self.car.reset_count_timer.enable()
+                return
+            self.car.visible = True
+            mouse.locked = True
+            self.maps_menu.disable()
+            self.car.position = track.spawn_position
+            self.car.rotation = (0, track.spawn_rotation_y, 0)
+            self.car.reset_count_timer.enable()
 
-                for track in self.tracks:
-                    track.disable()
-                    for i in track.track:
-                        i.disable()
-                    for i in track.details:
-                        i.disable()
-
-                lake_track.enable()
-                lake_track.played = True
-
-                for l in lake_track.track:
-                    l.enable()
-                    l.alpha = 255
-                if self.car.graphics != "ultra fast":
-                    for detail in lake_track.details:
-                        detail.enable()
-                        detail.alpha = 255
-                if self.car.graphics == "fast":
-                    lake_track.grass.disable()
-                    lake_track.rocks.disable()
+            self.show_track(track)
+            track.played = True
+            self.car.race_tracker.restart()
 
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-121, -40, 158) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.lp1
-                        ai.check_track()
+            for part in track.track:
+                part.alpha = 255
+            for detail in track.details:
+                detail.alpha = 255
 
-                if self.car.gamemode == "race":
-                    self.car.highscore_count = float(self.car.lake_track_hs)
-                elif self.car.gamemode == "time trial":
-                    self.car.highscore_count = float(self.car.lake_track_laps)
-                elif self.car.gamemode == "drift":
-                    self.car.drift_time = 75
-                    self.car.highscore_count = float(self.car.lake_track_drift)
-                    self.car.highscore.text = str(int(self.car.highscore_count))
-            else:
-                unlocked_text.shake()
+            if self.car.multiplayer_update == False and self.car.ai:
+                spawn_ai(ai_list, track)
 
-        def sand_track_hover():
-            for track in self.tracks:
-                track.disable()
-                for i in track.track:
-                    if track != sand_track:
-                        i.disable()
-                    else:
-                        i.enable()
-                if self.car.graphics != "ultra fast":
-                    for i in track.details:
-                        if track != sand_track:
-                            i.disable()
-                        else:
-                            i.enable()
-            sand_track.enable()
-            self.car.position = (-40, 30, -175)
-            unlocked_text.disable()
             if self.car.gamemode == "race":
-                highscore_text.enable()
-                highscore_text.text = "Highscore: " + str(round(self.car.sand_track_hs, 2)) + "\n Mandaw: 13.09"
-
-        def grass_track_hover():
-            for track in self.tracks:
-                track.disable()
-                for i in track.track:
-                    if track != grass_track:
-                        i.disable()
-                    else:
-                        i.enable()
-                if self.car.graphics != "ultra fast":
-                    for i in track.details:
-                        if track != grass_track:
-                            i.disable()
-                        else:
-                            i.enable()
-                if self.car.graphics == "fast":
-                    grass_track.grass.disable()
-            grass_track.enable()
-            self.car.position = (20, 30, -100)
-            if grass_track.unlocked == False:
-                grass_track.alpha = 200
-                unlocked_text.enable()
-                unlocked_text.text = "Get Less Than 22 seconds on Sand Track"
-                highscore_text.disable()
-                for i in grass_track.track:
-                    i.alpha = 200
-                for i in grass_track.details:
-                    i.alpha = 200
-            else:
-                if self.car.gamemode == "race":
-                    highscore_text.enable()
-                    highscore_text.text = "Highscore: " + str(round(self.car.grass_track_hs, 2)) + "\n Mandaw: 15.55"
-                unlocked_text.disable()
-                grass_track.alpha = 255
+                self.car.highscore_count = float(getattr(self.car, f"{track.name}_hs"))
+            elif self.car.gamemode == "time trial":
+                self.car.highscore_count = float(getattr(self.car, f"{track.name}_laps"))
+            elif self.car.gamemode == "drift":
+                self.car.drift_time = track.drift_time
+                self.car.highscore_count = float(getattr(self.car, f"{track.name}_drift"))
+                self.car.highscore.text = str(int(self.car.highscore_count))
 
-        def snow_track_hover():
-            for track in self.tracks:
-                track.disable()
-                for i in track.track:
-                    if track != snow_track:
-                        i.disable()
-                    else:
-                        i.enable()
-                if self.car.graphics != "ultra fast":
-                    for i in track.details:
-                        if track != snow_track:
-                            i.disable()
-                        else:
-                            i.enable()
-            snow_track.enable()
-            self.car.position = (20, 30, -80)
-            if snow_track.unlocked == False:
-                snow_track.alpha = 200
+        def track_hover(track):
+            """
+            Shows a track behind the maps menu with its highscore, or what unlocks it
+            """
+            if not self.track_loader.ready(track, Func(track_hover, track)):
+                return
+            self.show_track(track)
+            self.car.position = track.preview_position
+            if track.unlocked == False:
+                track.alpha = 200
                 unlocked_text.enable()
-                unlocked_text.text = "Get Less Than 23 seconds on Grass Track"
+                unlocked_text.text = unlock_text(track)
                 highscore_text.disable()
-                for i in snow_track.track:
-                    i.alpha = 200
-                for i in snow_track.details:
-                    i.alpha = 200
-            else:
-                if self.car.gamemode == "race":
-                    highscore_text.enable()
-                    highscore_text.text = "Highscore: " + str(round(self.car.snow_track_hs, 2)) + "\n Mandaw: 27.41"
-                unlocked_text.disable()
-                snow_track.alpha = 255
-        
-        def forest_track_hover():
-            for track in self.tracks:
-                track.disable()
                 for i in track.track:
-                    if track != forest_track:
-                        i.disable()
-                    else:
-                        i.enable()
-                if self.car.graphics != "ultra fast":
-                    for i in track.details:
-                        if track != forest_track:
-                            i.disable()
-                        else:
-                            i.enable()
-            forest_track.enable()
-            self.car.position = (50, 30, -100)
-            if forest_track.unlocked == False:
-                forest_track.alpha = 200
-                unlocked_text.enable()
-                unlocked_text.text = "Get Less Than 40 seconds on Snow Track"
-                highscore_text.disable()
-                for i in forest_track.track:
                     i.alpha = 200
-                for i in forest_track.details:
-                    i.alpha = 200
-            else:
-                if self.car.gamemode == "race":
-                    highscore_text.enable()
-                    highscore_text.text = "Highscore: " + str(round(self.car.forest_track_hs, 2)) + "\n Mandaw: 21.73"
-                unlocked_text.disable()
-                forest_track.alpha = 255
-
-        def savannah_track_hover():
-            for track in self.tracks:
-                track.disable()
-                for i in track.track:
-                    if track != savannah_track:
-                        i.disable()
-                    else:
-                        i.enable()
-                if self.car.graphics != "ultra fast":
-                    for i in track.details:
-                        if track != savannah_track:
-                            i.disable()
-                        else:
-                            i.enable()
-            savannah_track.enable()
-            self.car.position = (25, 30, -130)
-            if savannah_track.unlocked == False:
-                savannah_track.alpha = 200
-                unlocked_text.enable()
-                unlocked_text.text = "Get Less Than 32 seconds on Forest Track"
-                highscore_text.disable()
-                for i in savannah_track.track:
-                    i.alpha = 200
-                for i in savannah_track.details:
+                for i in track.details:
                     i.alpha = 200
             else:
                 if self.car.gamemode == "race":
                     highscore_text.enable()
-                    highscore_text.text = "Highscore: " + str(round(self.car.savannah_track_hs, 2)) + "\n Mandaw: 12.31"
+                    highscore_text.text = "Highscore: " + str(round(getattr(self.car, f"{track.name}_hs"), 2)) + "\n Mandaw: " + str(track.spec["achievements"]["mandaw"]["under"])
                 unlocked_text.disable()
-                savannah_track.alpha = 255
+                track.alpha = 255
 
-        def lake_track_hover():
-            for track in self.tracks:
-                track.disable()
-                for i in track.track:
-                    if track != lake_track:
-                        i.disable()
-                    else:
-                        i.enable()
-                if self.car.graphics != "ultra fast":
-                    for i in track.details:
-                        if track != lake_track:
-                            i.disable()
-                        else:
-                            i.enable()
-                if self.car.graphics == "fast":
-                    lake_track.grass.disable()
-                    lake_track.rocks.disable()
-            lake_track.enable()
-            self.car.position = (140, 200, -350)
-            if lake_track.unlocked == False:
-                lake_track.alpha = 200
-                unlocked_text.enable()
-                unlocked_text.text = "Get Less Than 20 seconds on Savannah Track"
-                highscore_text.disable()
-                for i in lake_track.track:
-                    i.alpha = 200
-                for i in lake_track.details:
-                    i.alpha = 200
-            else:
-                if self.car.gamemode == "race":
-                    highscore_text.enable()
-                    highscore_text.text = "Highscore: " + str(round(self.car.lake_track_hs, 2)) + "\n Mandaw: 39.45"
-                unlocked_text.disable()
-                lake_track.alpha = 255
+        def unlock_text(track):
+            """
+            What unlocks a track: a quick enough lap on the track before it (its spec's unlock_next)
+            """
+            for other in self.tracks:
+                unlock_next = other.spec["achievements"].get("unlock_next")
+                if unlock_next is not None and unlock_next["track"] == track.name:
+                    return f"Get Less Than {unlock_next['under']} seconds on {other.title}"
+            return ""
 
         start_button = Button(text = "Start Game", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.02, parent = self.main_menu)
-        sand_track_button = Button(text = "Sand Track", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.3, x = -0.5, parent = self.maps_menu)
-        grass_track_button = Button(text = "Grass Track", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.3, x = 0, parent = self.maps_menu)
-        snow_track_button = Button(text = "Snow Track", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.3, x = 0.5, parent = self.maps_menu)
-        forest_track_button = Button(text = "Forest Track", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.1, x = -0.5, parent = self.maps_menu)
-        savannah_track_button = Button(text = "Savannah Track", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.1, x = 0, parent = self.maps_menu)
-        lake_track_button = Button(text = "Lake Track", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.1, x = 0.5, parent = self.maps_menu)
+        # A button per track, three to a row in the order of the specs
+        for i, track in enumerate(self.tracks):
+            track_button = Button(text = track.title, color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.3 - i // 3 * 0.2, x = -0.5 + i % 3 * 0.5, parent = self.maps_menu)
+            track_button.on_mouse_enter = Func(track_hover, track)
+            track_button.on_click = Func(track_func, track)
         back_button = Button(text = "<- Back", color = color.gray, scale_y = 0.05, scale_x = 0.2, y = 0.45, x = -0.65, parent = self.maps_menu)
         
         unlocked_text = Text("Get Less Than 20 seconds on Sand Track to Unlock Grass Track", scale = 1.5, color = color.orange, line_height = 2, origin = 0, y = -0.1, parent = self.maps_menu)
@@ -890,7 +355,7 @@ class MainMenu(Entity):
         highscore_text.disable()
 
         ai_button = Button(text = "AI: Off", color = color.light_gray, scale_y = 0.1, scale_x = 0.3, y = -0.28, x = 0, parent = self.maps_menu)
-        self.ai_slider = Slider(min = 1, max = 3, default = 1, text = "AI", y = -0.4, x = -0.3, scale = 1.3, parent = self.maps_menu, dynamic = True)
+        self.ai_slider = Slider(min = 1, max = len(ai_list), default = 1, text = "AI", y = -0.4, x = -0.3, scale = 1.3, parent = self.maps_menu, dynamic = True)
         self.ai_slider.step = 1
         self.ai_slider.disable()
 
@@ -908,20 +373,7 @@ class MainMenu(Entity):
         self.leaderboard_background.disable()
         self.leaderboard_title.disable()
 
-        sand_track_button.on_mouse_enter = Func(sand_track_hover)
-        grass_track_button.on_mouse_enter = Func(grass_track_hover)
-        snow_track_button.on_mouse_enter = Func(snow_track_hover)
-        forest_track_button.on_mouse_enter = Func(forest_track_hover)
-        savannah_track_button.on_mouse_enter = Func(savannah_track_hover)
-        lake_track_button.on_mouse_enter = Func(lake_track_hover)
-
         start_button.on_click = Func(start)
-        sand_track_button.on_click = Func(sand_track_func)
-        grass_track_button.on_click = Func(grass_track_func)
-        snow_track_button.on_click = Func(snow_track_func)
-        forest_track_button.on_click = Func(forest_track_func)
-        savannah_track_button.on_click = Func(savannah_track_func)
-        lake_track_button.on_click = Func(lake_track_func)
         ai_button.on_click = Func(ai_func)
         back_button.on_click = Func(back)
 
@@ -1025,31 +477,30 @@ class MainMenu(Entity):
         def graphics():
             if self.car.graphics == "fancy":
                 self.car.graphics = "fast"
+                set_car_graphics(self.car.graphics)
                 self.car.particle_amount = 0.085
                 graphics_button.text = "Graphics: Fast"
                 for track in self.tracks:
                     if track.enabled:
-                        for detail in track.details:
-                            detail.enable()
-                        grass_track.grass.disable()
+                        track.show_details(self.car.graphics)
                 self.sun.resolution = 2048
             elif self.car.graphics == "fast":
                 self.car.graphics = "ultra fast"
+                set_car_graphics(self.car.graphics)
                 self.car.particle_amount = 0.1
                 graphics_button.text = "Graphics: Ultra Fast"
                 for track in self.tracks:
                     if track.enabled:
-                        for detail in track.details:
-                            detail.disable()
+                        track.show_details(self.car.graphics)
                 self.sun.resolution = 1024
             elif self.car.graphics == "ultra fast":
                 self.car.graphics = "fancy"
+                set_car_graphics(self.car.graphics)
                 self.car.particle_amount = 0.07
                 graphics_button.text = "Graphics: Fancy"
                 for track in self.tracks:
                     if track.enabled:
-                        for detail in track.details:
-                            detail.enable()
+                        track.show_details(self.car.graphics)
                 self.sun.resolution = 3072
             self.sun.update_resolution()
 
@@ -1198,97 +649,15 @@ class MainMenu(Entity):
             self.pause_menu.disable()
 
         def respawn():
-            if sand_track.enabled:
-                self.car.position = (-63, -40, -7)
-                self.car.rotation = (0, 90, 0)
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        ai.disable()
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-63, -45, -7) + (random.randint(-5, 5), random.randint(-3, 5), random.randint(-5, 5))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.sap1
-                        ai.speed = 0
-                        ai.velocity_y = 0
-            elif grass_track.enabled:
-                self.car.position = (-80, -30, 18.5)
-                self.car.rotation = (0, 90, 0)
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        ai.disable()
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-80, -30, 18.5) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.gp1
-                        ai.speed = 0
-                        ai.velocity_y = 0
-            elif snow_track.enabled:
-                self.car.position = (-5, -35, 93)
-                self.car.rotation = (0, 90, 0)
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        ai.disable()
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-5, -40, 90) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.snp1
-                        ai.speed = 0
-                        ai.velocity_y = 0
-            elif forest_track.enabled:
-                self.car.position = (12, -35, 76)
-                self.car.rotation = (0, 90, 0)
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        ai.disable()
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (12, -40, 73) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_car()
-                        ai.set_random_texture()
-                        ai.next_path = ai.fp1
-                        ai.speed = 0
-                        ai.velocity_y = 0
-            elif savannah_track.enabled:
-                self.car.position = (-14, -35, 42)
-                self.car.rotation = (0, 90, 0)
+            track = self.car.active_track()
+            if track is not None:
+                self.car.position = track.spawn_position
+                self.car.rotation = (0, track.spawn_rotation_y, 0)
                 if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        ai.disable()
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-14, -35, 42) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_texture()
-                        ai.next_path = ai.svp1
-                        ai.speed = 0
-                        ai.velocity_y = 0
-            elif self.lake_track.enabled:
-                self.car.position = (-121, -40, 158)
-                self.car.rotation = (0, 90, 0)
-                if self.car.multiplayer_update == False and self.car.ai:
-                    for ai in ai_list:
-                        ai.disable()
-                        if ai.set_enabled:
-                            ai.enable()
-                        ai.position = (-121, -40, 158) + (random.randint(-2, 2), random.randint(-2, 2), random.randint(-2, 2))
-                        ai.rotation = (0, 90, 0)
-                        ai.set_random_texture()
-                        ai.next_path = ai.lp1
-                        ai.speed = 0
-                        ai.velocity_y = 0
+                    spawn_ai(ai_list, track)
             camera.world_rotation_y = self.car.rotation_y
             self.car.speed = 0
-            self.car.anti_cheat = 1
+            self.car.race_tracker.restart_lap(self.car)
             self.car.velocity_y = 0
             if self.car.gamemode == "race":
                 self.car.count = 0.0
@@ -1310,9 +679,9 @@ class MainMenu(Entity):
             self.car.start_sound = True
             if self.car.audio:
                 if self.car.skid_sound.playing:
-                    self.car.skid_sound.stop(False)
+                    self.car.skid_sound.stop()
                 if self.car.dirt_sound.playing:
-                    self.car.dirt_sound.stop(False)
+                    self.car.dirt_sound.stop()
 
         def main_menu():
             self.car.position = (0, 0, 4)
@@ -1330,26 +699,13 @@ class MainMenu(Entity):
             self.car.start_time = False
             self.car.reset_count_timer.disable()
             self.car.timer_running = False
-            self.car.anti_cheat = 1
+            self.car.race_tracker.restart_lap(self.car)
             self.main_menu.enable()
             self.pause_menu.disable()
+            self.track_loader.load(grass_track)
             for track in self.tracks:
-                track.disable()
                 track.alpha = 255
-                for i in track.track:
-                    if track != self.grass_track:
-                        i.disable()
-                    else:
-                        i.enable()
-                if self.car.graphics != "ultra fast":
-                    for i in track.details:
-                        if track != grass_track:
-                            i.disable()
-                        else:
-                            i.enable()
-                if self.car.graphics == "fast":
-                    grass_track.grass.disable()
-            grass_track.enable()
+            self.show_track(self.grass_track)
             if self.car.multiplayer_update == False and self.car.ai:
                 for ai in ai_list:
                     ai.disable()
@@ -1362,9 +718,9 @@ class MainMenu(Entity):
             self.car.start_sound = True
             if self.car.audio:
                 if self.car.skid_sound.playing:
-                    self.car.skid_sound.stop(False)
+                    self.car.skid_sound.stop()
                 if self.car.dirt_sound.playing:
-                    self.car.dirt_sound.stop(False)
+                    self.car.dirt_sound.stop()
                 
         p_resume_button = Button(text = "Resume", color = color.black, scale_y = 0.1, scale_x = 0.3, y = 0.11, parent = self.pause_menu)
         p_respawn_button = Button(text = "Respawn", color = color.black, scale_y = 0.1, scale_x = 0.3, y = -0.01, parent = self.pause_menu)
@@ -1382,20 +738,7 @@ class MainMenu(Entity):
             self.car.camera_offset = (20, 40, -50)
             camera.rotation = (35, -20, 0)
             self.car.visible = False
-            grass_track.enable()
-            sand_track.disable()
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.grass_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in grass_track.details:
-                    detail.enable()
-            if self.car.graphics == "fast":
-                grass_track.grass.disable()
+            self.show_track(self.grass_track)
 
             self.car.highscore_count = float(self.car.grass_track_hs)
 
@@ -1407,18 +750,7 @@ class MainMenu(Entity):
             self.colours_menu.disable()
             self.car.visible = True
             self.car.position = (-105, -50, -59)
-            grass_track.disable()
-            sand_track.enable()
-            for track in self.tracks:
-                for i in track.track:
-                    i.disable()
-                for i in track.details:
-                    i.disable()
-            for track in self.sand_track.track:
-                track.enable()
-            if self.car.graphics != "ultra fast":
-                for detail in sand_track.details:
-                    detail.enable()
+            self.show_track(self.sand_track)
 
         def cars_menu():
             self.cars_menu.enable()
@@ -1810,6 +1142,20 @@ class MainMenu(Entity):
         self.connected.disable()
         self.not_connected.disable()
 
+    def show_track(self, track):
+        """
+        Shows one track behind the menus with its parts and details, and hides the others
+        """
+        for other in self.tracks:
+            other.disable()
+            for part in other.track:
+                part.disable()
+            other.hide_details()
+        track.enable()
+        for part in track.track:
+            part.enable()
+        track.show_details(self.car.graphics)
+
     def garage_locked_text(self, warning):
         self.garage_unlocked_text.enable()
         self.garage_unlocked_text.text = warning
@@ -1825,21 +1171,7 @@ class MainMenu(Entity):
         # AI Slider
         if self.car.multiplayer_update == False:
             if self.ai_slider.enabled:
-                if self.ai_slider.value == 0: 
-                    for ai in self.ai_list:
-                        ai.set_enabled = False
-                elif self.ai_slider.value == 1:
-                    self.ai_list[0].set_enabled = True
-                    self.ai_list[1].set_enabled = False
-                    self.ai_list[2].set_enabled = False
-                elif self.ai_slider.value == 2:
-                    self.ai_list[0].set_enabled = True
-                    self.ai_list[1].set_enabled = True
-                    self.ai_list[2].set_enabled = False
-                elif self.ai_slider.value == 3:
-                    self.ai_list[0].set_enabled = True
-                    self.ai_list[1].set_enabled = True
-                    self.ai_list[2].set_enabled = True
+                set_ai_count(self.ai_list, int(self.ai_slider.value))
 
         # Set the camera's position and make the car rotate
         if self.start_menu.enabled or self.host_menu.enabled or self.garage_menu.enabled or self.server_menu.enabled or self.quit_menu.enabled:
@@ -1877,7 +1209,7 @@ class MainMenu(Entity):
         if self.car.multiplayer_update:
             for menu in self.menus:
                 if menu.enabled == False:
-                    if self.sand_track.enabled or self.grass_track.enabled or self.snow_track.enabled or self.forest_track.enabled or self.savannah_track.enabled:
+                    if self.car.active_track() is not None:
                         invoke(self.start_leaderboard, delay = 0.1)
                 else:
                     for l in self.leaderboard_texts:
@@ -0,0 +1,172 @@
+"""
+Simpler versions of a mesh, for drawing it far away.
+
+decimate() collapses edges of a mesh until it has the triangles it was asked
+for, cheapest first. What an edge costs is how far collapsing it moves the
+surface: every point keeps the planes of the triangles around it (a quadric)
+and an edge collapses onto whichever end moves them the least. Edges along the
+open border of a mesh also keep a plane standing up along them, so outlines
+(the edges of a leaf, the bottom of a rock) hold their shape.
+
+An edge collapses one end onto the other, so the points that are left are
+points of the original mesh and every corner keeps its own normal, uv and
+colour. Collapses that would turn a triangle over are skipped.
+
+Doesn't use Ursina, meshes are simplified when they're baked (detail_batch.py,
+car_lod.py).
+"""
+import numpy as np
+
+# Triangles of the simpler levels, as parts of the full mesh's
+LOD_RATIOS = (0.5, 0.25)
+
+# A level isn't worth keeping with fewer triangles than this, or if it has most of the last level's
+MIN_TRIANGLES = 4
+MIN_REDUCTION = 0.8
+
+# How much more moving an open border costs than moving the surface
+BORDER_WEIGHT = 10
+
+# A collapse can't turn a triangle further than this (cosine between its normals)
+MAX_TURN = 0.2
+
+def face_planes(points, faces):
+    """
+    The plane (a, b, c, d) of every triangle and its area
+    """
+    a, b, c = (points[faces[:, i]] for i in range(3))
+    normals = np.cross(b - a, c - a)
+    length = np.linalg.norm(normals, axis = 1)
+    normals = normals / np.maximum(length, 1e-12)[:, None]
+    planes = np.column_stack((normals, -(normals * a).sum(axis = 1)))
+    return planes, length / 2
+
+def point_quadrics(points, faces):
+    """
+    The quadric of every point: the planes of its triangles, weighted by their area, and of the open borders it's on
+    """
+    quadrics = np.zeros((len(points), 4, 4))
+    planes, areas = face_planes(points, faces)
+    face_quadrics = areas[:, None, None] * planes[:, :, None] * planes[:, None, :]
+    for i in range(3):
+        np.add.at(quadrics, faces[:, i], face_quadrics)
+
+    # Edges only one triangle uses are open borders
+    edges = np.concatenate((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]))
+    owner = np.tile(np.arange(len(faces)), 3)
+    ordered = np.sort(edges, axis = 1)
+    unique, inverse, counts = np.unique(ordered, axis = 0, return_inverse = True, return_counts = True)
+    border = counts[inverse.reshape(-1)] == 1
+    if border.any():
+        a = points[edges[border, 0]]
+        b = points[edges[border, 1]]
+        along = b - a
+        normals = np.cross(along, planes[owner[border], :3])
+        normals /= np.maximum(np.linalg.norm(normals, axis = 1), 1e-12)[:, None]
+        border_planes = np.column_stack((normals, -(normals * a).sum(axis = 1)))
+        weights = BORDER_WEIGHT * (along * along).sum(axis = 1)
+        border_quadrics = weights[:, None, None] * border_planes[:, :, None] * border_planes[:, None, :]
+        np.add.at(quadrics, edges[border, 0], border_quadrics)
+        np.add.at(quadrics, edges[border, 1], border_quadrics)
+    return quadrics
+
+def decimate(vertices, triangles, target):
+    """
+    A simpler version of an indexed mesh with about target triangles.
+
+    vertices: (n, columns) rows with the position in the first three columns
+    triangles: (m, 3) indices into vertices
+
+    Returns (vertices, triangles) laid out the same way. Corners that share a
+    position move together, so seams between uvs or normals stay closed.
+    """
+    points, point_of = np.unique(vertices[:, :3].astype(np.float64), axis = 0, return_inverse = True)
+    point_of = point_of.reshape(-1)
+    faces = point_of[triangles]
+    alive = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+    quadrics = point_quadrics(points, faces[alive])
+    homogeneous = np.column_stack((points, np.ones(len(points))))
+    merged_into = np.arange(len(points))
+
+    while alive.sum() > target:
+        live = np.flatnonzero(alive)
+        live_faces = faces[live]
+
+        # Every edge collapses onto the end that costs less
+        edges = np.unique(np.sort(np.concatenate((live_faces[:, [0, 1]], live_faces[:, [1, 2]], live_faces[:, [2, 0]])), axis = 1), axis = 0)
+        combined = quadrics[edges[:, 0]] + quadrics[edges[:, 1]]
+        cost = np.stack([np.einsum("ei,eij,ej->e", homogeneous[edges[:, i]], combined, homogeneous[edges[:, i]]) for i in range(2)], axis = 1)
+        keep_second = cost[:, 1] < cost[:, 0]
+        keep = np.where(keep_second, edges[:, 1], edges[:, 0])
+        remove = np.where(keep_second, edges[:, 0], edges[:, 1])
+        order = np.argsort(cost.min(axis = 1), kind = "stable")
+
+        faces_of = {}
+        for face, corners in zip(live, live_faces):
+            for point in corners:
+                faces_of.setdefault(point, []).append(face)
+
+        # As many collapses as don't touch each other's triangles, until there are few enough
+        remaining = len(live)
+        locked = np.zeros(len(points), dtype = bool)
+        collapsed = 0
+        for edge in order:
+            a = keep[edge]
+            b = remove[edge]
+            if locked[a] or locked[b]:
+                continue
+            around = np.array(faces_of[b])
+            moved = around[(faces[around] != a).all(axis = 1)]
+            if len(moved):
+                before = faces[moved]
+                after = np.where(before == b, a, before)
+                old, old_area = face_planes(points, before)
+                new, new_area = face_planes(points, after)
+                if ((old[:, :3] * new[:, :3]).sum(axis = 1) < MAX_TURN).any() or (new_area <= 1e-12).any():
+                    continue
+
+            faces[around] = np.where(faces[around] == b, a, faces[around])
+            gone = around[(faces[around, 0] == faces[around, 1]) | (faces[around, 1] == faces[around, 2]) | (faces[around, 2] == faces[around, 0])]
+            alive[gone] = False
+            quadrics[a] += quadrics[b]
+            merged_into[b] = a
+            for face in faces_of[a] + faces_of[b]:
+                locked[faces[face]] = True
+            collapsed += 1
+            remaining -= len(gone)
+            if remaining <= target:
+                break
+        if not collapsed:
+            break
+
+    # Every corner moves to the point its own point was merged into
+    while True:
+        next_point = merged_into[merged_into]
+        if np.array_equal(next_point, merged_into):
+            break
+        merged_into = next_point
+    moved = vertices.copy()
+    moved[:, :3] = points[merged_into[point_of]]
+
+    kept = triangles[alive]
+    rows, index = np.unique(moved[kept.ravel()], axis = 0, return_inverse = True)
+    return rows, index.reshape(-1, 3).astype(triangles.dtype)
+
+def lod_chain(vertices, triangles, ratios = LOD_RATIOS):
+    """
+    The simpler levels of a mesh, (vertices, triangles) each, leaving out levels that wouldn't be much simpler
+    """
+    levels = []
+    full = len(triangles)
+    last = full
+    for ratio in ratios:
+        target = max(int(full * ratio), MIN_TRIANGLES)
+        if target > last * MIN_REDUCTION:
+            continue
+        level = decimate(vertices, triangles, target)
+        if len(level[1]) > last * MIN_REDUCTION:
+            break
+        levels.append(level)
+        vertices, triangles = level
+        last = len(triangles)
+    return levels
@@ -0,0 +1,307 @@
+"""
+Reads .obj models into NumPy arrays without going through Ursina, so track
+geometry can be baked offline or on a headless server.
+
+Vertices come out the way Ursina's own importer produces them (x is mirrored),
+and transform_points() applies an Entity's position, rotation_y and scale, so
+the results line up with what is drawn in game.
+
+Also holds what the baked caches (heightfields, wall fields, detail batches
+and car levels) share: saving and loading their .npz files and BakedCache,
+which bakes or loads one of them the first time it's needed.
+"""
+import os
+import math
+import zipfile
+import threading
+import numpy as np
+
+GAME_FOLDER = os.path.dirname(os.path.abspath(__file__))
+ASSET_FOLDER = os.path.join(GAME_FOLDER, "assets")
+
+# Floats per corner from mesh_corners(): position, normal, uv and colour
+CORNER_STRIDE = 12
+
+WHITE = (1.0, 1.0, 1.0, 1.0)
+
+_asset_paths = {}
+
+def find_asset(name):
+    """
+    Finds a file anywhere in the assets folder, like Ursina does for models
+    """
+    if name not in _asset_paths:
+        _asset_paths[name] = None
+        for root, dirs, files in os.walk(ASSET_FOLDER):
+            if name in files:
+                _asset_paths[name] = os.path.join(root, name)
+                break
+    if _asset_paths[name] is None:
+        raise FileNotFoundError(f"missing asset: '{name}'")
+    return _asset_paths[name]
+
+class ObjMesh:
+    """
+    Triangles of an .obj file
+
+    vertices: (n, 3) float array
+    triangles: (m, 3) vertex indices
+    uvs: (k, 2) float array
+    uv_triangles: (m, 3) uv indices, -1 where the file has none
+    groups: list of (material, first triangle, end triangle) for every usemtl block
+    normals: (j, 3) float array, mirrored like the vertices
+    normal_triangles: (m, 3) normal indices, -1 where the file has none
+    colors: the diffuse (Kd) colour of every material in the .mtl file next to the .obj
+    """
+    def __init__(self, vertices, triangles, uvs, uv_triangles, groups, normals = None, normal_triangles = None, colors = None):
+        self.vertices = vertices
+        self.triangles = triangles
+        self.uvs = uvs
+        self.uv_triangles = uv_triangles
+        self.groups = groups
+        self.normals = normals if normals is not None else np.zeros((0, 3))
+        self.normal_triangles = normal_triangles if normal_triangles is not None else np.full(triangles.shape, -1, dtype = np.int32)
+        self.colors = colors if colors is not None else {}
+
+    def triangle_points(self):
+        """
+        The corners of every triangle as an (m, 3, 3) array
+        """
+        return self.vertices[self.triangles]
+
+def load_obj(name):
+    """
+    Loads an .obj file from the assets folder (or a path)
+    """
+    path = name if os.path.isfile(name) else find_asset(name)
+
+    vertices = []
+    uvs = []
+    normals = []
+    triangles = []
+    uv_triangles = []
+    normal_triangles = []
+    groups = []
+    material = None
+    group_start = 0
+
+    with open(path, "r") as obj:
+        for line in obj:
+            if line.startswith("v "):
+                x, y, z = line[2:].split()[:3]
+                vertices.append((-float(x), float(y), float(z)))
+            elif line.startswith("vt "):
+                u, v = line[3:].split()[:2]
+                uvs.append((float(u), float(v)))
+            elif line.startswith("vn "):
+                x, y, z = line[3:].split()[:3]
+                normals.append((-float(x), float(y), float(z)))
+            elif line.startswith("f "):
+                corners = line[2:].split()
+                face = []
+                face_uvs = []
+                face_normals = []
+                for corner in corners:
+                    parts = corner.split("/")
+                    face.append(int(parts[0]) - 1)
+                    face_uvs.append(int(parts[1]) - 1 if len(parts) > 1 and parts[1] else -1)
+                    face_normals.append(int(parts[2]) - 1 if len(parts) > 2 and parts[2] else -1)
+                # Same triangulation as Ursina's importer
+                if len(face) == 3:
+                    order = ((0, 1, 2), )
+                elif len(face) == 4:
+                    order = ((0, 1, 2), (2, 3, 0))
+                else:
+                    order = tuple((i, i + 1, 0) for i in range(1, len(face) - 1))
+                for a, b, c in order:
+                    triangles.append((face[a], face[b], face[c]))
+                    uv_triangles.append((face_uvs[a], face_uvs[b], face_uvs[c]))
+                    normal_triangles.append((face_normals[a], face_normals[b], face_normals[c]))
+            elif line.startswith("usemtl "):
+                if material is not None and len(triangles) > group_start:
+                    groups.append((material, group_start, len(triangles)))
+                material = line[7:].strip()
+                group_start = len(triangles)
+
+    if material is not None and len(triangles) > group_start:
+        groups.append((material, group_start, len(triangles)))
+
+    return ObjMesh(
+        np.array(vertices, dtype = np.float64).reshape(-1, 3),
+        np.array(triangles, dtype = np.int32).reshape(-1, 3),
+        np.array(uvs, dtype = np.float64).reshape(-1, 2),
+        np.array(uv_triangles, dtype = np.int32).reshape(-1, 3),
+        groups,
+        np.array(normals, dtype = np.float64).reshape(-1, 3),
+        np.array(normal_triangles, dtype = np.int32).reshape(-1, 3),
+        load_mtl_colors(os.path.splitext(path)[0] + ".mtl")
+    )
+
+def load_mtl_colors(path):
+    """
+    The diffuse colour of every material in an .mtl file as (r, g, b, 1), like Ursina's importer reads them
+    """
+    colors = {}
+    if not os.path.isfile(path):
+        return colors
+    material = None
+    with open(path, "r") as mtl:
+        for line in mtl:
+            if line.startswith("newmtl "):
+                material = line[7:].strip()
+            elif line.startswith("Kd ") and material is not None:
+                r, g, b = line[3:].split()[:3]
+                colors[material] = (float(r), float(g), float(b), 1.0)
+    return colors
+
+def asset_exists(name):
+    """
+    Whether a file is in the assets folder (or is a path)
+    """
+    try:
+        return os.path.isfile(name) or bool(find_asset(name))
+    except FileNotFoundError:
+        return False
+
+def rotation_y_matrix(rotation_y):
+    """
+    The matrix Ursina uses for an Entity's rotation_y (clockwise seen from above)
+    """
+    r = math.radians(rotation_y)
+    c = math.cos(r)
+    s = math.sin(r)
+    return np.array((
+        (c, 0, -s),
+        (0, 1, 0),
+        (s, 0, c),
+    ))
+
+def transform_points(points, position = (0, 0, 0), rotation_y = 0, scale = 1):
+    """
+    Moves model space points into world space like an Entity with this transform
+    """
+    if np.isscalar(scale):
+        scale = (scale, scale, scale)
+    points = np.asarray(points, dtype = np.float64) * np.asarray(scale, dtype = np.float64)
+    return points @ rotation_y_matrix(rotation_y) + np.asarray(position, dtype = np.float64)
+
+def mesh_corners(mesh, position = (0, 0, 0), rotation_y = 0, scale = 1):
+    """
+    Every corner of every triangle of a mesh, moved like transform_points(), as
+    (m * 3, CORNER_STRIDE) float32 rows the way Ursina's importer builds them:
+    the file's normals (flat ones where it has none), uvs and material colours
+    """
+    count = len(mesh.triangles)
+    if np.isscalar(scale):
+        scale = (scale, scale, scale)
+
+    positions = transform_points(mesh.vertices, position, rotation_y, scale)[mesh.triangles]
+
+    # The file's normals, or flat ones where it has none
+    a, b, c = (positions[:, i] for i in range(3))
+    flat = np.cross(b - a, c - a)
+    normals = np.repeat(flat[:, None], 3, axis = 1)
+    if len(mesh.normals):
+        given = mesh.normal_triangles >= 0
+        file_normals = (mesh.normals[np.maximum(mesh.normal_triangles, 0)] / np.asarray(scale, dtype = np.float64)) @ rotation_y_matrix(rotation_y)
+        normals = np.where(given[..., None], file_normals, normals)
+    normals /= np.maximum(np.linalg.norm(normals, axis = -1, keepdims = True), 1e-12)
+
+    uvs = np.zeros((count, 3, 2))
+    if len(mesh.uvs):
+        given = mesh.uv_triangles >= 0
+        uvs = np.where(given[..., None], mesh.uvs[np.maximum(mesh.uv_triangles, 0)], 0)
+
+    colors = np.tile(WHITE, (count, 3, 1))
+    for material, start, end in mesh.groups:
+        colors[start:end] = mesh.colors.get(material, WHITE)
+
+    return np.concatenate((positions, normals, uvs, colors), axis = -1).reshape(-1, CORNER_STRIDE).astype(np.float32)
+
+def source_stamp(*names):
+    """
+    Size and modification time of source files, for invalidating baked caches
+    """
+    stamp = []
+    for name in names:
+        path = name if os.path.isfile(name) else find_asset(name)
+        info = os.stat(path)
+        stamp.append(f"{os.path.basename(path)}:{info.st_size}:{int(info.st_mtime)}")
+    return ";".join(stamp)
+
+def save_cache(path, key = "", **arrays):
+    """
+    Saves baked arrays to a compressed .npz file along with the key they were baked from.
+    It's written next to the cache and swapped in, so a crash never leaves half a file
+    """
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        np.savez_compressed(file, key = np.array(key), **arrays)
+    os.replace(temporary, path)
+
+def load_cache(path, read, key = None):
+    """
+    Opens a saved .npz cache and returns read(data), or None if it's missing, was
+    baked from something else or can't be read, so it's baked again
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path) as data:
+            if key is not None and str(data["key"]) != key:
+                return None
+            return read(data)
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+
+class BakedCache:
+    """
+    Something baked from asset files, loaded from its cache file or baked (and
+    cached) the first time it's needed
+
+    Subclasses give key(), what the bake depends on, bake(), and load()/save()
+    of the baked value with load_cache()/save_cache().
+    """
+    # What's baked, for the message when it can't be cached
+    description = "baked data"
+
+    def __init__(self, path):
+        self.path = path
+        self.value = None
+
+        # The maps menu reads tracks on a background thread (track_loader.py) while
+        # the one being shown may need the same file, only one of them bakes it
+        self.lock = threading.Lock()
+
+    def key(self):
+        raise NotImplementedError
+
+    def bake(self):
+        raise NotImplementedError
+
+    def load(self, key):
+        raise NotImplementedError
+
+    def save(self, value, key):
+        raise NotImplementedError
+
+    def get(self):
+        with self.lock:
+            if self.value is None:
+                key = self.key()
+                self.value = self.load(key)
+                if self.value is None:
+                    self.value = self.bake()
+                    try:
+                        self.save(self.value, key)
+                    except OSError as e:
+                        print(f"couldn't cache {self.description}", e)
+            return self.value
+
+    def release(self):
+        """
+        Drops the baked value; the next get() loads it from the cache again
+        """
+        with self.lock:
+            self.value = None
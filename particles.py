@@ -13,21 +13,12 @@ class Particles(Entity):
         self.car = car
         self.direction = Vec3(random.random(), random.random(), random.random())
 
-        if hasattr(self.car, "sand_track"):
-            if car.sand_track.enabled:
-                self.texture = "particle_sand_track.png"
-            elif car.grass_track.enabled:
-                self.texture = "particle_grass_track.png"
-            elif car.snow_track.enabled:
-                self.texture = "particle_snow_track.png"
-            elif car.forest_track.enabled:
-                self.texture = "particle_forest_track.png"
-            elif car.savannah_track.enabled:
-                self.texture = "particle_savannah_track.png"
-            elif car.lake_track.enabled:
-                self.texture = "particle_lake_track.png"
-            else:
-                self.texture = "particle_sand_track.png"
+        # The active track's dirt, sand's in the menus
+        track = getattr(self.car, "current_track", None)
+        if track is not None and track.enabled:
+            self.texture = track.particle_texture
+        else:
+            self.texture = "particle_sand_track.png"
 
     def update(self):
         self.position += self.direction * 5 * time.dt
@@ -0,0 +1,315 @@
+"""
+Render independent vehicle dynamics.
+
+The car's handling is a plain CarState that is advanced by step() at a fixed
+tick rate. Nothing in here touches Ursina, so the same code runs in the game,
+on a headless server or in a benchmark. The game interpolates between the last
+two ticks when drawing the car.
+
+step() asks a "world" object about the track:
+
+    world.ground(x, y, z) -> (distance, ground_y, normal)
+        distance straight down to the ground (inf if there is none), the height
+        of the ground and its normal as an (x, y, z) tuple
+
+    world.move(x, y, z, dx, dz, radius_x, radius_z) -> (x, z)
+        moves the car by (dx, dz), stopping it at walls and hillsides
+"""
+import math
+
+TICK_RATE = 120
+TICK = 1 / TICK_RATE
+
+# Stops a long frame (loading, window drag) from running hundreds of ticks
+MAX_TICKS_PER_FRAME = 12
+
+INF = float("inf")
+UP = (0.0, 1.0, 0.0)
+
+class CarInputs:
+    """
+    The controls the car reads each tick
+    """
+    __slots__ = ("forward", "left", "brake", "right", "handbrake")
+
+    def __init__(self, forward = False, left = False, brake = False, right = False, handbrake = False):
+        self.forward = forward
+        self.left = left
+        self.brake = brake
+        self.right = right
+        self.handbrake = handbrake
+
+class CarState:
+    """
+    Everything the dynamics need to advance a car by one tick
+    """
+    __slots__ = (
+        # Transform
+        "x", "y", "z", "rotation_y", "pivot_rotation_y", "scale",
+        # Motion
+        "speed", "velocity_y", "rotation_speed", "drift_speed",
+        # Handling
+        "topspeed", "acceleration", "braking_strength", "friction", "drift_amount", "turning_speed",
+        "min_drift_speed", "max_drift_speed", "max_rotation_speed", "steering_amount",
+        # Results of the last tick
+        "driving", "braking", "on_ground", "touching_ground", "hitting_wall", "ground_distance", "ground_normal",
+    )
+
+    def __init__(self, position = (0, 0, 0), rotation_y = 0):
+        self.x, self.y, self.z = position
+        self.rotation_y = rotation_y
+        self.pivot_rotation_y = rotation_y
+        self.scale = (1, 1, 1)
+
+        self.speed = 0
+        self.velocity_y = 0
+        self.rotation_speed = 0
+        self.drift_speed = 35
+
+        self.topspeed = 30
+        self.acceleration = 0.35
+        self.braking_strength = 30
+        self.friction = 0.6
+        self.drift_amount = 4.5
+        self.turning_speed = 5
+        self.min_drift_speed = 20
+        self.max_drift_speed = 40
+        self.max_rotation_speed = 2.6
+        self.steering_amount = 8
+
+        self.driving = False
+        self.braking = False
+        self.on_ground = False
+        self.touching_ground = False
+        self.hitting_wall = False
+        self.ground_distance = INF
+        self.ground_normal = UP
+
+    @property
+    def position(self):
+        return (self.x, self.y, self.z)
+
+    @position.setter
+    def position(self, value):
+        self.x, self.y, self.z = value
+
+    @property
+    def pivot_rotation_distance(self):
+        return self.rotation_y - self.pivot_rotation_y
+
+    def copy_from(self, other):
+        """
+        Copies every value of another state into this one
+        """
+        for name in CarState.__slots__:
+            setattr(self, name, getattr(other, name))
+
+    def copy(self):
+        state = CarState.__new__(CarState)
+        state.copy_from(self)
+        return state
+
+class FlatWorld:
+    """
+    An endless flat ground without walls, for running the dynamics without a track
+    """
+    def __init__(self, height = 0):
+        self.height = height
+
+    def ground(self, x, y, z):
+        distance = y - self.height
+        if distance < 0:
+            return INF, self.height, UP
+        return distance, self.height, UP
+
+    def move(self, x, y, z, dx, dz, radius_x, radius_z):
+        return x + dx, z + dz
+
+class TrackWorld:
+    """
+    A track's baked heightfield and wall field, for running the dynamics without Ursina
+    """
+    def __init__(self, heightfield, walls = None):
+        self.heightfield = heightfield
+        self.walls = walls
+
+    def ground(self, x, y, z):
+        return self.heightfield.ground(x, y, z)
+
+    def move(self, x, y, z, dx, dz, radius_x, radius_z):
+        if self.walls is None:
+            new_x, new_z = x + dx, z + dz
+        else:
+            new_x, new_z = self.walls.move(x, y, z, dx, dz, max(radius_x, radius_z))
+        return self.heightfield.stop_at_slopes(x, y, z, new_x, new_z)
+
+class FixedTimestep:
+    """
+    Turns variable frame times into a whole number of fixed ticks
+    """
+    def __init__(self, tick = TICK, max_ticks = MAX_TICKS_PER_FRAME):
+        self.tick = tick
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+
+    def advance(self, dt):
+        """
+        Adds the frame time and returns how many ticks should be run
+        """
+        self.accumulator += dt
+        ticks = int(self.accumulator / self.tick)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick
+        return ticks
+
+    @property
+    def alpha(self):
+        """
+        How far the frame is between the last tick and the next one (0 - 1)
+        """
+        return self.accumulator / self.tick
+
+    def reset(self):
+        self.accumulator = 0.0
+
+def step(state, inputs, dt, world):
+    """
+    Advances the car by one tick of length dt
+    """
+    # Drifting: the pivot the car moves along follows the car's rotation
+    pivot_rotation_distance = state.rotation_y - state.pivot_rotation_y
+    if state.pivot_rotation_y > state.rotation_y:
+        state.pivot_rotation_y -= (state.drift_speed * ((state.pivot_rotation_y - state.rotation_y) / 40)) * dt
+        if state.speed > 1 or state.speed < -1:
+            state.speed += pivot_rotation_distance / state.drift_amount * dt
+        state.rotation_speed -= 1 * dt
+        if pivot_rotation_distance >= 50 or pivot_rotation_distance <= -50:
+            state.drift_speed += pivot_rotation_distance / 5 * dt
+        else:
+            state.drift_speed -= pivot_rotation_distance / 5 * dt
+    if state.pivot_rotation_y < state.rotation_y:
+        state.pivot_rotation_y += (state.drift_speed * ((state.rotation_y - state.pivot_rotation_y) / 40)) * dt
+        if state.speed > 1 or state.speed < -1:
+            state.speed -= pivot_rotation_distance / state.drift_amount * dt
+        state.rotation_speed += 1 * dt
+        if pivot_rotation_distance >= 50 or pivot_rotation_distance <= -50:
+            state.drift_speed -= pivot_rotation_distance / 5 * dt
+        else:
+            state.drift_speed += pivot_rotation_distance / 5 * dt
+
+    movement_y = state.velocity_y / 50
+
+    ground_distance, ground_y, ground_normal = world.ground(state.x, state.y, state.z)
+    state.ground_distance = ground_distance
+    state.on_ground = ground_distance <= 5
+
+    if state.on_ground:
+        # Driving
+        if inputs.forward:
+            state.speed += state.acceleration * 50 * dt
+            state.speed += -state.velocity_y * 4 * dt
+            state.driving = True
+        else:
+            state.driving = False
+            if state.speed > 1:
+                state.speed -= state.friction * 5 * dt
+            elif state.speed < -1:
+                state.speed += state.friction * 5 * dt
+
+        # Braking
+        if inputs.brake:
+            state.speed -= state.braking_strength * dt
+            state.drift_speed -= 20 * dt
+            state.braking = True
+        else:
+            state.braking = False
+
+        # Hand Braking
+        if inputs.handbrake:
+            if state.rotation_speed < 0:
+                state.rotation_speed -= 3 * dt
+            elif state.rotation_speed > 0:
+                state.rotation_speed += 3 * dt
+            state.drift_speed -= 40 * dt
+            state.speed -= 20 * dt
+            state.max_rotation_speed = 3.0
+
+    # Steering
+    state.rotation_y += state.rotation_speed * 50 * dt
+
+    if state.rotation_speed > 0:
+        state.rotation_speed -= state.speed / 6 * dt
+    elif state.rotation_speed < 0:
+        state.rotation_speed += state.speed / 6 * dt
+
+    if state.speed > 1 or state.speed < -1:
+        if inputs.left:
+            state.rotation_speed -= state.steering_amount * dt
+            state.drift_speed -= 5 * dt
+            if state.speed > 1:
+                state.speed -= state.turning_speed * dt
+            elif state.speed < 0:
+                state.speed += state.turning_speed / 5 * dt
+        elif inputs.right:
+            state.rotation_speed += state.steering_amount * dt
+            state.drift_speed -= 5 * dt
+            if state.speed > 1:
+                state.speed -= state.turning_speed * dt
+            elif state.speed < 0:
+                state.speed += state.turning_speed / 5 * dt
+        else:
+            state.drift_speed += 15 * dt
+            if state.rotation_speed > 0:
+                state.rotation_speed -= 5 * dt
+            elif state.rotation_speed < 0:
+                state.rotation_speed += 5 * dt
+    else:
+        state.rotation_speed = 0
+
+    # Cap the speed
+    if state.speed >= state.topspeed:
+        state.speed = state.topspeed
+    if state.speed <= -15:
+        state.speed = -15
+    if state.speed <= 0:
+        state.pivot_rotation_y = state.rotation_y
+
+    # Cap the drifting
+    if state.drift_speed <= state.min_drift_speed:
+        state.drift_speed = state.min_drift_speed
+    if state.drift_speed >= state.max_drift_speed:
+        state.drift_speed = state.max_drift_speed
+
+    # Cap the steering
+    if state.rotation_speed >= state.max_rotation_speed:
+        state.rotation_speed = state.max_rotation_speed
+    if state.rotation_speed <= -state.max_rotation_speed:
+        state.rotation_speed = -state.max_rotation_speed
+
+    # Gravity
+    if ground_distance <= state.scale[1] * 1.7 + abs(movement_y):
+        state.velocity_y = 0
+        state.touching_ground = True
+        state.ground_normal = ground_normal
+        # Check if hitting a wall or steep slope
+        if ground_normal[1] > 0.7 and ground_y - state.y < 0.5:
+            # Set the y value to the ground's y value
+            state.y = ground_y + 1.4
+            state.hitting_wall = False
+        else:
+            state.hitting_wall = True
+    else:
+        state.y += movement_y * 50 * dt
+        state.velocity_y -= 50 * dt
+        state.touching_ground = False
+
+    # Movement along the pivot's forward direction
+    heading = math.radians(state.pivot_rotation_y)
+    movement_x = math.sin(heading) * state.speed * dt
+    movement_z = math.cos(heading) * state.speed * dt
+
+    if movement_x != 0 or movement_z != 0:
+        state.x, state.z = world.move(state.x, state.y, state.z, movement_x, movement_z, state.scale[0] / 2, state.scale[2] / 2)
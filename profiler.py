@@ -0,0 +1,126 @@
+"""
+Named section timers for finding what takes up a frame.
+
+Code marks where a section starts and the timer runs until the next section or
+end():
+
+    profiler.section("car.camera")
+    ...
+    profiler.section("car.audio")
+    ...
+    profiler.end()
+
+Time spent in a section is added up over the frame; frame() closes the frame
+and keeps its totals. While the profiler is disabled section() and end() only
+check a flag and return. Doesn't use Ursina, so it works headless too.
+"""
+import os
+import csv
+from collections import deque
+from time import perf_counter
+
+enabled = False
+
+# Frames kept for averages and CSV dumps (a minute at 60 fps)
+HISTORY = 3600
+
+# How much of the average a new frame replaces
+SMOOTHING = 0.05
+
+_current = None
+_started = 0.0
+_totals = {}
+_averages = {}
+_history = deque(maxlen = HISTORY)
+_frame = 0
+
+def section(name):
+    """
+    Ends the running section and starts timing a new one
+    """
+    global _current, _started
+    if not enabled:
+        return
+    now = perf_counter()
+    if _current is not None:
+        _totals[_current] = _totals.get(_current, 0.0) + now - _started
+    _current = name
+    _started = now
+
+def end():
+    """
+    Ends the running section
+    """
+    global _current
+    if not enabled or _current is None:
+        return
+    _totals[_current] = _totals.get(_current, 0.0) + perf_counter() - _started
+    _current = None
+
+def frame():
+    """
+    Closes the frame: keeps its totals and updates the averages
+    """
+    global _frame
+    if not enabled:
+        return
+    end()
+    _frame += 1
+    for name, total in _totals.items():
+        average = _averages.get(name)
+        _averages[name] = total if average is None else average + (total - average) * SMOOTHING
+    for name in _averages:
+        if name not in _totals:
+            _averages[name] *= 1 - SMOOTHING
+    _history.append((_frame, dict(_totals)))
+    _totals.clear()
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled, _current
+    enabled = False
+    _current = None
+    _totals.clear()
+
+def toggle():
+    if enabled:
+        disable()
+    else:
+        enable()
+    return enabled
+
+def reset():
+    """
+    Forgets the averages and the kept frames
+    """
+    global _frame
+    _averages.clear()
+    _history.clear()
+    _totals.clear()
+    _frame = 0
+
+def averages():
+    """
+    (name, average milliseconds per frame) of every section, slowest first
+    """
+    return sorted(((name, seconds * 1000) for name, seconds in _averages.items()), key = lambda item: -item[1])
+
+def dump_csv(path, **columns):
+    """
+    Writes the kept frames to a CSV file, one row per frame and one column per
+    section in milliseconds. Extra keyword arguments (track, graphics tier, ...)
+    are added as columns to every row.
+    """
+    names = sorted({name for frame_number, totals in _history for name in totals})
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok = True)
+    with open(path, "w", newline = "") as file:
+        writer = csv.writer(file)
+        writer.writerow(list(columns) + ["frame"] + names)
+        for frame_number, totals in _history:
+            writer.writerow(list(columns.values()) + [frame_number] + [round(totals.get(name, 0.0) * 1000, 4) for name in names])
+    return path
@@ -0,0 +1,62 @@
+from ursina import *
+import profiler
+
+# Shows the profiler's section timings under the FPS counter
+# F3 switches the profiler on and off, F4 saves the kept frames as CSV
+class ProfilerOverlay(Text):
+    def __init__(self, car):
+        super().__init__(
+            parent = camera.ui,
+            text = "",
+            position = window.top_right + Vec2(-0.01, -0.06),
+            origin = (0.5, 0.5),
+            scale = 0.75,
+            color = color.white,
+            background = True
+        )
+
+        self.car = car
+        self.refresh_time = 0
+        self.refresh_rate = 0.5
+
+        # Where the CSV dumps go
+        path = os.path.dirname(sys.argv[0])
+        self.profile_path = os.path.join(path, "./profiles")
+
+        self.visible = profiler.enabled
+
+    def update(self):
+        if not profiler.enabled:
+            return
+        profiler.frame()
+
+        # Redrawing text is slow, only refresh it a few times a second
+        self.refresh_time += time.dt
+        if self.refresh_time >= self.refresh_rate:
+            self.refresh_time = 0
+            lines = [f"{name:<16} {ms:6.2f} ms" for name, ms in profiler.averages()]
+            self.text = "\n".join(lines) if lines else "profiling..."
+
+    def toggle(self):
+        profiler.toggle()
+        profiler.reset()
+        self.visible = profiler.enabled
+        self.text = "profiling..."
+
+    def dump(self):
+        """
+        Saves the kept frames to profiles/<track>_<graphics>.csv
+        """
+        track = self.car.active_track_name() or "menu"
+        graphics = self.car.graphics.replace(" ", "_")
+        try:
+            path = profiler.dump_csv(os.path.join(self.profile_path, f"{track}_{graphics}.csv"), track = track, graphics = self.car.graphics)
+            print("saved profile to", path)
+        except OSError as e:
+            print("couldn't save profile", e)
+
+    def input(self, key):
+        if key == "f3":
+            self.toggle()
+        elif key == "f4" and profiler.enabled:
+            self.dump()
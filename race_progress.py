@@ -0,0 +1,181 @@
+"""
+Race progress of every car, measured along the track's racing line.
+
+Each tick every car is projected onto the line in one vectorized pass: the
+samples around the one each car was nearest to last tick are searched for all
+cars at once, and the car is projected onto the line between them. How far the
+car moved along the line is added to its distance from the finish line, so
+the distance keeps counting up through the laps and the standings are the cars
+sorted by it.
+
+Doesn't use Ursina, the race tracker passes in the positions.
+"""
+import numpy as np
+
+from racing_line import BEHIND, AHEAD, LOST_DISTANCE, wrap_angle
+
+# Moving further along the line than this in one tick is a reset or respawn, not driving
+JUMP_DISTANCE = 30
+
+# Facing more than this many degrees away from the line, and not moving forwards along it...
+WRONG_WAY_ANGLE = 100
+
+# ...for this many seconds is driving the wrong way
+WRONG_WAY_TIME = 1.0
+
+class RaceProgress:
+    """
+    Lap counts and progress round a racing line for any number of cars
+    """
+    def __init__(self, line, finish = None):
+        self.line = line
+        self.length = line.length
+        self.window = np.arange(-BEHIND, AHEAD + 1)
+
+        # Segments from every sample to the next
+        self.segments = np.roll(line.positions, -1, axis = 0)[:, [0, 2]] - line.positions[:, [0, 2]]
+        self.segment_lengths_squared = np.maximum((self.segments ** 2).sum(axis = 1), 1e-9)
+
+        # Distances are counted from the finish line, or from the start of the line
+        self.finish = line.distance(line.nearest(*finish)) if finish is not None else 0.0
+
+        self.keys = []
+        self.slots = {}
+        self.resize(0)
+
+    def resize(self, count):
+        self.index = np.zeros(count, dtype = np.int64)
+        self.arc = np.zeros(count)
+        self.distance = np.zeros(count)
+        self.wrong_way_time = np.zeros(count)
+        self.wrong_way = np.zeros(count, dtype = bool)
+        self.place = np.zeros(count, dtype = np.int64)
+
+    def realign(self, keys, x, z):
+        """
+        Keeps the progress of cars that were already tracked and starts the new ones where they are
+        """
+        old_slots = self.slots
+        old = (self.index, self.arc, self.distance, self.wrong_way_time, self.wrong_way)
+        self.keys = list(keys)
+        self.slots = {key: i for i, key in enumerate(self.keys)}
+        self.resize(len(self.keys))
+
+        for i, key in enumerate(self.keys):
+            slot = old_slots.get(key)
+            if slot is not None:
+                self.index[i], self.arc[i], self.distance[i], self.wrong_way_time[i], self.wrong_way[i] = (value[slot] for value in old)
+            else:
+                self.index[i] = self.line.nearest(x[i], z[i])
+                self.arc[i] = self.project(self.index[i:i + 1], x[i:i + 1], z[i:i + 1])[0]
+                self.distance[i] = self.from_finish(self.arc[i])
+
+    def from_finish(self, arc):
+        """
+        How far past the finish line a point on the line is, between half a lap behind and half a lap ahead
+        """
+        return (arc - self.finish + self.length / 2) % self.length - self.length / 2
+
+    def nearest(self, index, x, z):
+        """
+        The sample nearest to every car, searching around the last ones
+        """
+        line = self.line
+        candidates = (index[:, None] + self.window) % line.count
+        dx = line.x[candidates] - x[:, None]
+        dz = line.z[candidates] - z[:, None]
+        d = dx * dx + dz * dz
+        best = np.argmin(d, axis = 1)
+        rows = np.arange(len(index))
+        nearest = candidates[rows, best]
+
+        # Cars that were moved are searched for on the whole line
+        lost = d[rows, best] > LOST_DISTANCE * LOST_DISTANCE
+        if lost.any():
+            d = (line.x - x[lost, None]) ** 2 + (line.z - z[lost, None]) ** 2
+            nearest[lost] = np.argmin(d, axis = 1)
+        return nearest
+
+    def project(self, index, x, z):
+        """
+        How far round the line each car is, projected onto the segment after
+        its nearest sample, or the one before if it is behind the sample
+        """
+        line = self.line
+        count = line.count
+        before = (index - 1) % count
+        start = np.where(self.along(index, x, z) >= 0, index, before)
+        t = np.clip(self.along(start, x, z), 0, 1)
+        return (line.arc[start] + t * np.sqrt(self.segment_lengths_squared[start])) % self.length
+
+    def along(self, start, x, z):
+        """
+        Where each car lies along the segment after a sample, 0 at the sample and 1 at the next
+        """
+        line = self.line
+        segment = self.segments[start]
+        return ((x - line.x[start]) * segment[:, 0] + (z - line.z[start]) * segment[:, 1]) / self.segment_lengths_squared[start]
+
+    def update(self, keys, x, z, rotation_y, dt):
+        """
+        Moves every car (keys, any hashable, in the same order as the arrays) along the line
+        """
+        x = np.asarray(x, dtype = np.float64)
+        z = np.asarray(z, dtype = np.float64)
+        rotation_y = np.asarray(rotation_y, dtype = np.float64)
+        if keys != self.keys:
+            self.realign(keys, x, z)
+        if not self.keys:
+            return
+
+        self.index = self.nearest(self.index, x, z)
+        arc = self.project(self.index, x, z)
+        moved = (arc - self.arc + self.length / 2) % self.length - self.length / 2
+        self.arc = arc
+
+        # Resets and respawns keep the laps already done and start again from where the car is now
+        jumped = np.abs(moved) > JUMP_DISTANCE
+        laps = np.floor((self.distance + self.length / 2) / self.length)
+        self.distance = np.where(jumped, laps * self.length + self.from_finish(arc), self.distance + moved)
+
+        # Wrong way: facing backwards along the line without making progress
+        facing = np.abs(wrap_angle(rotation_y - self.line.headings[self.index])) > WRONG_WAY_ANGLE
+        backwards = facing & (moved <= 0) & ~jumped
+        self.wrong_way_time = np.where(backwards, self.wrong_way_time + dt, 0)
+        self.wrong_way = self.wrong_way_time >= WRONG_WAY_TIME
+
+        # Places, 1 for the leader
+        self.place[np.argsort(-self.distance, kind = "stable")] = np.arange(1, len(self.keys) + 1)
+
+    @property
+    def laps(self):
+        """
+        Laps finished by every car
+        """
+        return np.maximum(np.floor(self.distance / self.length), 0).astype(np.int64)
+
+    @property
+    def fraction(self):
+        """
+        How far through its current lap every car is, 0 to 1
+        """
+        return (self.distance / self.length) % 1
+
+    @property
+    def progress(self):
+        """
+        Laps finished plus the fraction of the current lap
+        """
+        return self.distance / self.length
+
+    def standings(self):
+        """
+        The keys of the cars, leader first
+        """
+        return [self.keys[i] for i in np.argsort(-self.distance, kind = "stable")]
+
+    def get(self, key):
+        """
+        The slot of a car, or None if it isn't tracked
+        """
+        return self.slots.get(key)
@@ -0,0 +1,175 @@
+from ursina import *
+from race_progress import RaceProgress
+from checkpoints import Checkpoints
+import profiler
+
+# How long the player's sector time stays up
+SPLIT_TIME = 2.5
+
+# Keeps the lap count and place of every car on the active track: the player,
+# the AI and the other players in multiplayer, and shows the player's place.
+# Laps only count through the track's checkpoints in order (checkpoints.py),
+# which also time every car's sectors.
+class RaceTracker(Entity):
+    def __init__(self, car):
+        super().__init__()
+
+        self.car = car
+        self.multiplayer = None
+
+        self.track = None
+        self.progress = None
+        self.checkpoints = None
+        self.cars = {}
+
+        # The player's best time through each sector of this track
+        self.best_splits = {}
+        self.split_timer = 0
+
+        self.place_text = Text(text = "", origin = (0, 0), size = 0.05, scale = (1, 1), position = (0.7, 0.38))
+        self.wrong_way_text = Text(text = "Wrong Way", origin = (0, 0), size = 0.05, scale = (1.5, 1.5), position = (0, 0.3), color = color.red)
+        self.split_text = Text(text = "", origin = (0, 0), size = 0.05, scale = (0.8, 0.8), position = (0, 0.37))
+        self.place_text.disable()
+        self.wrong_way_text.disable()
+        self.split_text.disable()
+
+    def racing_cars(self):
+        """
+        Every car on the track
+        """
+        cars = [self.car]
+        cars += [ai for ai in self.car.ai_list if ai.enabled]
+        players = getattr(self.multiplayer, "players", {})
+        cars += [player for player in players.values() if player.enabled]
+        return cars
+
+    def update(self):
+        track = self.car.active_track()
+        if track is None:
+            self.track = None
+            self.place_text.disable()
+            self.wrong_way_text.disable()
+            self.split_text.disable()
+            return
+
+        profiler.section("race.progress")
+        # A new track starts a new race
+        if track is not self.track:
+            self.track = track
+            finish = track.checkpoints[0]["position"]
+            self.progress = RaceProgress(track.racing_line, (finish[0], finish[2]))
+            self.checkpoints = Checkpoints(track.checkpoints)
+            self.best_splits = {}
+
+        cars = self.racing_cars()
+        self.cars = {id(car): car for car in cars}
+        keys = [id(car) for car in cars]
+        x = [car.x for car in cars]
+        z = [car.z for car in cars]
+        self.progress.update(keys, x, z, [car.rotation_y for car in cars], time.dt)
+        crossings = self.checkpoints.update(keys, x, [car.y for car in cars], z, time.dt)
+        profiler.end()
+
+        for key, gate, sector, lap in crossings:
+            if key == id(self.car):
+                self.player_crossed(gate, sector)
+
+        self.show_place(len(cars))
+
+        if self.split_timer > 0:
+            self.split_timer -= time.dt
+            if self.split_timer <= 0:
+                self.split_text.disable()
+
+    def player_crossed(self, gate, sector):
+        """
+        The player drove through their next checkpoint: the finish line finishes
+        (or starts) a lap, and every sector they finish shows its time
+        """
+        if gate == 0:
+            self.car.finish_lap()
+        if sector is not None and self.car.gamemode != "drift":
+            self.show_split(gate, sector)
+
+    def show_split(self, gate, sector):
+        """
+        Shows the time of the sector the player just finished, against their best on this track
+        """
+        number = gate if gate != 0 else self.checkpoints.count
+        best = self.best_splits.get(gate)
+        if best is None:
+            self.split_text.text = f"Sector {number}  {sector:.2f}"
+            self.split_text.color = color.white
+        else:
+            self.split_text.text = f"Sector {number}  {sector:.2f}  {sector - best:+.2f}"
+            self.split_text.color = color.lime if sector < best else color.red
+        self.best_splits[gate] = sector if best is None else min(best, sector)
+        self.split_text.enable()
+        self.split_timer = SPLIT_TIME
+
+    def show_place(self, count):
+        """
+        Shows the player's place against the other cars while racing, and when they drive the wrong way
+        """
+        racing = self.car.gamemode == "race" and self.car.timer.enabled
+        player = self.progress.get(id(self.car))
+
+        if racing and count > 1:
+            text = f"{self.progress.place[player]}/{count}"
+            if self.place_text.text != text:
+                self.place_text.text = text
+            self.place_text.enable()
+        else:
+            self.place_text.disable()
+
+        self.wrong_way_text.enabled = self.car.timer.enabled and bool(self.progress.wrong_way[player])
+
+    def restart(self):
+        """
+        Starts counting again from where every car is now
+        """
+        self.track = None
+
+    def restart_lap(self, car):
+        """
+        Throws away the lap a car is on, after a reset or respawn; its next lap starts at the finish line
+        """
+        if self.checkpoints is not None:
+            self.checkpoints.restart(id(car))
+
+    def standings(self):
+        """
+        The cars on the track, leader first
+        """
+        if self.progress is None:
+            return []
+        return [self.cars[key] for key in self.progress.standings() if key in self.cars]
+
+    def place(self, car):
+        slot = self.progress.get(id(car)) if self.progress else None
+        return None if slot is None else int(self.progress.place[slot])
+
+    def laps(self, car):
+        """
+        The laps a car has finished through every checkpoint
+        """
+        slot = self.checkpoints.get(id(car)) if self.checkpoints else None
+        return None if slot is None else int(self.checkpoints.laps[slot])
+
+    def wrong_way(self, car):
+        slot = self.progress.get(id(car)) if self.progress else None
+        return slot is not None and bool(self.progress.wrong_way[slot])
+
+    def last_lap(self, car):
+        """
+        The time of a car's last lap through every checkpoint, or None
+        """
+        slot = self.checkpoints.get(id(car)) if self.checkpoints else None
+        return None if slot is None or self.checkpoints.laps[slot] == 0 else float(self.checkpoints.last_lap[slot])
+
+    def sectors(self, car):
+        """
+        The sector times of a car's last whole lap
+        """
+        slot = self.checkpoints.get(id(car)) if self.checkpoints else None
+        return [] if slot is None else list(self.checkpoints.last_sectors[slot])
@@ -0,0 +1,222 @@
+"""
+Smooth racing lines through a track's waypoints.
+
+The waypoints are joined with a closed centripetal Catmull-Rom spline, which
+passes through every waypoint without overshooting on uneven spacing, and the
+spline is sampled about once per unit into NumPy arrays: positions, headings
+and the arc length at every sample.
+
+A car keeps the index of the sample it is nearest to and track() only searches
+a few samples around it each tick, so following the line costs the same however
+long the track is. The arc length at that sample is how far round the lap the
+car is.
+
+Every sample also has a corner speed: how fast a car can take the line there
+and still turn as sharply as it does, lowered before corners so there's room
+to brake down to it.
+"""
+import math
+import numpy as np
+
+from waypoints import TRACK_WAYPOINTS
+
+# Distance between samples
+SPACING = 1.0
+
+# 0 is a uniform Catmull-Rom spline, 0.5 centripetal and 1 chordal
+ALPHA = 0.5
+
+# Samples searched behind and ahead of the last nearest sample
+BEHIND = 4
+AHEAD = 12
+
+# Further from the line than this, the car was moved and is searched for on the whole line
+LOST_DISTANCE = 20
+
+# How far along the line a car aims: a distance plus seconds of driving at its speed
+LOOKAHEAD = 8
+LOOKAHEAD_TIME = 0.25
+
+# How sharply the line turns is measured over this distance around each sample
+CORNER_WINDOW = 10
+
+# Degrees per second a car's path can turn through a corner (a little under the
+# AI's TURN_SPEED, the drift pivot lags behind the car), how quickly it brakes
+# for one and the slowest it takes any corner
+CORNER_TURN_RATE = 70
+CORNER_BRAKING = 30
+MIN_CORNER_SPEED = 8
+
+def catmull_rom(points, spacing = SPACING, alpha = ALPHA):
+    """
+    Samples a closed Catmull-Rom spline through points (n, 3) about every spacing units
+    """
+    points = np.asarray(points, dtype = np.float64)
+    p0 = np.roll(points, 1, axis = 0)
+    p1 = points
+    p2 = np.roll(points, -1, axis = 0)
+    p3 = np.roll(points, -2, axis = 0)
+
+    # Knot intervals from the distances between the control points
+    def interval(a, b):
+        return np.maximum(np.linalg.norm(b - a, axis = 1) ** alpha, 1e-6)
+    t1 = interval(p0, p1)
+    t2 = t1 + interval(p1, p2)
+    t3 = t2 + interval(p2, p3)
+
+    # Samples per segment, from each segment's chord length
+    counts = np.maximum(np.ceil(np.linalg.norm(p2 - p1, axis = 1) / spacing).astype(int), 1)
+    segment = np.repeat(np.arange(len(points)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    u = (np.arange(len(segment)) - starts) / np.repeat(counts, counts)
+
+    # Barry and Goldman's pyramid, for every sample at once
+    p0, p1, p2, p3 = p0[segment], p1[segment], p2[segment], p3[segment]
+    t1, t2, t3 = t1[segment, None], t2[segment, None], t3[segment, None]
+    t = t1 + u[:, None] * (t2 - t1)
+    a1 = (t1 - t) / t1 * p0 + t / t1 * p1
+    a2 = (t2 - t) / (t2 - t1) * p1 + (t - t1) / (t2 - t1) * p2
+    a3 = (t3 - t) / (t3 - t2) * p2 + (t - t2) / (t3 - t2) * p3
+    b1 = (t2 - t) / t2 * a1 + t / t2 * a2
+    b2 = (t3 - t) / (t3 - t1) * a2 + (t - t1) / (t3 - t1) * a3
+    return (t2 - t) / (t2 - t1) * b1 + (t - t1) / (t2 - t1) * b2
+
+def corner_speeds(headings, spacing):
+    """
+    The corner speed at every sample of a closed line, from its headings (degrees) and the distance between samples
+    """
+    count = len(headings)
+    turns = (np.roll(headings, -1) - headings + 180) % 360 - 180
+
+    # Degrees turned per unit over CORNER_WINDOW around every sample
+    window = min(max(int(CORNER_WINDOW / spacing), 1), count)
+    totals = np.concatenate(([0.0], np.cumsum(np.concatenate((turns, turns)))))
+    first = (np.arange(count) - window // 2) % count
+    sharpness = np.abs(totals[first + window] - totals[first]) / (window * spacing)
+    speeds = np.maximum(CORNER_TURN_RATE / np.maximum(sharpness, 1e-6), MIN_CORNER_SPEED)
+
+    # Slow enough before every corner to brake down to it, twice round so it carries over the start
+    speeds = speeds.tolist()
+    for i in range(2 * count - 1, -1, -1):
+        here = i % count
+        ahead = speeds[(i + 1) % count]
+        speeds[here] = min(speeds[here], math.sqrt(ahead * ahead + 2 * CORNER_BRAKING * spacing))
+    return np.array(speeds)
+
+def wrap_angle(angle):
+    """
+    An angle in degrees moved into -180..180
+    """
+    return (angle + 180) % 360 - 180
+
+class RacingLine:
+    """
+    A closed spline through waypoints, sampled into arrays
+    """
+    def __init__(self, waypoints, spacing = SPACING):
+        self.waypoints = np.asarray(waypoints, dtype = np.float64)[:, :3]
+        self.positions = catmull_rom(self.waypoints, spacing)
+        self.count = len(self.positions)
+
+        # Arc length at every sample, and the length of the whole loop
+        steps = np.linalg.norm(np.roll(self.positions, -1, axis = 0) - self.positions, axis = 1)
+        self.arc = np.concatenate(([0.0], np.cumsum(steps[:-1])))
+        self.length = float(steps.sum())
+        self.sample_spacing = self.length / self.count
+
+        # Heading (rotation_y) of the line at every sample
+        forward = np.roll(self.positions, -1, axis = 0) - self.positions
+        self.headings = np.degrees(np.arctan2(forward[:, 0], forward[:, 2]))
+        self.corner_speeds = corner_speeds(self.headings, self.sample_spacing)
+
+        self.x = self.positions[:, 0]
+        self.z = self.positions[:, 2]
+
+        # Plain lists are quicker than arrays for the few items track() reads
+        self.x_list = self.x.tolist()
+        self.z_list = self.z.tolist()
+
+    def nearest(self, x, z):
+        """
+        The sample nearest to a point, searching the whole line
+        """
+        return int(np.argmin((self.x - x) ** 2 + (self.z - z) ** 2))
+
+    def track(self, index, x, z):
+        """
+        The sample nearest to a point, searching around the last one
+        """
+        best = index
+        best_distance = math.inf
+        count = self.count
+        xs = self.x_list
+        zs = self.z_list
+        for i in range(index - BEHIND, index + AHEAD + 1):
+            i %= count
+            dx = xs[i] - x
+            dz = zs[i] - z
+            d = dx * dx + dz * dz
+            if d < best_distance:
+                best = i
+                best_distance = d
+        if best_distance > LOST_DISTANCE * LOST_DISTANCE:
+            return self.nearest(x, z)
+        return best
+
+    def distance(self, index):
+        """
+        How far round the loop a sample is
+        """
+        return float(self.arc[index])
+
+    def point_at(self, s):
+        """
+        The point on the line s units round the loop (wraps around)
+        """
+        s %= self.length
+        i = int(np.searchsorted(self.arc, s, side = "right")) - 1
+        j = (i + 1) % self.count
+        end = self.arc[j] if j else self.length
+        f = (s - self.arc[i]) / max(end - self.arc[i], 1e-9)
+        a = self.positions[i]
+        b = self.positions[j]
+        return a + (b - a) * f
+
+    def heading_to(self, index, x, z, lookahead, offset = 0):
+        """
+        The rotation_y that points from (x, z) at the line lookahead units past
+        a sample, or offset units to the right of the line there
+        """
+        target = (index + int(lookahead / self.sample_spacing)) % self.count
+        target_x = self.x_list[target]
+        target_z = self.z_list[target]
+        if offset:
+            heading = math.radians(self.headings[target])
+            target_x += math.cos(heading) * offset
+            target_z -= math.sin(heading) * offset
+        return math.degrees(math.atan2(target_x - x, target_z - z))
+
+    def steer(self, index, x, z, rotation_y, speed, offset = 0):
+        """
+        The target rotation_y of a car at (x, z) near a sample, turning the short way from rotation_y
+        """
+        heading = self.heading_to(index, x, z, LOOKAHEAD + speed * LOOKAHEAD_TIME, offset)
+        return rotation_y + wrap_angle(heading - rotation_y)
+
+    def target_speed(self, index):
+        """
+        How fast a car near a sample should go to get round the corners ahead
+        """
+        return float(self.corner_speeds[index])
+
+# Built the first time a track asks for its line, then shared by every AI
+TRACK_RACING_LINES = {}
+
+def track_racing_line(name):
+    """
+    The racing line through a track's waypoints
+    """
+    line = TRACK_RACING_LINES.get(name)
+    if line is None:
+        line = TRACK_RACING_LINES[name] = RacingLine(TRACK_WAYPOINTS[name])
+    return line
@@ -0,0 +1,141 @@
+"""
+Finds the pieces of a mesh that are copies of one another.
+
+Detail models are made by copying one tree or rock around the track, so the
+file holds the same piece over and over, each moved, turned and scaled. A
+piece is a set of triangles joined by shared vertices. Pieces with the same
+triangles (the same corners in the same order, with the same uvs and colours)
+are fitted to the first of them: if one matrix moves every corner of the
+first onto the other's, within a small error, the other is a copy.
+
+Copies are kept as one prototype, placed around its own origin, and a matrix
+per copy. Pieces that aren't copies of anything stay as they are.
+
+Doesn't use Ursina.
+"""
+import numpy as np
+
+# A copy can be off by this much of the piece's size
+FIT_TOLERANCE = 1e-3
+
+# Copies' normals have to point this close to the prototype's turned ones (cosine)
+NORMAL_TOLERANCE = 0.999
+
+# Fewer copies than this aren't worth drawing on their own
+MIN_COPIES = 2
+
+def mesh_pieces(triangles):
+    """
+    The triangles of every piece of a mesh (triangles joined by shared vertices), as arrays of triangle indices
+    """
+    if not len(triangles):
+        return []
+    # Every vertex takes the lowest label of the triangles it's in until nothing changes
+    labels = np.arange(triangles.max() + 1)
+    while True:
+        lowest = labels[triangles].min(axis = 1)
+        new = labels.copy()
+        np.minimum.at(new, triangles.ravel(), np.repeat(lowest, 3))
+        new = new[new]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+
+    piece_of = labels[triangles[:, 0]]
+    order = np.argsort(piece_of, kind = "stable")
+    starts = np.flatnonzero(np.diff(piece_of[order])) + 1
+    return np.split(order, starts)
+
+def piece_shape(triangles):
+    """
+    The triangles of a piece with its vertices numbered in the order they're first used
+    """
+    flat = triangles.ravel()
+    unique, first, inverse = np.unique(flat, return_index = True, return_inverse = True)
+    rank = np.empty(len(unique), dtype = np.int64)
+    rank[np.argsort(first)] = np.arange(len(unique))
+    return rank[inverse.reshape(-1)]
+
+class RepeatedMesh:
+    """
+    A piece drawn once for every matrix
+
+    corners: (c, columns) rows of the prototype's corners, positions first, moved to around the origin
+    matrices: (k, 4, 3) float64, corner positions (as rows with a 1 after them) times a matrix land on a copy
+    pieces: the index of the piece every matrix came from
+    """
+    def __init__(self, corners, matrices, pieces):
+        self.corners = corners
+        self.matrices = matrices
+        self.pieces = pieces
+
+def find_repeats(triangles, corners, pieces):
+    """
+    Groups pieces that are copies of one another.
+
+    triangles: (m, 3) vertex indices, to tell which pieces have the same shape
+    corners: (m * 3, columns) rows for every corner of every triangle, position then normal then anything else
+    pieces: the triangle indices of every piece (mesh_pieces)
+
+    Returns the RepeatedMeshes and the indices of the pieces that aren't in any of them.
+    """
+    groups = {}
+    for i, piece in enumerate(pieces):
+        rows = (piece[:, None] * 3 + np.arange(3)).ravel()
+        key = (len(piece), piece_shape(triangles[piece]).tobytes(), corners[rows, 6:].tobytes())
+        groups.setdefault(key, []).append((i, rows))
+
+    repeats = []
+    alone = []
+    for group in groups.values():
+        if len(group) < MIN_COPIES:
+            alone.extend(i for i, rows in group)
+            continue
+        repeat, rest = fit_copies(corners, group)
+        if repeat is not None:
+            repeats.append(repeat)
+        alone.extend(rest)
+    return repeats, sorted(alone)
+
+def fit_copies(corners, group):
+    """
+    Fits every piece of a group to the first and makes a RepeatedMesh of the ones that fit
+    """
+    first = corners[group[0][1]]
+    points = first[:, :3].astype(np.float64)
+
+    # The prototype stands on its own origin, like the models it was copied from
+    low = points.min(axis = 0)
+    high = points.max(axis = 0)
+    base = np.array([(low[0] + high[0]) / 2, low[1], (low[2] + high[2]) / 2])
+    local = np.column_stack((points - base, np.ones(len(points))))
+    size = max(np.linalg.norm(high - low), 1e-6)
+
+    # One least squares fit for every copy at once
+    targets = np.stack([corners[rows, :3] for i, rows in group]).astype(np.float64)
+    matrices = np.linalg.pinv(local) @ targets
+    error = np.abs(local @ matrices - targets).max(axis = (1, 2))
+    scale = np.abs(np.linalg.det(matrices[:, :3])) ** (1 / 3)
+    fits = error <= FIT_TOLERANCE * size * np.maximum(scale, 1)
+
+    # Only turned and evenly scaled copies, so the turned normals stay true
+    linear = matrices[:, :3]
+    gram = linear @ linear.transpose(0, 2, 1)
+    squared = np.trace(gram, axis1 = 1, axis2 = 2) / 3
+    fits &= np.abs(gram - squared[:, None, None] * np.eye(3)).max(axis = (1, 2)) <= FIT_TOLERANCE * squared
+    fits &= np.linalg.det(linear) > 0
+
+    normals = first[:, 3:6].astype(np.float64)
+    turned = normals @ linear
+    turned /= np.maximum(np.linalg.norm(turned, axis = -1, keepdims = True), 1e-12)
+    given = np.stack([corners[rows, 3:6] for i, rows in group]).astype(np.float64)
+    fits &= (turned * given).sum(axis = -1).min(axis = 1) >= NORMAL_TOLERANCE
+
+    if fits.sum() < MIN_COPIES:
+        return None, [i for i, rows in group]
+
+    prototype = first.copy()
+    prototype[:, :3] = points - base
+    pieces = [i for (i, rows), fit in zip(group, fits) if fit]
+    rest = [i for (i, rows), fit in zip(group, fits) if not fit]
+    return RepeatedMesh(prototype, matrices[fits], pieces), rest
@@ -0,0 +1,304 @@
+"""
+Input recordings of the player's car.
+
+A replay stores the controls of every physics tick, the car's starting state
+(position and handling), the car type, track, gamemode and the random seed of
+the run. Because the physics run at a fixed tick rate, stepping the same
+inputs from the same state drives the same line again, so a lap is a few
+kilobytes and can be re-simulated headless (to check a highscore or as a
+repeatable benchmark) or shown in game.
+
+Anything that changes the car from outside the physics (respawns, menus) is
+stored as a snapshot of the car's state at that tick.
+
+To re-simulate a replay headless:
+
+    python replay.py replays/best_sand_track_race.rly
+"""
+import os
+import struct
+import zlib
+
+from physics import CarState, CarInputs, FixedTimestep, TrackWorld, TICK_RATE, step
+
+MAGIC = b"RLYR"
+VERSION = 1
+
+# The state values stored at the start and in snapshots, in file order
+STATE_FIELDS = (
+    "x", "y", "z", "rotation_y", "pivot_rotation_y",
+    "speed", "velocity_y", "rotation_speed", "drift_speed",
+    "topspeed", "acceleration", "braking_strength", "friction", "drift_amount", "turning_speed",
+    "min_drift_speed", "max_drift_speed", "max_rotation_speed", "steering_amount",
+)
+
+# The controls, one bit each
+INPUT_FIELDS = ("forward", "left", "brake", "right", "handbrake")
+
+_header = struct.Struct("<4sHHI")
+_state = struct.Struct("<" + "d" * (len(STATE_FIELDS) + 3))
+_count = struct.Struct("<I")
+
+def pack_inputs(inputs):
+    """
+    The controls as one byte
+    """
+    value = 0
+    for bit, name in enumerate(INPUT_FIELDS):
+        if getattr(inputs, name):
+            value |= 1 << bit
+    return value
+
+def unpack_inputs(value, inputs):
+    """
+    Sets the controls from a byte made by pack_inputs()
+    """
+    for bit, name in enumerate(INPUT_FIELDS):
+        setattr(inputs, name, bool(value & (1 << bit)))
+    return inputs
+
+def state_values(state):
+    return tuple(getattr(state, name) for name in STATE_FIELDS) + tuple(state.scale)
+
+def apply_state_values(state, values):
+    for name, value in zip(STATE_FIELDS, values):
+        setattr(state, name, value)
+    state.scale = tuple(values[len(STATE_FIELDS):])
+    return state
+
+class ReplayError(ValueError):
+    """
+    A file that isn't a replay or can't be read
+    """
+
+def _read_header(data):
+    """
+    Everything of a replay before its inputs: (tick_rate, seed, texts, start, snapshots, offset of the inputs)
+    """
+    magic, version, tick_rate, seed = _header.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ReplayError("not a replay file")
+    if version != VERSION:
+        raise ReplayError(f"unsupported replay version {version}")
+    offset = _header.size
+
+    texts = []
+    for i in range(3):
+        length = data[offset]
+        texts.append(bytes(data[offset + 1:offset + 1 + length]).decode("utf-8"))
+        offset += 1 + length
+
+    start = _state.unpack_from(data, offset)
+    offset += _state.size
+
+    snapshots = {}
+    count, = _count.unpack_from(data, offset)
+    offset += _count.size
+    for i in range(count):
+        tick, = _count.unpack_from(data, offset)
+        snapshots[tick] = _state.unpack_from(data, offset + _count.size)
+        offset += _count.size + _state.size
+
+    return tick_rate, seed, texts, start, snapshots, offset
+
+def replay_duration(path):
+    """
+    How long a saved replay is, without unpacking its inputs; raises ReplayError if it can't be read
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+        tick_rate, seed, texts, start, snapshots, offset = _read_header(data)
+        ticks, = _count.unpack_from(data, offset)
+    except (OSError, IndexError, UnicodeDecodeError, struct.error) as e:
+        raise ReplayError(f"couldn't read replay {path}: {e}") from e
+    if tick_rate == 0:
+        raise ReplayError(f"replay {path} has no tick rate")
+    return ticks / tick_rate
+
+class Replay:
+    """
+    A recorded run: where it started, the inputs of every tick and the snapshots in between
+    """
+    def __init__(self, car_type = "", track = "", gamemode = "", seed = 0, tick_rate = TICK_RATE, start = None, inputs = None, snapshots = None):
+        self.car_type = car_type
+        self.track = track
+        self.gamemode = gamemode
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.start = start
+        self.inputs = inputs if inputs is not None else bytearray()
+        self.snapshots = snapshots if snapshots is not None else {}
+
+    @property
+    def ticks(self):
+        return len(self.inputs)
+
+    @property
+    def duration(self):
+        return self.ticks / self.tick_rate
+
+    def start_state(self):
+        return apply_state_values(CarState(), self.start)
+
+    def to_bytes(self):
+        data = bytearray(_header.pack(MAGIC, VERSION, self.tick_rate, self.seed))
+        for text in (self.car_type, self.track, self.gamemode):
+            encoded = text.encode("utf-8")
+            data += struct.pack("<B", len(encoded)) + encoded
+        data += _state.pack(*self.start)
+        data += _count.pack(len(self.snapshots))
+        for tick in sorted(self.snapshots):
+            data += _count.pack(tick) + _state.pack(*self.snapshots[tick])
+        compressed = zlib.compress(bytes(self.inputs), 9)
+        data += _count.pack(len(self.inputs)) + _count.pack(len(compressed)) + compressed
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Reads a replay made by to_bytes(); raises ReplayError if it isn't one or is cut off
+        """
+        try:
+            tick_rate, seed, texts, start, snapshots, offset = _read_header(data)
+            ticks, length = struct.unpack_from("<II", data, offset)
+            offset += 8
+            inputs = bytearray(zlib.decompress(bytes(data[offset:offset + length])))
+        except (IndexError, UnicodeDecodeError, struct.error, zlib.error) as e:
+            raise ReplayError(f"couldn't read replay: {e}") from e
+        if len(inputs) != ticks:
+            raise ReplayError("replay inputs are cut off")
+
+        car_type, track, gamemode = texts
+        return cls(car_type, track, gamemode, seed, tick_rate, start, inputs, snapshots)
+
+    def save(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        # Swapped in whole like the baked caches (objfile.save_cache), so the best lap is never left cut off
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a saved replay; raises ReplayError if it can't be read
+        """
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError as e:
+            raise ReplayError(f"couldn't read replay {path}: {e}") from e
+        return cls.from_bytes(data)
+
+class ReplayRecorder:
+    """
+    Records the inputs of every tick of a car
+    """
+    def __init__(self, state, car_type = "", track = "", gamemode = "", seed = 0):
+        self.replay = Replay(car_type, track, gamemode, seed, start = state_values(state))
+        self.expected = state_values(state)
+
+    @property
+    def ticks(self):
+        return self.replay.ticks
+
+    def check(self, state):
+        """
+        Stores a snapshot if something other than the physics changed the car since the last tick
+        """
+        values = state_values(state)
+        if values != self.expected:
+            self.replay.snapshots[self.replay.ticks] = values
+            self.expected = values
+
+    def record(self, inputs):
+        """
+        Stores the inputs of the tick that is about to run
+        """
+        self.replay.inputs.append(pack_inputs(inputs))
+
+    def stepped(self, state):
+        """
+        Remembers the state after a tick, for check()
+        """
+        self.expected = state_values(state)
+
+class ReplayPlayer:
+    """
+    Re-simulates a replay tick by tick
+    """
+    def __init__(self, replay, world):
+        self.replay = replay
+        self.world = world
+        self.state = replay.start_state()
+        self.previous_state = self.state.copy()
+        self.inputs = CarInputs()
+        self.tick = 0
+        self.dt = 1 / replay.tick_rate
+        self.timestep = FixedTimestep(self.dt)
+
+    @property
+    def finished(self):
+        return self.tick >= self.replay.ticks
+
+    def step(self):
+        """
+        Runs the next tick, returns False once the replay is over
+        """
+        if self.finished:
+            return False
+        snapshot = self.replay.snapshots.get(self.tick)
+        if snapshot is not None:
+            apply_state_values(self.state, snapshot)
+        self.previous_state.copy_from(self.state)
+        unpack_inputs(self.replay.inputs[self.tick], self.inputs)
+        step(self.state, self.inputs, self.dt, self.world)
+        self.tick += 1
+        return True
+
+    def advance(self, dt):
+        """
+        Runs as many ticks as dt covers (for playing back in real time)
+        """
+        for i in range(self.timestep.advance(dt)):
+            if not self.step():
+                break
+
+    def run(self):
+        """
+        Runs the whole replay and returns the final state
+        """
+        while self.step():
+            pass
+        return self.state
+
+def track_world(track):
+    """
+    The headless physics world of a track, from its baked heightfield and wall field
+    """
+    from heightfield import track_heightfield
+    from wall_field import track_walls
+
+    return TrackWorld(track_heightfield(track), track_walls(track))
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        print("usage: python replay.py <replay file> ...")
+        sys.exit(1)
+
+    for path in sys.argv[1:]:
+        replay = Replay.load(path)
+        player = ReplayPlayer(replay, track_world(replay.track))
+        start = time.perf_counter()
+        state = player.run()
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {replay.car_type} car on {replay.track} ({replay.gamemode}), seed {replay.seed}")
+        print(f"    {replay.ticks} ticks = {replay.duration:.2f}s of driving, {len(replay.snapshots)} snapshots, {os.path.getsize(path)} bytes")
+        print(f"    ends at ({state.x:.2f}, {state.y:.2f}, {state.z:.2f}), simulated in {elapsed:.3f}s")
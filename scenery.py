@@ -0,0 +1,394 @@
+"""
+Turns a track's detail batches (detail_batch.py) into one Entity.
+
+Each batch becomes Geoms whose vertex and index arrays are copied straight
+from the baked arrays, with the batch's texture on their node. The Entity
+holding them is the only node the menus enable and disable.
+
+Instanced batches get a second vertex array with a row per copy, which the
+GPU steps through once per copy instead of once per vertex, and a shader that
+moves every copy into place and lights it the way the shader generator lights
+everything else (ambient, the sun and its shadows). set_copies() swaps the
+rows, so copies can be culled without touching the prototype.
+
+Copies are split into cells, and every cell is an LODNode that draws the
+prototype, its simpler levels and, for trees, its impostor (a picture of the
+prototype on a quad that turns to face the camera) by how far away the cell
+is. How far each level reaches depends on the graphics setting
+(LOD_DISTANCES), so ultra fast draws simpler scenery instead of none.
+"""
+from ursina import *
+import numpy as np
+from panda3d.core import Geom, GeomNode, GeomTriangles, GeomVertexArrayData, GeomVertexArrayFormat, GeomVertexData, GeomVertexFormat, InternalName, NodePath
+from panda3d.core import BoundingBox, Point3, LODNode, Camera, OrthographicLens, FrameBufferProperties, SamplerState
+from panda3d.core import Texture as PandaTexture
+from panda3d.core import Shader as PandaShader
+
+# How far away each level stops being drawn on each graphics setting: the
+# prototype, its simpler levels, then its impostor. The last level a batch has
+# is drawn from there on; ultra fast never draws the full prototype.
+LOD_DISTANCES = {
+    "fancy": (100, 200, 350),
+    "fast": (50, 110, 220),
+    "ultra fast": (0, 50, 120),
+}
+
+# Further than anything on a track
+FAR_DISTANCE = 100000
+
+# Copies are split into cells this wide, each switching levels by how far away its middle is
+CELL_SIZE = 64
+
+# Pixels of an impostor's picture, the width and height of the quad
+IMPOSTOR_SIZE = 128
+
+# Position, normal, uv and colour, the way detail_batch.py lays out a corner
+_corner_format = GeomVertexArrayFormat()
+_corner_format.addColumn(InternalName.getVertex(), 3, Geom.NTFloat32, Geom.CPoint)
+_corner_format.addColumn(InternalName.getNormal(), 3, Geom.NTFloat32, Geom.CNormal)
+_corner_format.addColumn(InternalName.getTexcoord(), 2, Geom.NTFloat32, Geom.CTexcoord)
+_corner_format.addColumn(InternalName.getColor(), 4, Geom.NTFloat32, Geom.CColor)
+CORNER_FORMAT = GeomVertexFormat.registerFormat(_corner_format)
+
+# The x, y and z rows of a copy's matrix, read once per copy
+_copy_format = GeomVertexArrayFormat()
+for row in ("instance_x", "instance_y", "instance_z"):
+    _copy_format.addColumn(InternalName.make(row), 4, Geom.NTFloat32, Geom.COther)
+_copy_format.setDivisor(1)
+
+_instanced_format = GeomVertexFormat()
+_instanced_format.addArray(_corner_format)
+_instanced_format.addArray(_copy_format)
+INSTANCED_FORMAT = GeomVertexFormat.registerFormat(_instanced_format)
+
+_light_inputs = """
+uniform struct {
+    vec4 color;
+    vec4 position;
+    sampler2DShadow shadowMap;
+    mat4 shadowViewMatrix;
+} p3d_LightSource[1];
+"""
+
+INSTANCED_VERTEX_SHADER = """
+#version 150
+const float SHADOW_OFFSET = 0.1;
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelViewMatrix;
+uniform mat3 p3d_NormalMatrix;
+""" + _light_inputs + """
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+in vec2 p3d_MultiTexCoord0;
+in vec4 p3d_Color;
+in vec4 instance_x;
+in vec4 instance_y;
+in vec4 instance_z;
+
+out vec3 view_position;
+out vec3 view_normal;
+out vec2 uv;
+out vec4 vertex_color;
+out vec4 shadow_position;
+
+void main() {
+    vec4 position = vec4(dot(instance_x, p3d_Vertex), dot(instance_y, p3d_Vertex), dot(instance_z, p3d_Vertex), 1);
+    vec3 normal = vec3(dot(instance_x.xyz, p3d_Normal), dot(instance_y.xyz, p3d_Normal), dot(instance_z.xyz, p3d_Normal));
+    gl_Position = p3d_ModelViewProjectionMatrix * position;
+    view_position = vec3(p3d_ModelViewMatrix * position);
+    view_normal = normalize(p3d_NormalMatrix * normal);
+    uv = p3d_MultiTexCoord0;
+    vertex_color = p3d_Color;
+    // Looked up a little off the surface, so the copies don't shadow themselves in stripes
+    shadow_position = p3d_LightSource[0].shadowViewMatrix * vec4(view_position + view_normal * SHADOW_OFFSET, 1);
+}
+"""
+
+# The quad stands on the copy's origin and turns around its up axis to face the
+# camera, lit as if it leaned back towards the sky
+IMPOSTOR_VERTEX_SHADER = """
+#version 150
+const float SHADOW_OFFSET = 0.1;
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelViewMatrix;
+uniform mat4 p3d_ModelViewMatrixInverse;
+uniform mat3 p3d_NormalMatrix;
+""" + _light_inputs + """
+in vec4 p3d_Vertex;
+in vec2 p3d_MultiTexCoord0;
+in vec4 p3d_Color;
+in vec4 instance_x;
+in vec4 instance_y;
+in vec4 instance_z;
+
+out vec3 view_position;
+out vec3 view_normal;
+out vec2 uv;
+out vec4 vertex_color;
+out vec4 shadow_position;
+
+void main() {
+    vec3 origin = vec3(instance_x.w, instance_y.w, instance_z.w);
+    float scale = length(instance_x.xyz);
+    vec3 facing = (p3d_ModelViewMatrixInverse * vec4(0, 0, 0, 1)).xyz - origin;
+    facing.y = 0.0;
+    facing = dot(facing, facing) > 1e-8 ? normalize(facing) : vec3(0, 0, -1);
+    vec3 right = vec3(-facing.z, 0, facing.x);
+    vec4 position = vec4(origin + (right * p3d_Vertex.x + vec3(0, p3d_Vertex.y, 0)) * scale, 1);
+    gl_Position = p3d_ModelViewProjectionMatrix * position;
+    view_position = vec3(p3d_ModelViewMatrix * position);
+    view_normal = normalize(p3d_NormalMatrix * normalize(facing + vec3(0, 1, 0)));
+    uv = p3d_MultiTexCoord0;
+    vertex_color = p3d_Color;
+    shadow_position = p3d_LightSource[0].shadowViewMatrix * vec4(view_position + view_normal * SHADOW_OFFSET, 1);
+}
+"""
+
+INSTANCED_FRAGMENT_SHADER = """
+#version 150
+uniform sampler2D p3d_Texture0;
+uniform vec4 p3d_ColorScale;
+uniform struct {
+    vec4 ambient;
+} p3d_LightModel;
+""" + _light_inputs + """
+in vec3 view_position;
+in vec3 view_normal;
+in vec2 uv;
+in vec4 vertex_color;
+in vec4 shadow_position;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    vec4 color = texture(p3d_Texture0, uv) * vertex_color;
+    if (color.a < 0.5) {
+        discard;
+    }
+    vec3 to_light = p3d_LightSource[0].position.xyz - view_position * p3d_LightSource[0].position.w;
+    float diffuse = max(dot(normalize(view_normal), normalize(to_light)), 0.0);
+    float shadow = textureProj(p3d_LightSource[0].shadowMap, shadow_position);
+    vec3 light = p3d_LightModel.ambient.rgb + p3d_LightSource[0].color.rgb * diffuse * shadow;
+    p3d_FragColor = vec4(color.rgb * clamp(light, 0.0, 1.0), color.a) * p3d_ColorScale;
+}
+"""
+
+_shaders = {}
+
+def instanced_shader(vertex = INSTANCED_VERTEX_SHADER):
+    if vertex not in _shaders:
+        _shaders[vertex] = PandaShader.make(PandaShader.SL_GLSL, vertex, INSTANCED_FRAGMENT_SHADER)
+    return _shaders[vertex]
+
+def mesh_arrays(vertices, triangles):
+    """
+    The corner rows (detail_batch.STRIDE floats each) and triangles of a mesh, for Geoms to share
+    """
+    corners = GeomVertexArrayData(CORNER_FORMAT.getArray(0), Geom.UHStatic)
+    corners.uncleanSetNumRows(len(vertices))
+    memoryview(corners).cast("B")[:] = np.ascontiguousarray(vertices, dtype = np.float32).tobytes()
+
+    primitive = GeomTriangles(Geom.UHStatic)
+    primitive.setIndexType(Geom.NTUint32)
+    indices = primitive.modifyVertices()
+    indices.uncleanSetNumRows(triangles.size)
+    memoryview(indices).cast("B")[:] = np.ascontiguousarray(triangles, dtype = np.uint32).tobytes()
+    return corners, primitive
+
+def mesh_geom(vertices, triangles):
+    """
+    A Geom of corner rows (detail_batch.STRIDE floats each) and triangles
+    """
+    corners, primitive = mesh_arrays(vertices, triangles)
+    vertex_data = GeomVertexData("mesh", CORNER_FORMAT, Geom.UHStatic)
+    vertex_data.setArray(0, corners)
+    geom = Geom(vertex_data)
+    geom.addPrimitive(primitive)
+    return geom
+
+def copies_geom(corners, primitive):
+    """
+    An instanced Geom drawing shared corners and triangles, with its own (empty) rows of copies
+    """
+    vertex_data = GeomVertexData("copies", INSTANCED_FORMAT, Geom.UHStatic)
+    vertex_data.setArray(0, corners)
+    vertex_data.setArray(1, GeomVertexArrayData(INSTANCED_FORMAT.getArray(1), Geom.UHStatic))
+    geom = Geom(vertex_data)
+    geom.addPrimitive(primitive)
+    return geom
+
+def geom_node(name, geom):
+    node = GeomNode(name)
+    node.addGeom(geom)
+    return node
+
+def set_copies(node, transforms):
+    """
+    Draws an instanced node's Geom once for every row of transforms (detail_batch.TRANSFORM_STRIDE floats each)
+    """
+    vertex_data = node.node().modifyGeom(0).modifyVertexData()
+    copies = vertex_data.modifyArray(1)
+    copies.uncleanSetNumRows(len(transforms))
+    if len(transforms):
+        memoryview(copies).cast("B")[:] = np.ascontiguousarray(transforms, dtype = np.float32).tobytes()
+    node.setInstanceCount(len(transforms))
+
+def copies_bounds(vertices, transforms):
+    """
+    A box around every copy, the GPU puts them where Panda can't see
+    """
+    reach = np.linalg.norm(vertices[:, :3], axis = 1).max()
+    rows = transforms.reshape(-1, 3, 4)
+    scale = np.linalg.norm(rows[:, :, :3], axis = 2).max(axis = 1, keepdims = True)
+    positions = rows[:, :, 3]
+    low = (positions - reach * scale).min(axis = 0)
+    high = (positions + reach * scale).max(axis = 0)
+    return BoundingBox(Point3(*low), Point3(*high))
+
+def lod_switches(count, distances):
+    """
+    The (far, near) distances every one of count levels is drawn between, the last one out to FAR_DISTANCE
+    """
+    edges = (0, ) + tuple(distances)
+    switches = []
+    for level in range(count):
+        near = edges[min(level, len(edges) - 1)]
+        far = edges[level + 1] if level < count - 1 and level + 1 < len(edges) else FAR_DISTANCE
+        switches.append((far, near))
+    return switches
+
+def set_lod_switches(lod, count, distances):
+    lod.clearSwitches()
+    for far, near in lod_switches(count, distances):
+        lod.addSwitch(far, near)
+
+def copy_cells(transforms):
+    """
+    The copies (row indices) in every CELL_SIZE wide cell, and the middle of each cell's copies
+    """
+    positions = transforms.reshape(-1, 3, 4)[:, :, 3]
+    cells = np.floor(positions[:, [0, 2]] / CELL_SIZE).astype(np.int64)
+    unique, inverse = np.unique(cells, axis = 0, return_inverse = True)
+    inverse = inverse.reshape(-1)
+    return [(rows, positions[rows].mean(axis = 0)) for rows in (np.flatnonzero(inverse == cell) for cell in range(len(unique)))]
+
+def impostor_quad(vertices):
+    """
+    The quad of a prototype's impostor: as wide as the prototype can be seen from any side and as tall as it is
+    """
+    half_width = np.sqrt(vertices[:, 0] ** 2 + vertices[:, 2] ** 2).max()
+    height = max(vertices[:, 1].max(), 1e-3)
+    corners = np.zeros((4, vertices.shape[1]), dtype = np.float32)
+    corners[:, 0] = (-half_width, half_width, half_width, -half_width)
+    corners[:, 1] = (0, 0, height, height)
+    corners[:, 5] = -1
+    corners[:, 6] = (0, 1, 1, 0)
+    corners[:, 7] = (0, 0, 1, 1)
+    corners[:, 8:12] = 1
+    return corners, np.array(((0, 1, 2), (0, 2, 3)), dtype = np.uint32)
+
+def impostor_picture(geom, texture, quad, clear_color):
+    """
+    Renders a prototype from the side into a texture with a clear background, once, on the next frame
+    """
+    picture = PandaTexture("impostor")
+    properties = FrameBufferProperties()
+    properties.setRgbaBits(8, 8, 8, 8)
+    properties.setDepthBits(16)
+    buffer = application.base.win.makeTextureBuffer("impostor", IMPOSTOR_SIZE, IMPOSTOR_SIZE, picture, True, properties)
+    if buffer is None:
+        return None
+    buffer.setClearColor(clear_color)
+    buffer.setOneShot(True)
+
+    # Unlit, the shader lights the impostor where it stands
+    scene = NodePath("impostor")
+    model = scene.attachNewNode(geom_node("prototype", geom))
+    if texture is not None:
+        model.setTexture(texture, 1)
+
+    width = float(quad[:, 0].max() * 2)
+    height = float(quad[:, 1].max())
+    lens = OrthographicLens()
+    lens.setFilmSize(width, height)
+    lens.setNearFar(-width, width)
+    camera = scene.attachNewNode(Camera("impostor", lens))
+    camera.setPos(0, height / 2, 0)
+    buffer.makeDisplayRegion().setCamera(camera)
+
+    picture.setWrapU(SamplerState.WM_clamp)
+    picture.setWrapV(SamplerState.WM_clamp)
+    picture.setMinfilter(SamplerState.FT_linear)
+    picture.setMagfilter(SamplerState.FT_linear)
+    return picture
+
+# A track's details under one node. Repeated details are drawn with instancing
+# in cells that each switch between the prototype's levels by distance;
+# set_graphics() picks the distances and hides what's only drawn on fancy.
+class Scenery(Entity):
+    def __init__(self, batches):
+        super().__init__(model = NodePath("scenery"))
+
+        self.fancy_only = []
+        # Every LODNode and how many levels it has
+        self.lods = []
+
+        for batch in batches:
+            node = self.model.attachNewNode(batch.texture)
+            texture = load_texture(batch.texture)
+            texture = texture._texture if texture is not None else None
+            if texture is not None:
+                node.setTexture(texture, 1)
+            if batch.transforms is None:
+                node.attachNewNode(geom_node(batch.texture, mesh_geom(batch.vertices, batch.triangles)))
+            else:
+                self.add_copies(node, batch, texture)
+            if not batch.fast:
+                self.fancy_only.append(node)
+
+    def add_copies(self, node, batch, texture):
+        """
+        Draws an instanced batch in cells, each with its levels under an LODNode
+        """
+        node.setShader(instanced_shader(), 1)
+        levels = [(batch.vertices, batch.triangles)] + batch.lods
+        # Every cell draws the same corners and triangles of a level, only the copies differ
+        arrays = [mesh_arrays(vertices, triangles) for vertices, triangles in levels]
+
+        picture = None
+        if batch.impostor:
+            quad = impostor_quad(batch.vertices)
+            clear_color = tuple(batch.vertices[:, 8:11].mean(axis = 0)) + (0, )
+            picture = impostor_picture(mesh_geom(batch.vertices, batch.triangles), texture, quad[0], clear_color)
+            if picture is not None:
+                levels.append(quad)
+                arrays.append(mesh_arrays(*quad))
+
+        for rows, center in copy_cells(batch.transforms):
+            transforms = batch.transforms[rows]
+            lod = LODNode(batch.texture)
+            lod.setCenter(Point3(*center))
+            lod_path = node.attachNewNode(lod)
+            for i, ((vertices, triangles), (corners, primitive)) in enumerate(zip(levels, arrays)):
+                level = lod_path.attachNewNode(geom_node(f"{batch.texture} {i}", copies_geom(corners, primitive)))
+                set_copies(level, transforms)
+                level.node().setBounds(copies_bounds(vertices, transforms))
+                level.node().setFinal(True)
+                if picture is not None and i == len(levels) - 1:
+                    level.setShader(instanced_shader(IMPOSTOR_VERTEX_SHADER), 2)
+                    level.setTexture(picture, 2)
+                    level.setTwoSided(True)
+            set_lod_switches(lod, len(levels), LOD_DISTANCES["fancy"])
+            self.lods.append((lod, len(levels)))
+
+    def set_graphics(self, graphics):
+        """
+        Switches levels at the distances of a graphics setting, and only shows what's drawn on fancy graphics on fancy
+        """
+        for lod, count in self.lods:
+            set_lod_switches(lod, count, LOD_DISTANCES[graphics])
+        for node in self.fancy_only:
+            if graphics == "fancy":
+                node.unstash()
+            else:
+                node.stash()
@@ -0,0 +1,212 @@
+"""
+Headless AI races, for tuning difficulty, waypoints and lap time goals.
+
+Runs races of AI cars on a track without a window, much faster than real time,
+spread over a pool of processes. The AI drive the way they do in game: the
+vectorized batch physics on the track's baked heightfield and wall field,
+thinking like AICar does (ai_driver.py: the racing line, getting round each
+other, the track's fixes, stuck checks and resets), bumping into each other
+and reset by the track's triggers.
+
+    python simulate.py sand_track --races 32 --ai 8 --laps 3
+
+Run it on every track (python simulate.py all) after changing the physics,
+the ground and walls or the AI: it exits with an error if any track finishes
+no laps.
+
+Laps are counted and timed through the track's checkpoints in order, like the
+race tracker does in game (checkpoints.py): the first crossing of the finish
+line starts the clock, every checkpoint after it ends a sector, and a reset
+throws away the lap the car was on.
+"""
+import os
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from vehicle_batch import VehicleBatch
+from heightfield import track_heightfield
+from wall_field import track_walls
+from racing_line import track_racing_line
+from spatial_hash import SpatialHash
+from ai_driver import drive, unstick, reset_position, STUCK_FIRST_CHECK, STUCK_INTERVAL
+from car_collision import CarCollisions
+from car_definitions import CAR_TYPES, car_definition
+from starting_grid import grid_slots
+from checkpoints import Checkpoints
+from trigger_volumes import TriggerVolumes
+from track_definitions import TRACK_NAMES, track_spec, track_part
+
+# In game the AI think and are stepped once a frame (every few frames far
+# from the camera, update_lod.py); here every AI is, at this frame rate
+FRAME_RATE = 60
+
+def simulate_race(track, ai_count = 3, laps = 3, difficulty = None, seed = 0, time_limit = 300, frame_rate = FRAME_RATE):
+    """
+    Races ai_count AI for laps laps (or time_limit seconds) and returns a dict
+    per AI with its lap times, the sector times of each lap, stuck events and resets
+    """
+    spec = track_spec(track)
+    ai = spec["ai"]
+    ground = track_heightfield(track)
+    walls = track_walls(track)
+    line = track_racing_line(track)
+    rng = random.Random(seed)
+    dt = 1 / frame_rate
+
+    vehicles = VehicleBatch(seed)
+    slots, rotations = grid_slots(line, spec["grid"]["position"], spec["grid"]["rotation_y"], ai_count)
+    for slot, rotation in zip(slots, rotations):
+        vehicles.add(tuple(slot), rotation)
+    vehicles.difficulty[:] = ai["difficulty"] if difficulty is None else difficulty
+    for i in range(ai_count):
+        definition = car_definition(rng.choice(CAR_TYPES))
+        vehicles.half_width[i], vehicles.half_length[i] = definition["footprint"]
+        vehicles.mass[i] = definition["mass"]
+
+    checkpoints = Checkpoints(spec["checkpoints"])
+    cars = list(range(ai_count))
+    index = [line.nearest(vehicles.x[i], vehicles.z[i]) for i in range(ai_count)]
+    results = [{"laps": [], "sectors": [], "stuck": 0, "resets": 0} for i in range(ai_count)]
+    old_position = [(vehicles.x[i], vehicles.y[i], vehicles.z[i]) for i in range(ai_count)]
+    avoid_offset = [0] * ai_count
+    grid = SpatialHash()
+    collisions = CarCollisions()
+    next_stuck_check = STUCK_FIRST_CHECK
+
+    def reset(i):
+        x, y, z = reset_position(ai["reset"]["position"], ai["reset"]["spread"], rng)
+        vehicles.teleport(i, (x, y, z), ai["reset"]["rotation_y"])
+        vehicles.speed[i] = 0
+        vehicles.velocity_y[i] = 0
+        index[i] = line.nearest(x, z)
+        checkpoints.restart(i)
+        results[i]["resets"] += 1
+
+    # The track's triggers that put AI back (TriggerManager in game); the AI are scale 1
+    triggers = TriggerVolumes()
+    for name in ai["reset_triggers"]:
+        part = track_part(track, name)
+        triggers.add(name, part["position"], part["scale"], on_enter = reset)
+    reach = np.ones(ai_count)
+
+    ticks = int(time_limit * frame_rate)
+    for tick in range(ticks):
+        now = tick * dt
+
+        # Laps through every checkpoint in order (RaceTracker)
+        for i, gate, sector, lap in checkpoints.update(cars, vehicles.x, vehicles.y, vehicles.z, dt):
+            if lap is not None:
+                results[i]["laps"].append(lap)
+                results[i]["sectors"].append(checkpoints.last_sectors[i])
+
+        # AICar.update
+        grid.build(vehicles.x, vehicles.z)
+        speeds = vehicles.speed.tolist()
+        for i in range(ai_count):
+            index[i], avoid_offset[i], off_track = drive(vehicles, i, line, index[i], avoid_offset[i], ai["fixes"], dt, grid, i, speeds)
+            if off_track:
+                reset(i)
+
+        # AICar.same_pos
+        if now >= next_stuck_check:
+            next_stuck_check += STUCK_INTERVAL
+            for i in range(ai_count):
+                old_position[i], stuck = unstick(vehicles, i, old_position[i], rng, dt)
+                results[i]["stuck"] += stuck
+
+        vehicles.step(dt, ground, walls)
+
+        # Car to car hits
+        hit = collisions.solve(vehicles.x, vehicles.z, vehicles.rotation_y, vehicles.pivot_rotation_y, vehicles.speed, vehicles.half_width, vehicles.half_length, vehicles.mass)
+        if hit.any():
+            bumped = np.nonzero(hit)[0]
+            vehicles.bump(bumped, collisions.push_x[bumped], collisions.push_z[bumped], collisions.speed[bumped], collisions.spin[bumped], walls)
+
+        # TriggerManager
+        triggers.update(cars, vehicles.x, vehicles.y, vehicles.z, reach, reach / 2, reach)
+
+        if all(len(result["laps"]) >= laps for result in results):
+            break
+
+    for result in results:
+        result["laps"] = result["laps"][:laps]
+        result["sectors"] = result["sectors"][:laps]
+        result["time"] = (tick + 1) * dt
+    return results
+
+def _run(arguments):
+    return simulate_race(*arguments)
+
+def print_table(track, races):
+    """
+    One row per race, then every lap of every race together
+    """
+    print(f"{'race':>4} {'ai':>3} {'laps':>5} {'best':>8} {'mean':>8} {'worst':>8} {'stuck':>6} {'resets':>6} {'time':>7}")
+    all_laps = []
+    for number, results in enumerate(races):
+        laps = [lap for result in results for lap in result["laps"]]
+        all_laps += laps
+        best = f"{min(laps):8.2f}" if laps else f"{'-':>8}"
+        mean = f"{sum(laps) / len(laps):8.2f}" if laps else f"{'-':>8}"
+        worst = f"{max(laps):8.2f}" if laps else f"{'-':>8}"
+        stuck = sum(result["stuck"] for result in results)
+        resets = sum(result["resets"] for result in results)
+        print(f"{number:>4} {len(results):>3} {len(laps):>5} {best} {mean} {worst} {stuck:>6} {resets:>6} {results[0]['time']:>7.1f}")
+
+    print()
+    if all_laps:
+        laps = np.array(all_laps)
+        print(f"{track}: {len(laps)} laps, best {laps.min():.2f}s, median {np.median(laps):.2f}s, mean {laps.mean():.2f}s, 90% under {np.percentile(laps, 90):.2f}s")
+        sectors = np.array([lap for results in races for result in results for lap in result["sectors"]])
+        best = sectors.min(axis = 0)
+        print(f"sectors: best {' '.join(f'{time:.2f}s' for time in best)} (ideal lap {best.sum():.2f}s), median {' '.join(f'{time:.2f}s' for time in np.median(sectors, axis = 0))}")
+    else:
+        print(f"{track}: no laps finished")
+    stuck = sum(result["stuck"] for results in races for result in results)
+    resets = sum(result["resets"] for results in races for result in results)
+    print(f"{stuck} stuck events, {resets} resets")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Headless AI races")
+    parser.add_argument("tracks", nargs = "+", choices = TRACK_NAMES + ("all", ), help = "tracks to race on, or all of them")
+    parser.add_argument("--races", type = int, default = 8)
+    parser.add_argument("--ai", type = int, default = 3, help = "AI cars per race")
+    parser.add_argument("--laps", type = int, default = 3)
+    parser.add_argument("--difficulty", type = float, default = None, help = "defaults to the track's difficulty in game")
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--time-limit", type = float, default = 300, help = "seconds of racing at most")
+    parser.add_argument("--frame-rate", type = float, default = FRAME_RATE, help = "frames per second the AI think and are stepped at")
+    parser.add_argument("--workers", type = int, default = os.cpu_count())
+    args = parser.parse_args()
+    tracks = list(TRACK_NAMES) if "all" in args.tracks else list(dict.fromkeys(args.tracks))
+
+    # Tracks where no AI finished a lap, so a run over every track fails when one of them is broken
+    failed = []
+    for number, track in enumerate(tracks):
+        if number:
+            print()
+
+        # Bake the track once here rather than in every worker
+        track_heightfield(track).get()
+        track_walls(track).get()
+
+        jobs = [(track, args.ai, args.laps, args.difficulty, args.seed + race, args.time_limit, args.frame_rate) for race in range(args.races)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers = args.workers) as pool:
+            races = list(pool.map(_run, jobs))
+        elapsed = time.perf_counter() - start
+
+        print_table(track, races)
+        simulated = sum(results[0]["time"] for results in races)
+        print(f"simulated {simulated:.0f}s of racing in {elapsed:.1f}s ({simulated / elapsed:.0f}x real time)")
+        if not any(result["laps"] for results in races for result in results):
+            failed.append(track)
+
+    if failed:
+        print()
+        print(f"no laps finished on {', '.join(failed)}")
+        raise SystemExit(1)
@@ -0,0 +1,107 @@
+"""
+Uniform grid over the cars on the ground plane, for finding the cars near a point.
+
+The grid is rebuilt from every car's position once per tick with a few array
+operations: the cars are sorted by the cell they are in and each cell keeps
+the range of the sorted cars it holds. Asking for the cars near a point only
+looks at the cells around it, so it costs the same however many cars there
+are, instead of checking every pair of cars.
+
+Doesn't use Ursina.
+"""
+import math
+import numpy as np
+
+# Cells should be at least as big as the distances asked for, so a query only reads the 3x3 cells around it
+CELL_SIZE = 16
+
+# Cell z coordinates go in the low bits of a cell's key
+KEY_STRIDE = 1 << 21
+
+class SpatialHash:
+    """
+    The cars in every occupied cell of a grid
+    """
+    def __init__(self, cell_size = CELL_SIZE):
+        self.cell_size = cell_size
+        self.build((), ())
+
+    def build(self, x, z):
+        """
+        Puts the cars at x, z into the grid, replacing the last ones
+        """
+        x = np.asarray(x, dtype = np.float64)
+        z = np.asarray(z, dtype = np.float64)
+        self.count = len(x)
+        self.x = x.tolist()
+        self.z = z.tolist()
+
+        self.x_array = x
+        self.z_array = z
+        self.cell_x = np.floor(x / self.cell_size).astype(np.int64)
+        self.cell_z = np.floor(z / self.cell_size).astype(np.int64)
+        keys = self.cell_x * KEY_STRIDE + self.cell_z
+        order = np.argsort(keys, kind = "stable")
+        self.sorted_keys = keys[order]
+        self.sorted_order = order
+        self.order = None
+        self.cells = None
+
+    def index_cells(self):
+        """
+        The range of the sorted cars in every occupied cell, for near()
+        """
+        cell_keys, starts, counts = np.unique(self.sorted_keys, return_index = True, return_counts = True)
+        self.order = self.sorted_order.tolist()
+        self.cells = dict(zip(cell_keys.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+
+    def near(self, x, z, radius):
+        """
+        The indices of the cars within radius of a point
+        """
+        if self.cells is None:
+            self.index_cells()
+        size = self.cell_size
+        first_x = math.floor((x - radius) / size)
+        last_x = math.floor((x + radius) / size)
+        first_z = math.floor((z - radius) / size)
+        last_z = math.floor((z + radius) / size)
+        radius_squared = radius * radius
+
+        found = []
+        for cell_x in range(first_x, last_x + 1):
+            for cell_z in range(first_z, last_z + 1):
+                cell = self.cells.get(cell_x * KEY_STRIDE + cell_z)
+                if cell is None:
+                    continue
+                for i in self.order[cell[0]:cell[1]]:
+                    dx = self.x[i] - x
+                    dz = self.z[i] - z
+                    if dx * dx + dz * dz <= radius_squared:
+                        found.append(i)
+        return found
+
+    def pairs(self, radius):
+        """
+        Every pair of cars closer than radius, as two index arrays (first < second).
+        Looks up every neighbouring cell of every car at once.
+        """
+        reach = math.ceil(radius / self.cell_size)
+        offsets = np.arange(-reach, reach + 1)
+        offset_x = np.repeat(offsets, len(offsets))
+        offset_z = np.tile(offsets, len(offsets))
+
+        # One row per (car, neighbouring cell)
+        keys = ((self.cell_x[:, None] + offset_x) * KEY_STRIDE + self.cell_z[:, None] + offset_z).ravel()
+        starts = np.searchsorted(self.sorted_keys, keys, side = "left")
+        counts = np.searchsorted(self.sorted_keys, keys, side = "right") - starts
+
+        # Every car paired with every car in its neighbouring cells
+        within = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        first = np.repeat(np.repeat(np.arange(self.count), len(offset_x)), counts)
+        second = self.sorted_order[np.repeat(starts, counts) + within]
+
+        dx = self.x_array[second] - self.x_array[first]
+        dz = self.z_array[second] - self.z_array[first]
+        keep = (first < second) & (dx * dx + dz * dz <= radius * radius)
+        return first[keep], second[keep]
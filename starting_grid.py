@@ -0,0 +1,41 @@
+"""
+Starting grids.
+
+Cars line up in two columns behind their start, following the track's racing
+line back so a long grid bends with the track instead of running into walls.
+Doesn't use Ursina, so the simulator lines its AI up the same way.
+"""
+import numpy as np
+
+from racing_line import wrap_angle
+
+# Grid: distance between rows, between the two columns, and how many rows it
+# takes to move from the start over onto the racing line
+ROW_SPACING = 4
+COLUMN_SPACING = 3
+BLEND_ROWS = 8
+
+def grid_slots(line, position, rotation_y, count):
+    """
+    The positions (count, 3) and rotations of a grid starting at position and
+    going back along a racing line. The first row is at position, the rows
+    after it move over onto the line, keeping the height above the line.
+    """
+    start = line.distance(line.nearest(position[0], position[2]))
+    start_point = line.point_at(start)
+    offset = np.asarray(position, dtype = np.float64) - start_point
+    start_heading = line.headings[line.nearest(start_point[0], start_point[2])]
+
+    slots = np.zeros((count, 3))
+    rotations = np.zeros(count)
+    for slot in range(count):
+        row, column = divmod(slot, 2)
+        point = line.point_at(start - row * ROW_SPACING)
+        forward = line.point_at(start - row * ROW_SPACING + 1) - point
+        forward /= max(np.hypot(forward[0], forward[2]), 1e-9)
+        right = np.array((forward[2], 0, -forward[0]))
+        blend = max(0, 1 - row / BLEND_ROWS)
+        slots[slot] = point + offset * (blend, 1, blend) + right * (column - 0.5) * COLUMN_SPACING
+        heading = np.degrees(np.arctan2(forward[0], forward[2]))
+        rotations[slot] = rotation_y + wrap_angle(heading - start_heading)
+    return slots, rotations
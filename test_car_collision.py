@@ -0,0 +1,70 @@
+"""
+Tests for the hits between cars as boxes (car_collision.py)
+"""
+import math
+import numpy as np
+
+from car_collision import CarCollisions, RESTITUTION
+
+HALF_WIDTH = 1.3
+HALF_LENGTH = 2.2
+
+def solve(x, z, rotation_y, speed, heading = None, mass = None):
+    collisions = CarCollisions()
+    count = len(x)
+    collisions.solve(
+        x, z, rotation_y, rotation_y if heading is None else heading, speed,
+        [HALF_WIDTH] * count, [HALF_LENGTH] * count, [1.0] * count if mass is None else mass
+    )
+    return collisions
+
+def test_cars_apart_dont_hit():
+    collisions = solve([0, 3], [0, 0], [0, 0], [10, 10])
+    assert not collisions.hit.any()
+    assert np.all(collisions.push_x == 0)
+
+def test_side_by_side_are_pushed_apart_sideways():
+    # Overlapping by 0.6 along x, the right axis of both cars, and by 3.4 along z
+    collisions = solve([0, 2], [0, 1], [0, 0], [0, 0])
+    assert collisions.hit.all()
+    assert np.allclose(collisions.push_x, (-0.3, 0.3))
+    assert np.allclose(collisions.push_z, 0)
+
+def test_nose_to_tail_are_pushed_apart_lengthways():
+    collisions = solve([0, 0.5], [0, 4], [0, 0], [0, 0])
+    assert np.allclose(collisions.push_x, 0)
+    assert np.allclose(collisions.push_z, (-0.2, 0.2))
+
+def test_turned_car_separates_along_its_own_axis():
+    # The second car is turned 90 degrees, so its length lies along x
+    collisions = solve([0, 3.2], [0, 0], [0, 90], [0, 0])
+    assert collisions.hit.all()
+    # Overlap along x: 1.3 + 2.2 - 3.2
+    assert np.allclose(collisions.push_x, (-0.15, 0.15))
+    assert np.allclose(collisions.push_z, 0)
+
+def test_rear_end_keeps_momentum_between_equal_masses():
+    speed = np.array([20.0, 5.0])
+    collisions = solve([0, 0], [0, 4], [0, 0], speed)
+    assert math.isclose(collisions.speed.sum(), speed.sum())
+    # The cars part at RESTITUTION of the speed they met at
+    assert math.isclose(collisions.speed[1] - collisions.speed[0], RESTITUTION * (speed[0] - speed[1]))
+    # Straight hits don't spin them
+    assert np.allclose(collisions.spin, 0)
+
+def test_head_on_keeps_momentum_between_equal_masses():
+    collisions = solve([0, 0], [0, 4], [0, 180], [10, 10])
+    # Velocities along z before: 10 and -10
+    velocity_z = collisions.speed * np.cos(np.radians([0, 180]))
+    assert math.isclose(velocity_z.sum(), 0, abs_tol = 1e-9)
+    assert math.isclose(velocity_z[0], -RESTITUTION * 10)
+
+def test_off_centre_hit_spins_both_cars():
+    collisions = solve([0, 1.5], [0, 4], [0, 0], [20, 5])
+    assert collisions.spin[0] != 0
+    assert collisions.spin[1] != 0
+
+def test_infinite_mass_isnt_moved():
+    collisions = solve([0, 2], [0, 1], [0, 0], [0, 10], mass = [1.0, math.inf])
+    assert np.allclose(collisions.push_x, (-0.6, 0))
+    assert collisions.speed[1] == 10
@@ -0,0 +1,117 @@
+"""
+Tests for lap validation through the checkpoints (checkpoints.py)
+"""
+import math
+
+from checkpoints import Checkpoints, JUMP_DISTANCE
+
+# A finish line across the road at the origin, driven through going +z, and
+# one gate further round at x = 100, driven through going -z
+GATES = [
+    {"name": "finish", "position": (0, 0, 0), "rotation_y": 0, "width": 20, "height": 10},
+    {"name": "gate", "position": (100, 0, 50), "rotation_y": 180, "width": 20, "height": 10},
+]
+
+TICK = 0.1
+
+def drive(checkpoints, points, key = "car", step = 5):
+    """
+    Drives a car along points in ticks of at most step units and returns its crossings
+    """
+    crossings = []
+    x, z = points[0]
+    for target_x, target_z in points[1:]:
+        ticks = max(1, math.ceil(math.hypot(target_x - x, target_z - z) / step))
+        start_x, start_z = x, z
+        for i in range(1, ticks + 1):
+            x = start_x + (target_x - start_x) * i / ticks
+            z = start_z + (target_z - start_z) * i / ticks
+            crossings += checkpoints.update([key], [x], [0], [z], TICK)
+    return crossings
+
+# Across the finish line to start a lap, through the gate and back over the finish line
+START = [(0, -10), (0, 10)]
+THROUGH_GATE = [(0, 10), (100, 60), (100, 40)]
+BACK_TO_FINISH = [(100, 40), (0, -10), (0, 10)]
+
+def gates(crossings):
+    return [gate for key, gate, sector, lap in crossings]
+
+def test_lap_through_every_gate_in_order():
+    checkpoints = Checkpoints(GATES)
+    crossings = drive(checkpoints, START + THROUGH_GATE[1:] + BACK_TO_FINISH[1:])
+
+    assert gates(crossings) == [0, 1, 0]
+    key, gate, sector, lap = crossings[0]
+    assert sector is None and lap is None
+    key, gate, sector, lap = crossings[-1]
+    assert lap is not None and lap > 0
+    assert lap == sum(checkpoints.last_sectors[checkpoints.get("car")])
+    assert checkpoints.laps[checkpoints.get("car")] == 1
+
+def test_skipping_a_gate_doesnt_finish_the_lap():
+    checkpoints = Checkpoints(GATES)
+    crossings = drive(checkpoints, START + [(30, 10), (30, -10), (0, -10), (0, 10)])
+
+    assert gates(crossings) == [0]
+    assert checkpoints.laps[checkpoints.get("car")] == 0
+
+def test_driving_through_backwards_doesnt_count():
+    checkpoints = Checkpoints(GATES)
+    crossings = drive(checkpoints, [(0, 10), (0, -10)])
+
+    assert crossings == []
+
+def test_passing_beside_a_gate_doesnt_count():
+    checkpoints = Checkpoints(GATES)
+    crossings = drive(checkpoints, [(15, -10), (15, 10)])
+
+    assert crossings == []
+
+def test_restart_throws_away_the_lap():
+    checkpoints = Checkpoints(GATES)
+    drive(checkpoints, START + THROUGH_GATE[1:])
+    checkpoints.restart("car")
+    crossings = drive(checkpoints, BACK_TO_FINISH)
+
+    # The finish line starts a new lap instead of finishing one
+    assert gates(crossings) == [0]
+    key, gate, sector, lap = crossings[0]
+    assert sector is None and lap is None
+    assert checkpoints.laps[checkpoints.get("car")] == 0
+
+def test_jumping_further_than_a_tick_starts_over():
+    checkpoints = Checkpoints(GATES)
+    drive(checkpoints, START + THROUGH_GATE[1:])
+    # Respawned next to the finish line
+    checkpoints.update(["car"], [0], [0], [-10], TICK)
+    crossings = drive(checkpoints, [(0, -10), (0, 10)])
+
+    key, gate, sector, lap = crossings[0]
+    assert gate == 0 and lap is None
+    assert checkpoints.laps[checkpoints.get("car")] == 0
+
+def test_jumping_across_a_gate_doesnt_count():
+    checkpoints = Checkpoints(GATES)
+    checkpoints.update(["car"], [0], [0], [-10], TICK)
+    crossings = checkpoints.update(["car"], [0], [0], [JUMP_DISTANCE], TICK)
+
+    assert crossings == []
+
+def test_crossing_is_timed_between_ticks():
+    checkpoints = Checkpoints(GATES)
+    checkpoints.update(["car"], [0], [0], [-1], TICK)
+    checkpoints.update(["car"], [0], [0], [3], TICK)
+    checkpoints.update(["car"], [0], [0], [7], TICK)
+    assert math.isclose(checkpoints.lap_start[checkpoints.get("car")], TICK + TICK / 4)
+
+def test_cars_are_tracked_separately():
+    checkpoints = Checkpoints(GATES)
+    checkpoints.update(["a", "b"], [0, 0], [0, 0], [-5, -5], TICK)
+    crossings = checkpoints.update(["a", "b"], [0, 0], [0, 0], [5, -4], TICK)
+    assert [(key, gate) for key, gate, sector, lap in crossings] == [("a", 0)]
+
+    # A car leaving keeps the others' progress
+    crossings = checkpoints.update(["b"], [0], [0], [5], TICK)
+    assert [(key, gate) for key, gate, sector, lap in crossings] == [("b", 0)]
+    assert checkpoints.get("a") is None
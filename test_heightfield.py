@@ -0,0 +1,89 @@
+"""
+Tests for picking the ground layer under a car and stopping it at hillsides (heightfield.py)
+"""
+import math
+import numpy as np
+
+from heightfield import Heightfield
+
+def quad(x0, x1, z0, z1, y):
+    """
+    Two triangles of a flat rectangle at height y
+    """
+    a, b, c, d = (x0, y, z0), (x1, y, z0), (x1, y, z1), (x0, y, z1)
+    return [(a, b, c), (a, c, d)]
+
+def bridge_field():
+    """
+    Flat ground at 0 from -20 to 20, and a bridge at 10 over it from x = -4 to 4
+    """
+    return Heightfield.bake(quad(-20, 20, -20, 20, 0) + quad(-4, 4, -20, 20, 10))
+
+def step_field():
+    """
+    Flat ground at 0 for x < 0 and a cliff up to 5 for x > 0
+    """
+    return Heightfield.bake(quad(-20, 0, -20, 20, 0) + quad(0, 20, -20, 20, 5))
+
+def test_bridge_is_two_layers():
+    field = bridge_field()
+    assert field.heights[0, 10, 20] == 10
+    assert field.heights[1, 10, 20] == 0
+
+def test_on_the_bridge():
+    distance, height, normal = bridge_field().ground(0, 12, 0)
+    assert math.isclose(height, 10)
+    assert math.isclose(distance, 2)
+    assert np.allclose(normal, (0, 1, 0))
+
+def test_under_the_bridge():
+    distance, height, normal = bridge_field().ground(0, 2, 0)
+    assert math.isclose(height, 0)
+    assert math.isclose(distance, 2)
+
+def test_beside_the_bridge():
+    distance, height, normal = bridge_field().ground(10, 12, 0)
+    assert math.isclose(height, 0)
+
+def test_a_little_below_the_ground_still_counts():
+    # Driving uphill the ground just ahead is a bit above the car
+    distance, height, normal = bridge_field().ground(0, 9, 0)
+    assert math.isclose(height, 10)
+    assert distance == 0
+
+def test_below_every_layer_stands_on_the_lowest():
+    distance, height, normal = bridge_field().ground(0, -5, 0)
+    assert math.isclose(height, 0)
+    assert distance == 0
+
+def test_outside_the_grid_has_no_ground():
+    distance, height, normal = bridge_field().ground(50, 5, 0)
+    assert distance == math.inf
+
+def test_ground_many_matches_ground():
+    field = bridge_field()
+    points = [(0, 12, 0), (0, 2, 0), (10, 12, 0), (0, 9, 0), (0, -5, 0), (3.5, 12, 1.3), (50, 5, 0)]
+    x, y, z = (np.array(values, dtype = np.float64) for values in zip(*points))
+    distances, heights, normals = field.ground_many(x, y, z)
+    for i, point in enumerate(points):
+        distance, height, normal = field.ground(*point)
+        assert math.isclose(distances[i], distance, abs_tol = 1e-6)
+        assert math.isclose(heights[i], height, abs_tol = 1e-6)
+        assert np.allclose(normals[i], normal, atol = 1e-5)
+
+def test_cliff_stops_the_car():
+    assert step_field().stop_at_slopes(-1, 1.4, 0, 1, 0) == (-1, 0)
+
+def test_cliff_lets_the_car_slide_along_it():
+    assert step_field().stop_at_slopes(-1, 1.4, 0, 1, 2) == (-1, 2)
+
+def test_driving_off_the_cliff_is_free():
+    assert step_field().stop_at_slopes(1, 6.4, 0, -1, 0) == (-1, 0)
+
+def test_stop_at_slopes_many_matches_stop_at_slopes():
+    field = step_field()
+    moves = [(-1, 1.4, 0, 1, 0), (-1, 1.4, 0, 1, 2), (1, 6.4, 0, -1, 0), (-5, 1.4, 0, -4, 1)]
+    x, y, z, new_x, new_z = (np.array(values, dtype = np.float64) for values in zip(*moves))
+    end_x, end_z = field.stop_at_slopes_many(x, y, z, new_x, new_z)
+    for i, move in enumerate(moves):
+        assert (end_x[i], end_z[i]) == field.stop_at_slopes(*move)
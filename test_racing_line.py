@@ -0,0 +1,79 @@
+"""
+Tests for following a racing line (racing_line.py): the nearest sample and the corner speeds
+"""
+import math
+import numpy as np
+
+from racing_line import RacingLine, corner_speeds, AHEAD, LOST_DISTANCE, CORNER_BRAKING, MIN_CORNER_SPEED
+
+RADIUS = 50
+
+def circle_line():
+    """
+    A line round a circle, anticlockwise seen from above
+    """
+    angles = np.radians(np.arange(0, 360, 30))
+    return RacingLine(np.stack((np.cos(angles) * RADIUS, np.zeros(len(angles)), np.sin(angles) * RADIUS), axis = 1))
+
+def test_nearest_is_the_closest_sample():
+    line = circle_line()
+    index = line.nearest(0, RADIUS + 3)
+    distances = np.hypot(line.x, line.z - RADIUS - 3)
+    assert distances[index] == distances.min()
+
+def test_track_follows_a_car_round_the_loop():
+    line = circle_line()
+    index = line.nearest(RADIUS, 0)
+    travelled = 0.0
+    for angle in np.radians(np.arange(0, 720, 2)):
+        x, z = math.cos(angle) * (RADIUS + 2), math.sin(angle) * (RADIUS + 2)
+        new_index = line.track(index, x, z)
+        assert new_index == line.nearest(x, z)
+        step = (new_index - index) % line.count
+        assert step <= AHEAD
+        travelled += (line.arc[new_index] - line.arc[index]) % line.length
+        index = new_index
+    # Twice round, wrapping over the start of the line
+    assert math.isclose(travelled, 2 * line.length, rel_tol = 0.02)
+
+def test_track_finds_a_car_that_was_moved():
+    line = circle_line()
+    index = line.nearest(RADIUS, 0)
+    x, z = -RADIUS, 0
+    assert math.hypot(line.x[index] - x, line.z[index] - z) > LOST_DISTANCE
+    assert line.track(index, x, z) == line.nearest(x, z)
+
+def test_distance_runs_round_the_loop():
+    line = circle_line()
+    assert line.distance(0) == 0
+    assert np.all(np.diff(line.arc) > 0)
+    assert math.isclose(line.length, 2 * math.pi * RADIUS, rel_tol = 0.01)
+
+def test_point_at_wraps_around():
+    line = circle_line()
+    assert np.allclose(line.point_at(line.length + 10), line.point_at(10))
+
+def square_headings(side = 100, corner = 10):
+    """
+    Headings of a square loop sampled every unit, turning 90 degrees over corner samples at each corner
+    """
+    headings = []
+    for i in range(4):
+        headings += [i * 90.0] * side
+        headings += list(i * 90.0 + np.arange(1, corner + 1) * 90.0 / corner)
+    return (np.array(headings) + 180) % 360 - 180
+
+def test_corners_are_slower_than_straights():
+    speeds = corner_speeds(square_headings(), 1.0)
+    assert speeds.min() == MIN_CORNER_SPEED
+    assert speeds[50] > 4 * speeds[105]
+
+def test_corner_speeds_leave_room_to_brake():
+    speeds = corner_speeds(square_headings(), 1.0)
+    ahead = np.roll(speeds, -1)
+    assert np.all(speeds <= np.sqrt(ahead * ahead + 2 * CORNER_BRAKING) + 1e-9)
+
+def test_gentle_bends_arent_limited():
+    # A huge circle turns a degree over the corner window
+    speeds = corner_speeds(np.linspace(0, 360, 36000, endpoint = False), 1.0)
+    assert speeds.min() > 100
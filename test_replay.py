@@ -0,0 +1,69 @@
+"""
+Tests for recording laps as inputs and playing them back (replay.py)
+"""
+import pytest
+
+from physics import CarState, CarInputs, FlatWorld, TICK, step
+from replay import Replay, ReplayError, ReplayRecorder, ReplayPlayer, state_values
+
+RESPAWN_TICK = 150
+
+def inputs_at(tick):
+    """
+    Full throttle with some steering, braking and a handbrake turn
+    """
+    return CarInputs(
+        forward = tick % 200 < 170,
+        left = 40 <= tick % 120 < 70,
+        brake = tick % 200 >= 185,
+        right = 90 <= tick % 120 < 105,
+        handbrake = 100 <= tick < 110
+    )
+
+def record(ticks = 300):
+    """
+    Drives a car on flat ground, respawning it part of the way through, and
+    returns the replay and the car's state after every tick
+    """
+    world = FlatWorld()
+    state = CarState((0, 1.4, 0), 30)
+    recorder = ReplayRecorder(state, "sports", "sand_track", "race", seed = 7)
+    states = []
+    for tick in range(ticks):
+        if tick == RESPAWN_TICK:
+            state.position = (5, 1.4, -5)
+            state.rotation_y = state.pivot_rotation_y = 90
+            state.speed = 0
+        recorder.check(state)
+        inputs = inputs_at(tick)
+        recorder.record(inputs)
+        step(state, inputs, TICK, world)
+        recorder.stepped(state)
+        states.append(state_values(state))
+    return recorder.replay, states
+
+def test_respawn_is_a_snapshot():
+    replay, states = record()
+    assert list(replay.snapshots) == [RESPAWN_TICK]
+
+def test_bytes_round_trip():
+    replay, states = record()
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert (loaded.car_type, loaded.track, loaded.gamemode, loaded.seed, loaded.tick_rate) == ("sports", "sand_track", "race", 7, replay.tick_rate)
+    assert loaded.start == replay.start
+    assert loaded.inputs == replay.inputs
+    assert loaded.snapshots == replay.snapshots
+
+def test_playback_drives_the_same_line():
+    replay, states = record()
+    player = ReplayPlayer(Replay.from_bytes(replay.to_bytes()), FlatWorld())
+    for expected in states:
+        assert player.step()
+        assert state_values(player.state) == expected
+    assert not player.step()
+
+def test_cut_off_replay_is_an_error():
+    data = record()[0].to_bytes()
+    for length in (0, 10, len(data) // 2, len(data) - 1):
+        with pytest.raises(ReplayError):
+            Replay.from_bytes(data[:length])
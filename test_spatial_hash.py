@@ -0,0 +1,54 @@
+"""
+Tests for finding the cars near a point and near each other (spatial_hash.py)
+"""
+import numpy as np
+
+from spatial_hash import SpatialHash
+
+def brute_near(x, z, point_x, point_z, radius):
+    return sorted(i for i in range(len(x)) if (x[i] - point_x) ** 2 + (z[i] - point_z) ** 2 <= radius * radius)
+
+def brute_pairs(x, z, radius):
+    return sorted(
+        (i, j) for i in range(len(x)) for j in range(i + 1, len(x))
+        if (x[i] - x[j]) ** 2 + (z[i] - z[j]) ** 2 <= radius * radius
+    )
+
+def test_near_across_cell_borders():
+    grid = SpatialHash(cell_size = 16)
+    # Either side of the borders at x = 0 and z = 16, and one too far away
+    grid.build([-0.5, 0.5, 3, -1, 40], [15.5, 16.5, 15, 17, 16])
+    assert sorted(grid.near(0, 16, 5)) == [0, 1, 2, 3]
+    assert sorted(grid.near(-0.5, 15.5, 2)) == [0, 1, 3]
+
+def test_near_with_negative_coordinates():
+    grid = SpatialHash(cell_size = 16)
+    grid.build([-16.2, -15.8, -31.9], [-0.1, 0.1, -0.1])
+    assert sorted(grid.near(-16, 0, 1)) == [0, 1]
+
+def test_near_matches_checking_every_car():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-100, 100, 200)
+    z = rng.uniform(-100, 100, 200)
+    grid = SpatialHash(cell_size = 16)
+    grid.build(x, z)
+    for point_x, point_z in rng.uniform(-100, 100, (20, 2)):
+        assert sorted(grid.near(point_x, point_z, 14)) == brute_near(x, z, point_x, point_z, 14)
+
+def test_pairs_match_checking_every_pair():
+    rng = np.random.default_rng(2)
+    x = rng.uniform(-60, 60, 150)
+    z = rng.uniform(-60, 60, 150)
+    grid = SpatialHash(cell_size = 16)
+    grid.build(x, z)
+    for radius in (5, 16, 30):
+        first, second = grid.pairs(radius)
+        assert sorted(zip(first.tolist(), second.tolist())) == brute_pairs(x, z, radius)
+
+def test_rebuilding_replaces_the_cars():
+    grid = SpatialHash()
+    grid.build([0, 1], [0, 1])
+    grid.near(0, 0, 5)
+    grid.build([50], [50])
+    assert grid.near(0, 0, 5) == []
+    assert grid.near(50, 50, 1) == [0]
@@ -0,0 +1,67 @@
+"""
+Tests for the enter and exit events of the trigger volumes (trigger_volumes.py)
+"""
+from trigger_volumes import TriggerVolumes, CELL_SIZE
+
+REACH = (1, 0.5, 2)
+
+def update(volumes, keys, positions):
+    x, y, z = zip(*positions)
+    count = len(keys)
+    return volumes.update(keys, x, y, z, [REACH[0]] * count, [REACH[1]] * count, [REACH[2]] * count)
+
+def recording_volumes():
+    """
+    A 10 unit box at the origin that records its callbacks
+    """
+    events = []
+    volumes = TriggerVolumes()
+    volumes.add("lake", (0, 0, 0), (10, 10, 10), on_enter = lambda key: events.append(("enter", key)), on_exit = lambda key: events.append(("exit", key)))
+    return volumes, events
+
+def test_enter_and_exit_fire_once():
+    volumes, events = recording_volumes()
+
+    assert update(volumes, ["car"], [(20, 0, 0)]) == ([], [])
+    assert update(volumes, ["car"], [(0, 0, 0)]) == ([("car", "lake")], [])
+    assert update(volumes, ["car"], [(1, 0, 0)]) == ([], [])
+    assert update(volumes, ["car"], [(20, 0, 0)]) == ([], [("car", "lake")])
+    assert events == [("enter", "car"), ("exit", "car")]
+
+def test_touching_counts_the_car_reach():
+    volumes, events = recording_volumes()
+
+    # The box ends at x = 5 and the car reaches 1 to the side and 2 in front
+    update(volumes, ["car"], [(5.9, 0, 0)])
+    update(volumes, ["car"], [(0, 0, 6.9)])
+    assert events == [("enter", "car")]
+    update(volumes, ["car"], [(6.1, 0, 0)])
+    assert events == [("enter", "car"), ("exit", "car")]
+
+def test_above_the_box_isnt_touching():
+    volumes, events = recording_volumes()
+
+    update(volumes, ["car"], [(0, 6, 0)])
+    assert events == []
+
+def test_cars_fire_their_own_events():
+    volumes, events = recording_volumes()
+
+    update(volumes, ["a", "b"], [(0, 0, 0), (20, 0, 0)])
+    update(volumes, ["a", "b"], [(20, 0, 0), (0, 0, 0)])
+    assert events == [("enter", "a"), ("exit", "a"), ("enter", "b")]
+
+def test_box_across_cells_is_found_from_every_cell():
+    volumes = TriggerVolumes()
+    volumes.add("wide", (CELL_SIZE, 0, 0), (CELL_SIZE, 4, 4))
+
+    keys = ["left", "middle", "right"]
+    entered, exited = update(volumes, keys, [(CELL_SIZE * 0.6, 0, 0), (CELL_SIZE, 0, 0), (CELL_SIZE * 1.4, 0, 0)])
+    assert entered == [(key, "wide") for key in keys]
+
+def test_clear_removes_the_volumes():
+    volumes, events = recording_volumes()
+    volumes.clear()
+
+    assert update(volumes, ["car"], [(0, 0, 0)]) == ([], [])
+    assert events == []
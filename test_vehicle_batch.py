@@ -0,0 +1,101 @@
+"""
+Tests for stepping the AI cars together in one batch (vehicle_batch.py)
+"""
+import math
+import numpy as np
+
+from heightfield import Heightfield
+from vehicle_batch import VehicleBatch, TURN_SPEED, THROTTLE_DISTANCE, BRAKING
+
+def flat_ground():
+    """
+    Flat ground at 0 from -50 to 50
+    """
+    a, b, c, d = (-50, 0, -50), (50, 0, -50), (50, 0, 50), (-50, 0, 50)
+    return Heightfield.bake([(a, b, c), (a, c, d)])
+
+def step_one(car, dt, ground, throttle):
+    """
+    One AI step of a single car written out with plain floats. throttle is the
+    random number the batch drew for the car.
+    """
+    car = dict(car)
+
+    # Drifting
+    pivot_rotation_distance = car["rotation_y"] - car["pivot_rotation_y"]
+    catch_up = car["drift_speed"] * (abs(pivot_rotation_distance) / 40) * dt
+    car["pivot_rotation_y"] += math.copysign(catch_up, pivot_rotation_distance) if pivot_rotation_distance else 0
+    if pivot_rotation_distance != 0:
+        car["speed"] -= abs(pivot_rotation_distance) / 4.5 * dt
+
+    # Throttle and brakes
+    distance, ground_y, normal = ground.ground(car["x"], car["y"], car["z"])
+    over = car["speed"] > car["target_speed"]
+    if distance <= THROTTLE_DISTANCE and throttle < 0.5 and not over:
+        car["speed"] += car["acceleration"] * car["difficulty"] * dt
+    if over and distance <= THROTTLE_DISTANCE:
+        car["speed"] = max(car["speed"] - BRAKING * dt, car["target_speed"])
+
+    # Turning
+    car["rotation_y"] += max(-TURN_SPEED * dt, min(car["target_rotation_y"] - car["rotation_y"], TURN_SPEED * dt))
+
+    # Caps
+    car["speed"] = min(car["speed"], car["topspeed"])
+    if car["speed"] <= 0.1:
+        car["speed"] = 0.1
+        car["pivot_rotation_y"] = car["rotation_y"]
+    car["drift_speed"] = max(20, min(car["drift_speed"], 40))
+
+    # Gravity
+    movement_y = car["velocity_y"] * dt
+    if distance <= 1.7 + abs(movement_y):
+        car["velocity_y"] = 0
+        if normal[1] > 0.7 and ground_y - car["y"] < 0.5:
+            car["y"] = ground_y + 1.4
+    else:
+        car["y"] += movement_y * 50 * dt
+        car["velocity_y"] -= 50 * dt
+
+    # Movement
+    heading = math.radians(car["pivot_rotation_y"])
+    new_x = car["x"] + math.sin(heading) * car["speed"] * dt
+    new_z = car["z"] + math.cos(heading) * car["speed"] * dt
+    car["x"], car["z"] = ground.stop_at_slopes(car["x"], car["y"], car["z"], new_x, new_z)
+    return car
+
+CARS = [
+    # Driving on the ground, turning right
+    {"x": 0, "y": 1.4, "z": 0, "rotation_y": 10, "pivot_rotation_y": 0, "speed": 12, "velocity_y": 0, "drift_speed": 35, "target_rotation_y": 40, "target_speed": np.inf},
+    # Faster than it should be for a corner
+    {"x": 10, "y": 1.4, "z": 5, "rotation_y": 90, "pivot_rotation_y": 90, "speed": 25, "velocity_y": 0, "drift_speed": 30, "target_rotation_y": 80, "target_speed": 15},
+    # Falling
+    {"x": -10, "y": 20, "z": -5, "rotation_y": -45, "pivot_rotation_y": -30, "speed": 8, "velocity_y": -3, "drift_speed": 25, "target_rotation_y": -50, "target_speed": np.inf},
+]
+
+def test_batch_step_matches_one_car_at_a_time():
+    ground = flat_ground()
+    dt = 1 / 60
+    batch = VehicleBatch(seed = 3)
+    for car in CARS:
+        index = batch.add((car["x"], car["y"], car["z"]), car["rotation_y"])
+        for name, value in car.items():
+            getattr(batch, name)[index] = value
+    throttle = np.random.default_rng(3).random(len(CARS))
+
+    batch.step(dt, ground)
+
+    for i, car in enumerate(CARS):
+        car = dict(car, topspeed = 30, acceleration = 0.35, difficulty = 50)
+        expected = step_one(car, dt, ground, throttle[i])
+        for name in ("x", "y", "z", "rotation_y", "pivot_rotation_y", "speed", "velocity_y", "drift_speed"):
+            assert math.isclose(getattr(batch, name)[i], expected[name], abs_tol = 1e-9), name
+
+def test_inactive_cars_stay_put():
+    batch = VehicleBatch(seed = 0)
+    batch.add((0, 1.4, 0), 0)
+    batch.add((5, 1.4, 0), 0)
+    batch.speed[:] = 10
+    batch.step(1 / 60, flat_ground(), active = np.array([True, False]))
+    assert batch.z[0] > 0
+    assert batch.z[1] == 0
+    assert batch.speed[1] == 10
@@ -0,0 +1,77 @@
+"""
+Tests for pushing cars out of the walls and sliding them along them (wall_field.py)
+"""
+import math
+import numpy as np
+
+from wall_field import WallField
+
+def box(x0, x1, z0, z1, y0 = 0, y1 = 5):
+    """
+    The triangles of a solid box wall
+    """
+    corners = {
+        (i, j, k): (x, y, z)
+        for i, x in enumerate((x0, x1)) for j, y in enumerate((y0, y1)) for k, z in enumerate((z0, z1))
+    }
+    faces = (
+        ((0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)),
+        ((0, 1, 0), (1, 1, 0), (1, 1, 1), (0, 1, 1)),
+        ((0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)),
+        ((0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)),
+        ((0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0)),
+        ((1, 0, 0), (1, 0, 1), (1, 1, 1), (1, 1, 0)),
+    )
+    triangles = []
+    for a, b, c, d in faces:
+        triangles += [(corners[a], corners[b], corners[c]), (corners[a], corners[c], corners[d])]
+    return triangles
+
+def wall_field():
+    """
+    A wall from x = 0 to 2, z = -20 to 20
+    """
+    return WallField.bake(box(0, 2, -20, 20))
+
+def between_walls_field():
+    """
+    A field that is inside a wall everywhere with no direction out, like a point exactly between two walls
+    """
+    distances = np.full((5, 5), -1, dtype = np.float32)
+    gradients = np.zeros((5, 5, 2), dtype = np.float32)
+    return WallField(-2, -2, 1, distances, gradients, 0, 5)
+
+def test_distance_outside_and_inside():
+    field = wall_field()
+    distance, grad_x, grad_z = field.distance(-3, 0)
+    assert math.isclose(distance, 3, abs_tol = 1e-3)
+    assert math.isclose(grad_x, -1, abs_tol = 1e-3)
+    distance, grad_x, grad_z = field.distance(0.5, 0)
+    assert distance < 0
+    assert grad_x < 0
+
+def test_driving_into_the_wall_is_pushed_out():
+    x, z = wall_field().move(-2, 1, 0, 1.5, 0, 1)
+    assert math.isclose(x, -1, abs_tol = 1e-3)
+    assert math.isclose(z, 0)
+
+def test_driving_at_the_wall_slides_along_it():
+    x, z = wall_field().move(-2, 1, 0, 1.5, 1.5, 1)
+    assert math.isclose(x, -1, abs_tol = 1e-3)
+    assert math.isclose(z, 1.5, abs_tol = 1e-3)
+
+def test_above_the_walls_drives_through():
+    assert wall_field().move(-2, 8, 0, 1.5, 0, 1) == (-0.5, 0)
+
+def test_between_two_walls_undoes_the_move():
+    assert between_walls_field().move(0, 1, 0, 0.5, 0.25, 1) == (0, 0)
+
+def test_move_many_matches_move():
+    for field in (wall_field(), between_walls_field()):
+        moves = [(-2, 1, 0, 1.5, 0), (-2, 1, 0, 1.5, 1.5), (-2, 8, 0, 1.5, 0), (-5, 1, 3, 1, -1), (4, 1, 2, -1.5, 0.5), (0, 1, 0, 0.5, 0.25)]
+        x, y, z, dx, dz = (np.array(values, dtype = np.float64) for values in zip(*moves))
+        end_x, end_z = field.move_many(x, y, z, dx, dz, 1)
+        for i, move in enumerate(moves):
+            expected_x, expected_z = field.move(*move, 1)
+            assert math.isclose(end_x[i], expected_x, abs_tol = 1e-5)
+            assert math.isclose(end_z[i], expected_z, abs_tol = 1e-5)
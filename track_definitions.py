@@ -0,0 +1,63 @@
+"""
+The tracks, read once from their spec files in tracks/ (tracks/<name>.json).
+
+A spec has everything that makes one track different from the others: its
+model, texture and transform, its boundaries, the checkpoints a lap goes
+through, its triggers and what they do (events), its details, where the
+player, the grid and reset AI start, where the maps menu shows it from
+(preview), how the AI drive it, its waypoints, particle texture, drift time
+and achievements. tracks/track.py builds a track from its spec. Doesn't use Ursina, so headless tools can look up tracks too.
+"""
+import os
+import json
+
+from objfile import GAME_FOLDER
+
+SPEC_FOLDER = os.path.join(GAME_FOLDER, "tracks")
+
+# In the order of the maps menu
+TRACK_NAMES = ("sand_track", "grass_track", "snow_track", "forest_track", "savannah_track", "lake_track")
+
+def load_track_spec(name):
+    """
+    Reads a track's spec file, filling in what parts leave out from the track's own transform
+    """
+    with open(os.path.join(SPEC_FOLDER, f"{name}.json"), "r") as spec_file:
+        spec = json.load(spec_file)
+
+    spec["name"] = name
+    spec["position"] = tuple(spec["position"])
+    for part in [spec["boundaries"]] + spec["details"]:
+        part["position"] = tuple(part.get("position", spec["position"]))
+        part.setdefault("rotation_y", spec["rotation_y"])
+        part["scale"] = tuple(part["scale"]) if isinstance(part.get("scale"), list) else part.get("scale", spec["scale"])
+    # Details are shown on fast graphics unless they say otherwise, and only trees are drawn as impostors far away
+    for detail in spec["details"]:
+        detail.setdefault("fast", True)
+        detail.setdefault("impostor", False)
+    for part in spec["triggers"]:
+        part["position"] = tuple(part["position"])
+        part.setdefault("rotation_y", 0)
+        part["scale"] = tuple(part["scale"])
+    for gate in spec["checkpoints"]:
+        gate["position"] = tuple(gate["position"])
+    # AI fixes happen near one of the waypoints
+    for fix in spec["ai"].setdefault("fixes", []):
+        fix["point"] = tuple(float(value) for value in spec["waypoints"][fix["waypoint"]][:3])
+    spec["ai"].setdefault("reset_triggers", [])
+    return spec
+
+TRACK_SPECS = {name: load_track_spec(name) for name in TRACK_NAMES}
+
+def track_spec(name):
+    return TRACK_SPECS[name]
+
+def track_part(name, part):
+    """
+    A trigger or checkpoint of a track by name
+    """
+    spec = TRACK_SPECS[name]
+    for box in spec["triggers"] + spec["checkpoints"]:
+        if box["name"] == part:
+            return box
+    raise KeyError(f"{name} has no part '{part}'")
@@ -0,0 +1,95 @@
+"""
+Loads the tracks when they're needed and lets go of them again.
+
+Every track is made at startup as an empty Entity (tracks/track.py) and
+builds its model, triggers and scenery the first time it's
+enabled. Hovering a track in the maps menu prefetches it: its model and
+texture files, heightfield, wall field and detail batches are read on a
+background thread,
+and the track is built and shown once they're in. Only the last few tracks
+shown stay loaded; older ones are unloaded when another track loads.
+"""
+from ursina import *
+from direct.stdpy import thread
+
+# How many tracks stay loaded, counting the one being shown
+KEEP_LOADED = 2
+
+class TrackLoader(Entity):
+    def __init__(self, tracks):
+        super().__init__()
+
+        self.tracks = tracks
+        for track in tracks:
+            track.loader = self
+
+        # Loaded tracks, the one shown longest ago first
+        self.recent = []
+
+        # Tracks whose files are being read, and the ones that have been read
+        self.fetching = set()
+        self.fetched = set()
+
+        # The track the maps menu is waiting for, and what to do once it's built
+        self.waiting = None
+
+    def load(self, track):
+        """
+        Builds a track if it isn't loaded, then unloads the tracks shown longest ago
+        """
+        self.waiting = None
+        track.load()
+        if track in self.recent:
+            self.recent.remove(track)
+        self.recent.append(track)
+
+        for old in self.recent[:-KEEP_LOADED]:
+            if not old.enabled:
+                old.unload()
+                self.recent.remove(old)
+                self.fetched.discard(old)
+
+    def prefetch(self, track):
+        """
+        Starts reading a track's files on a background thread
+        """
+        if track.loaded or track in self.fetching or track in self.fetched:
+            return
+        self.fetching.add(track)
+        try:
+            thread.start_new_thread(function = self.fetch, args = (track,))
+        except Exception as e:
+            print("error starting thread", e)
+            self.fetching.discard(track)
+
+    def fetch(self, track):
+        try:
+            for model in track.models:
+                load_model(model)
+            for texture in track.textures:
+                load_texture(texture)
+            track.heightfield.get()
+            track.walls.get()
+            track.detail_batches.get()
+        finally:
+            self.fetched.add(track)
+            self.fetching.discard(track)
+
+    def ready(self, track, then):
+        """
+        Whether a track is loaded. If it isn't, it's prefetched and then() is
+        called once it's built, unless another track is loaded before that
+        """
+        if track.loaded:
+            return True
+        self.prefetch(track)
+        self.waiting = (track, then)
+        return False
+
+    def update(self):
+        if self.waiting is None:
+            return
+        track, then = self.waiting
+        if track in self.fetched:
+            self.load(track)
+            then()
@@ -0,0 +1,186 @@
+from ursina import *
+from ursina.mesh_importer import imported_meshes
+from ursina.texture_importer import imported_textures
+from track_definitions import track_spec
+from heightfield import track_heightfield
+from wall_field import track_walls
+from racing_line import track_racing_line
+from detail_batch import track_details
+from scenery import Scenery
+
+# A track built from its spec (track_definitions.py, tracks/<name>.json), and
+# only while it's needed. The Entity is made at startup with just the track's
+# transform and state; build() makes the rest the first time the track is
+# enabled, and unload() throws it away again (track_loader.py decides when).
+class Track(Entity):
+    def __init__(self, car, name):
+        spec = track_spec(name)
+        super().__init__(
+            enabled = False,
+            position = spec["position"],
+            rotation = (0, spec["rotation_y"], 0),
+            scale = spec["scale"]
+        )
+
+        self.car = car
+        self.name = name
+        self.spec = spec
+        self.title = spec["title"]
+        self.heightfield = track_heightfield(name)
+        self.walls = track_walls(name)
+        self.racing_line = track_racing_line(name)
+        self.detail_batches = track_details(name)
+        self.loader = None
+        self.loaded = False
+
+        # The model and texture files build() uses, so they can be prefetched and released
+        # (the boundaries are read into the wall field and the detail models into the detail batches instead)
+        self.models = (spec["model"], )
+        self.textures = tuple(dict.fromkeys(part["texture"] for part in [spec] + spec["details"]))
+
+        # Where the player, the AI's grid and reset AI start
+        self.spawn_position = tuple(spec["spawn"]["position"])
+        self.spawn_rotation_y = spec["spawn"]["rotation_y"]
+        self.grid_position = tuple(spec["grid"]["position"])
+        self.grid_rotation_y = spec["grid"]["rotation_y"]
+        self.ai_reset_position = tuple(spec["ai"]["reset"]["position"])
+        self.ai_reset_rotation_y = spec["ai"]["reset"]["rotation_y"]
+        self.ai_reset_spread = spec["ai"]["reset"]["spread"]
+
+        # Where the car (and so the camera) waits while the track is shown in the maps menu
+        self.preview_position = tuple(spec["preview"]["position"])
+
+        # How the AI drive it
+        self.ai_difficulty = spec["ai"]["difficulty"]
+        self.ai_fixes = spec["ai"]["fixes"]
+        self.ai_reset_triggers = spec["ai"]["reset_triggers"]
+
+        self.particle_texture = spec["particle_texture"]
+        self.drift_time = spec["drift_time"]
+
+        # The gates a lap goes through in order, the finish line first (checkpoints.py)
+        self.checkpoints = spec["checkpoints"]
+
+        # Triggers by name, and what driving into each one does
+        self.parts = {}
+        self.trigger_events = {}
+        for event in spec["events"]:
+            self.trigger_events.setdefault(event["trigger"], []).append(event)
+
+        self.track = []
+        self.details = []
+
+        # Every detail in one node (scenery.py)
+        self.scenery = None
+
+        self.played = False
+        self.unlocked = spec.get("unlocked", False)
+
+    def on_enable(self):
+        # The track being driven on, so nothing has to look through every track to find it
+        self.car.current_track = self
+        if self.loader is not None:
+            self.loader.load(self)
+        else:
+            self.load()
+
+    def load(self):
+        """
+        Builds the track if it isn't built, with its triggers and details disabled
+        """
+        if self.loaded:
+            return
+        self.build()
+
+        for i in self.track:
+            i.disable()
+        self.hide_details()
+        self.loaded = True
+
+    def build(self):
+        """
+        Makes the track's model, triggers and details from its spec. Cars find the
+        ground and walls in the baked heightfield and wall field, so the track
+        and its boundaries get no mesh colliders.
+        """
+        spec = self.spec
+        self.model = spec["model"]
+        self.texture = spec["texture"]
+        self.track = []
+
+        for trigger in spec["triggers"]:
+            self.add_part(trigger, Entity(model = "cube", position = trigger["position"], rotation_y = trigger["rotation_y"], scale = trigger["scale"], visible = False))
+
+        # The details, merged into a mesh per texture or drawn as copies with simpler levels far away (detail_batch.py)
+        self.scenery = Scenery(self.detail_batches.get())
+        self.details = [self.scenery]
+
+    def show_details(self, graphics):
+        """
+        Shows the scenery the graphics setting allows: no grass unless it's fancy, and simpler levels nearer the slower it is
+        """
+        if self.scenery is None:
+            return
+        self.scenery.enable()
+        self.scenery.set_graphics(graphics)
+
+    def hide_details(self):
+        if self.scenery is not None:
+            self.scenery.disable()
+
+    def add_part(self, part, entity):
+        # Parts are attributes too (track.lake_bounds)
+        self.parts[part["name"]] = entity
+        setattr(self, part["name"], entity)
+        self.track.append(entity)
+
+    def trigger_entered(self, car, name):
+        """
+        A car drove into one of the triggers (trigger_manager.py). The player runs
+        the trigger's events; AI are put back when it's one they reset in.
+        """
+        if car is self.car:
+            for event in self.trigger_events.get(name, ()):
+                self.run_event(event)
+        elif name in self.ai_reset_triggers and car in self.car.ai_list:
+            car.reset()
+
+    def run_event(self, event):
+        """
+        Does what a spec event says. Laps are counted by the checkpoints (race_tracker.py).
+        """
+        if event.get("reset"):
+            self.car.reset_car()
+
+    def unload(self):
+        """
+        Destroys everything build() made and lets go of the track's files
+        """
+        if not self.loaded or self.enabled:
+            return
+        for entity in self.track + self.details:
+            release(entity)
+        self.track = []
+        self.details = []
+        self.scenery = None
+        self.parts = {}
+        self.model = None
+
+        for model in self.models:
+            imported_meshes.pop(model.split(".")[0], None)
+        for texture in self.textures:
+            imported_textures.pop(texture, None)
+        self.heightfield.release()
+        self.walls.release()
+        self.detail_batches.release()
+        self.loaded = False
+
+def release(entity):
+    """
+    Destroys an entity along with its mesh and collision solids
+    """
+    if entity.collider:
+        entity.collider.remove()
+        entity.collider = None
+    entity.model = None
+    destroy(entity)
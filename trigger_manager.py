@@ -0,0 +1,61 @@
+from ursina import *
+from trigger_volumes import TriggerVolumes
+import profiler
+
+# Tests every car on the active track against the track's triggers once a
+# frame: the player, the AI and the other players in multiplayer. The track
+# decides what entering a trigger does (Track.trigger_entered). Made after the
+# cars so it sees where they moved to this frame.
+class TriggerManager(Entity):
+    def __init__(self, car, race_tracker):
+        super().__init__()
+
+        self.car = car
+        self.race_tracker = race_tracker
+        self.volumes = TriggerVolumes()
+        self.track = None
+        self.cars = {}
+
+    def set_track(self, track):
+        """
+        Puts a track's triggers into the grid, replacing the last track's
+        """
+        self.track = track
+        self.volumes.clear()
+        if track is None:
+            return
+        for trigger in track.spec["triggers"]:
+            self.volumes.add(
+                trigger["name"], trigger["position"], trigger["scale"],
+                on_enter = self.callback(track.trigger_entered, trigger["name"])
+            )
+
+    def callback(self, function, name):
+        """
+        Calls function with the car and the trigger's name, unless the car has left the race
+        """
+        def call(key):
+            if key in self.cars:
+                function(self.cars[key], name)
+        return call
+
+    def update(self):
+        track = self.car.active_track()
+        if track is not self.track:
+            self.set_track(track)
+        if track is None:
+            return
+
+        profiler.section("triggers")
+        cars = self.race_tracker.racing_cars()
+        self.cars = {id(car): car for car in cars}
+        self.volumes.update(
+            [id(car) for car in cars],
+            [car.x for car in cars],
+            [car.y for car in cars],
+            [car.z for car in cars],
+            [car.scale_x for car in cars],
+            [car.scale_y / 2 for car in cars],
+            [car.scale_z for car in cars]
+        )
+        profiler.end()
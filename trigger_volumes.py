@@ -0,0 +1,108 @@
+"""
+Boxes on a track that fire callbacks when cars drive into and out of them,
+like the lake. Laps are counted by the checkpoints (checkpoints.py).
+
+The volumes go into a uniform grid on the ground plane once, when a track is
+set up. Each tick every car looks up the volumes in its cell, all the
+(car, volume) pairs are tested in one array operation, and the pairs that
+started or stopped touching since the last tick fire the enter and exit
+callbacks. The test is the axis aligned box test the cars used to do
+themselves: a car reaches scale_x to either side, scale_y / 2 up and down
+and scale_z in front and behind, whichever way it's facing.
+
+Doesn't use Ursina.
+"""
+import math
+import numpy as np
+
+CELL_SIZE = 32
+
+# Volumes are put into every cell within this of them, so a car only has to
+# look in the cell it's in. Has to be at least as far as a car reaches.
+MARGIN = 4
+
+class TriggerVolumes:
+    """
+    Trigger boxes in a grid, and which cars are touching which box
+    """
+    def __init__(self, cell_size = CELL_SIZE):
+        self.cell_size = cell_size
+        self.clear()
+
+    def clear(self):
+        """
+        Removes every volume
+        """
+        self.names = []
+        self.low = np.zeros((0, 3))
+        self.high = np.zeros((0, 3))
+        self.on_enter = []
+        self.on_exit = []
+        self.cells = {}
+
+        # (car, volume) pairs touching last tick, in the order they started touching
+        self.touching = {}
+
+    def add(self, name, position, scale, on_enter = None, on_exit = None):
+        """
+        Adds a box centred on position with size scale. on_enter and on_exit are
+        called with the car's key when a car starts and stops touching it.
+        """
+        half = np.abs(np.asarray(scale, dtype = np.float64)) / 2
+        position = np.asarray(position, dtype = np.float64)
+        index = len(self.names)
+        self.names.append(name)
+        self.low = np.vstack((self.low, position - half))
+        self.high = np.vstack((self.high, position + half))
+        self.on_enter.append(on_enter)
+        self.on_exit.append(on_exit)
+
+        size = self.cell_size
+        for cell_x in range(math.floor((position[0] - half[0] - MARGIN) / size), math.floor((position[0] + half[0] + MARGIN) / size) + 1):
+            for cell_z in range(math.floor((position[2] - half[2] - MARGIN) / size), math.floor((position[2] + half[2] + MARGIN) / size) + 1):
+                self.cells.setdefault((cell_x, cell_z), []).append(index)
+        return index
+
+    def update(self, keys, x, y, z, reach_x, reach_y, reach_z):
+        """
+        Tests the cars (one key and position per car) against the volumes, calls
+        the callbacks of the ones they entered and left, and returns the
+        (key, name) pairs that entered and the ones that exited
+        """
+        x = np.asarray(x, dtype = np.float64)
+        y = np.asarray(y, dtype = np.float64)
+        z = np.asarray(z, dtype = np.float64)
+
+        # Every car paired with the volumes in its cell
+        cars = []
+        volumes = []
+        cell_x = np.floor(x / self.cell_size).astype(np.int64).tolist()
+        cell_z = np.floor(z / self.cell_size).astype(np.int64).tolist()
+        for i, cell in enumerate(zip(cell_x, cell_z)):
+            found = self.cells.get(cell)
+            if found:
+                cars += [i] * len(found)
+                volumes += found
+
+        now = {}
+        if cars:
+            cars = np.array(cars)
+            volumes = np.array(volumes)
+            reach = np.stack((np.asarray(reach_x, dtype = np.float64), np.asarray(reach_y, dtype = np.float64), np.asarray(reach_z, dtype = np.float64)), axis = 1)[cars]
+            position = np.stack((x, y, z), axis = 1)[cars]
+            hit = ((position - reach <= self.high[volumes]) & (position + reach >= self.low[volumes])).all(axis = 1)
+            for i, volume in zip(cars[hit].tolist(), volumes[hit].tolist()):
+                now[(keys[i], volume)] = True
+
+        exited = [pair for pair in self.touching if pair not in now]
+        entered = [pair for pair in now if pair not in self.touching]
+        self.touching = dict.fromkeys([pair for pair in self.touching if pair in now] + entered, True)
+
+        for key, volume in exited:
+            if self.on_exit[volume] is not None:
+                self.on_exit[volume](key)
+        for key, volume in entered:
+            if self.on_enter[volume] is not None:
+                self.on_enter[volume](key)
+
+        return [(key, self.names[volume]) for key, volume in entered], [(key, self.names[volume]) for key, volume in exited]
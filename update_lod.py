@@ -0,0 +1,79 @@
+"""
+Update rates for the AI cars by distance from the camera.
+
+Cars near the camera are stepped every frame. Further away they are stepped
+every few frames with the time that built up in between, and cars behind the
+camera are stepped less often again. Cars in the same tier are spread over
+the frames by their index, so the work per frame stays even.
+
+Between steps a car is drawn where its speed and heading would have taken it
+since the last step, so far away cars still move smoothly. Doesn't use Ursina,
+the AI batch passes in the camera.
+"""
+import math
+import numpy as np
+
+# (up to this distance, frames between steps)
+LOD_TIERS = (
+    (60, 1),
+    (150, 2),
+    (math.inf, 4),
+)
+
+# Cars the camera can't see are stepped this many times less often
+OFFSCREEN_FACTOR = 2
+
+# Cars closer than this count as seen whichever way the camera looks
+ALWAYS_VISIBLE_DISTANCE = 20
+
+# Half of the view cone, wider than the camera's so cars at the edges don't pop
+VIEW_ANGLE = 70
+
+class UpdateScheduler:
+    """
+    Decides every frame which cars get stepped
+    """
+    def __init__(self, tiers = LOD_TIERS):
+        self.tier_distances = np.array([tier[0] for tier in tiers], dtype = np.float64)
+        self.tier_intervals = np.array([tier[1] for tier in tiers], dtype = np.int64)
+        self.view_cos = math.cos(math.radians(VIEW_ANGLE))
+        self.frame = 0
+        self.resize(0)
+
+    def resize(self, count):
+        self.elapsed = np.zeros(count)
+        self.step_dt = np.zeros(count)
+        self.due = np.zeros(count, dtype = bool)
+        self.visible = np.ones(count, dtype = bool)
+        self.interval = np.ones(count, dtype = np.int64)
+
+    def schedule(self, dt, x, y, z, camera_position, camera_forward, active, always = None):
+        """
+        Returns which cars are due a step this frame, counting every car in
+        always (airborne cars, which fall through the ground on long steps).
+        Their time since the last step is in step_dt afterwards.
+        """
+        count = len(x)
+        if len(self.elapsed) != count:
+            self.resize(count)
+        self.frame += 1
+
+        self.elapsed = np.where(active, self.elapsed + dt, 0)
+
+        # Distance and whether the car is in front of the camera
+        dx = x - camera_position[0]
+        dy = y - camera_position[1]
+        dz = z - camera_position[2]
+        distance = np.sqrt(dx * dx + dy * dy + dz * dz)
+        facing = dx * camera_forward[0] + dy * camera_forward[1] + dz * camera_forward[2]
+        self.visible = (facing >= self.view_cos * distance) | (distance < ALWAYS_VISIBLE_DISTANCE)
+
+        tier = np.minimum(np.searchsorted(self.tier_distances, distance), len(self.tier_intervals) - 1)
+        self.interval = np.where(self.visible, 1, OFFSCREEN_FACTOR) * self.tier_intervals[tier]
+
+        self.due = active & ((self.frame + np.arange(count)) % self.interval == 0)
+        if always is not None:
+            self.due |= active & always
+        self.step_dt = np.where(self.due, self.elapsed, 0)
+        self.elapsed = np.where(self.due, 0, self.elapsed)
+        return self.due
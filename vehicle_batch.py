@@ -0,0 +1,186 @@
+"""
+Vectorized dynamics for the AI cars.
+
+A VehicleBatch keeps the state of every AI car in NumPy arrays (one array per
+value, one slot per car) and advances all of them with a handful of array
+operations per frame, so adding cars doesn't add interpreted code per car.
+Nothing in here touches Ursina; the game copies positions and rotations back
+to the car Entities once per frame.
+
+step() asks the track about the ground and walls for all cars at once:
+
+    ground.ground_many(x, y, z) -> (distance, ground_y, normals)
+    ground.stop_at_slopes_many(x, y, z, new_x, new_z) -> (x, z)
+    walls.move_many(x, y, z, dx, dz, radius) -> (x, z)
+"""
+import numpy as np
+
+# name: (dtype, value for a new car)
+FIELDS = {
+    # Transform
+    "x": (np.float64, 0.0),
+    "y": (np.float64, 0.0),
+    "z": (np.float64, 0.0),
+    "rotation_y": (np.float64, 0.0),
+    "pivot_rotation_y": (np.float64, 0.0),
+    "scale_y": (np.float64, 1.0),
+    # Motion
+    "speed": (np.float64, 0.0),
+    "velocity_y": (np.float64, 0.0),
+    "drift_speed": (np.float64, 35.0),
+    # Handling
+    "topspeed": (np.float64, 30.0),
+    "acceleration": (np.float64, 0.35),
+    "difficulty": (np.float64, 50.0),
+    # Footprint and mass for car to car hits
+    "half_width": (np.float64, 1.3),
+    "half_length": (np.float64, 2.2),
+    "mass": (np.float64, 1.0),
+    # Where the car is steering to and how fast it should go there
+    "target_rotation_y": (np.float64, 0.0),
+    "target_speed": (np.float64, np.inf),
+    # Results of the last step
+    "accelerating": (bool, False),
+    "touching_ground": (bool, False),
+    "hitting_wall": (bool, False),
+    "ground_distance": (np.float64, np.inf),
+    "ground_y": (np.float64, 0.0),
+    "ground_normal": ((np.float64, 3), (0.0, 1.0, 0.0)),
+}
+
+# Degrees per second the AI turns towards its target
+TURN_SPEED = 80
+
+# Driving wheels need the ground this close
+THROTTLE_DISTANCE = 4
+
+# How quickly the AI brake down to their target speed
+BRAKING = 30
+
+# The AI have no turning speed and can't reverse, so a hit that spins a car or
+# sends it backwards turns or moves it this many seconds of that at once
+SPIN_TIME = 0.2
+
+class VehicleBatch:
+    """
+    Structure of arrays holding every AI car
+    """
+    def __init__(self, seed = None):
+        self.count = 0
+        self.random = np.random.default_rng(seed)
+        for name, (dtype, value) in FIELDS.items():
+            if isinstance(dtype, tuple):
+                setattr(self, name, np.zeros((0, dtype[1]), dtype = dtype[0]))
+            else:
+                setattr(self, name, np.zeros(0, dtype = dtype))
+
+    def add(self, position = (0, 0, 0), rotation_y = 0):
+        """
+        Adds a car and returns its index
+        """
+        index = self.count
+        for name, (dtype, value) in FIELDS.items():
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.array([value], dtype = array.dtype))))
+        self.count += 1
+        self.teleport(index, position, rotation_y)
+        return index
+
+    def teleport(self, index, position, rotation_y):
+        """
+        Puts a car somewhere else, lined up with its drift pivot
+        """
+        self.x[index], self.y[index], self.z[index] = position
+        self.rotation_y[index] = rotation_y
+        self.pivot_rotation_y[index] = rotation_y
+
+    def step(self, dt, ground, walls = None, active = None):
+        """
+        Advances the cars where active is True (all by default) by dt, which
+        can be one time for every car or an array with a time per car
+        """
+        if self.count == 0:
+            return
+        if active is None:
+            active = np.ones(self.count, dtype = bool)
+        if not active.any():
+            return
+
+        # Drifting: the pivot follows the car's rotation and turning costs speed
+        pivot_rotation_distance = self.rotation_y - self.pivot_rotation_y
+        catch_up = self.drift_speed * (np.abs(pivot_rotation_distance) / 40) * dt
+        self.pivot_rotation_y = np.where(active, self.pivot_rotation_y + np.sign(pivot_rotation_distance) * catch_up, self.pivot_rotation_y)
+        self.speed = np.where(active & (pivot_rotation_distance != 0), self.speed - np.abs(pivot_rotation_distance) / 4.5 * dt, self.speed)
+
+        # Ground
+        distance, ground_y, normal = ground.ground_many(self.x, self.y, self.z)
+        self.ground_distance = np.where(active, distance, self.ground_distance)
+        self.ground_y = np.where(active, ground_y, self.ground_y)
+        self.ground_normal = np.where(active[:, None], normal, self.ground_normal)
+
+        # Throttle, on half of the frames at random, and brakes when going faster than the target speed
+        over = self.speed > self.target_speed
+        self.accelerating = active & (self.ground_distance <= THROTTLE_DISTANCE) & (self.random.random(self.count) < 0.5) & ~over
+        self.speed = self.speed + np.where(self.accelerating, self.acceleration * self.difficulty * dt, 0)
+        braking = active & over & (self.ground_distance <= THROTTLE_DISTANCE)
+        self.speed = np.where(braking, np.maximum(self.speed - BRAKING * dt, self.target_speed), self.speed)
+
+        # Turn towards the target, without turning past it
+        turn = np.clip(self.target_rotation_y - self.rotation_y, -TURN_SPEED * dt, TURN_SPEED * dt)
+        self.rotation_y = np.where(active, self.rotation_y + turn, self.rotation_y)
+
+        # Cap the speed
+        self.speed = np.where(active, np.minimum(self.speed, self.topspeed), self.speed)
+        stopped = active & (self.speed <= 0.1)
+        self.speed = np.where(stopped, 0.1, self.speed)
+        self.pivot_rotation_y = np.where(stopped, self.rotation_y, self.pivot_rotation_y)
+
+        # Cap the drifting
+        self.drift_speed = np.where(active, np.clip(self.drift_speed, 20, 40), self.drift_speed)
+
+        # Gravity
+        movement_y = self.velocity_y * dt
+        contact = active & (self.ground_distance <= self.scale_y * 1.7 + np.abs(movement_y))
+        flat = contact & (self.ground_normal[:, 1] > 0.7) & (self.ground_y - self.y < 0.5)
+        falling = active & ~contact
+        self.velocity_y = np.where(contact, 0, np.where(falling, self.velocity_y - 50 * dt, self.velocity_y))
+        self.y = np.where(flat, self.ground_y + 1.4, np.where(falling, self.y + movement_y * 50 * dt, self.y))
+        self.touching_ground = np.where(active, contact, self.touching_ground)
+        self.hitting_wall = np.where(contact, ~flat, self.hitting_wall)
+
+        # Movement along the pivot's forward direction
+        heading = np.radians(self.pivot_rotation_y)
+        movement_x = np.where(active, np.sin(heading) * self.speed * dt, 0)
+        movement_z = np.where(active, np.cos(heading) * self.speed * dt, 0)
+        if walls is not None:
+            x, z = walls.move_many(self.x, self.y, self.z, movement_x, movement_z, 0.5)
+        else:
+            x, z = self.x + movement_x, self.z + movement_z
+        x, z = ground.stop_at_slopes_many(self.x, self.y, self.z, x, z)
+        self.x = np.where(active, x, self.x)
+        self.z = np.where(active, z, self.z)
+
+    def extrapolate(self, elapsed):
+        """
+        Where the cars would be after driving on for elapsed seconds, as (x, z)
+        """
+        heading = np.radians(self.pivot_rotation_y)
+        return self.x + np.sin(heading) * self.speed * elapsed, self.z + np.cos(heading) * self.speed * elapsed
+
+    def bump(self, index, push_x, push_z, speed, spin, walls = None):
+        """
+        Applies car to car hits to the cars at index: pushes them apart (but
+        not through walls), sets their speed and turns them by their spin
+        """
+        # A hit can't make the AI reverse, so one that would moves them back at once instead
+        back = np.minimum(speed, 0) * SPIN_TIME
+        heading = np.radians(self.pivot_rotation_y[index])
+        push_x = push_x + np.sin(heading) * back
+        push_z = push_z + np.cos(heading) * back
+        if walls is not None:
+            self.x[index], self.z[index] = walls.move_many(self.x[index], self.y[index], self.z[index], push_x, push_z, 0.5)
+        else:
+            self.x[index] += push_x
+            self.z[index] += push_z
+        self.speed[index] = speed
+        self.rotation_y[index] += spin * SPIN_TIME
@@ -0,0 +1,331 @@
+"""
+Baked wall distances for the tracks.
+
+The invisible *_track_bounds.obj meshes are solid walls standing around and
+inside the track. Seen from above their footprint is baked into a 2D signed
+distance field: positive in the open, negative inside a wall, with a gradient
+pointing away from the nearest wall. Keeping a car out of the walls is then a
+lookup and a push along the gradient, which leaves the part of the movement
+along the wall, so cars slide instead of stopping dead.
+
+Fields are cached in cache/walls next to the heightfields. To bake every track
+ahead of time run:
+
+    python wall_field.py
+"""
+import os
+import math
+import numpy as np
+
+from objfile import GAME_FOLDER, load_obj, transform_points, source_stamp, save_cache, load_cache, BakedCache
+from track_definitions import TRACK_SPECS
+
+CACHE_FOLDER = os.path.join(GAME_FOLDER, "cache", "walls")
+
+# Bump when the bake changes so old caches are rebuilt
+VERSION = 1
+
+CELL_SIZE = 0.5
+
+# Open space kept around the walls so distances are right just outside them
+MARGIN = 8.0
+
+# Push out iterations per move (corners need more than one)
+ITERATIONS = 3
+
+class WallField:
+    """
+    A grid of signed distances to the walls and their gradients
+
+    distances: (rows, columns) float32
+    gradients: (rows, columns, 2) float32, (x, z) of the direction away from the walls
+    Node (row, column) is at x = origin_x + column * cell_size, z = origin_z + row * cell_size
+    The walls only exist between y_min and y_max.
+    """
+    def __init__(self, origin_x, origin_z, cell_size, distances, gradients, y_min, y_max):
+        self.origin_x = float(origin_x)
+        self.origin_z = float(origin_z)
+        self.cell_size = float(cell_size)
+        self.distances = distances
+        self.gradients = gradients
+        self.y_min = float(y_min)
+        self.y_max = float(y_max)
+        self.rows = distances.shape[0]
+        self.columns = distances.shape[1]
+        self.outside = float(distances.max())
+
+    @classmethod
+    def bake(cls, triangles, cell_size = CELL_SIZE, margin = MARGIN):
+        """
+        Builds the field from the world space triangles ((m, 3, 3) array) of solid walls
+        """
+        triangles = np.asarray(triangles, dtype = np.float64)
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        lengths = np.linalg.norm(normals, axis = 1)
+        keep = lengths > 1e-9
+        triangles = triangles[keep]
+        normals = normals[keep] / lengths[keep, None]
+
+        # The tops and bottoms of the walls are their footprint,
+        # the sides are the edges of it
+        caps = triangles[np.abs(normals[:, 1]) > 0.5]
+        sides = triangles[np.abs(normals[:, 1]) <= 0.5]
+
+        # Every side projects onto the ground as a line, its longest edge seen from above
+        edges = np.stack((
+            sides[:, (0, 1)], sides[:, (1, 2)], sides[:, (2, 0)]
+        ), axis = 1)[..., (0, 2)]
+        edge_lengths = np.linalg.norm(edges[:, :, 1] - edges[:, :, 0], axis = -1)
+        segments = edges[np.arange(len(edges)), np.argmax(edge_lengths, axis = 1)]
+        segments = segments[np.linalg.norm(segments[:, 1] - segments[:, 0], axis = -1) > 1e-6]
+        # Both triangles of a side give the same line, keep one
+        swap = (segments[:, 0, 0] > segments[:, 1, 0]) | ((segments[:, 0, 0] == segments[:, 1, 0]) & (segments[:, 0, 1] > segments[:, 1, 1]))
+        segments[swap] = segments[swap][:, ::-1]
+        segments = np.unique(np.round(segments.reshape(-1, 4), 6), axis = 0).reshape(-1, 2, 2)
+
+        low = triangles.reshape(-1, 3).min(axis = 0)
+        high = triangles.reshape(-1, 3).max(axis = 0)
+        origin_x = np.floor((low[0] - margin) / cell_size) * cell_size
+        origin_z = np.floor((low[2] - margin) / cell_size) * cell_size
+        columns = int(np.ceil((high[0] + margin - origin_x) / cell_size)) + 1
+        rows = int(np.ceil((high[2] + margin - origin_z) / cell_size)) + 1
+
+        x = origin_x + np.arange(columns) * cell_size
+        z = origin_z + np.arange(rows) * cell_size
+        points = np.stack(np.meshgrid(x, z), axis = -1).reshape(-1, 2)
+
+        # Grid nodes covered by the footprint, testing only the nodes around each cap
+        inside = np.zeros((rows, columns), dtype = bool)
+        for corners in caps[..., (0, 2)]:
+            first_column, first_row = np.ceil((corners.min(axis = 0) - (origin_x, origin_z)) / cell_size).astype(int)
+            last_column, last_row = np.floor((corners.max(axis = 0) - (origin_x, origin_z)) / cell_size).astype(int)
+            if last_column < first_column or last_row < first_row:
+                continue
+            block = points.reshape(rows, columns, 2)[first_row:last_row + 1, first_column:last_column + 1]
+            inside[first_row:last_row + 1, first_column:last_column + 1] |= _in_triangle(block.reshape(-1, 2), *corners).reshape(block.shape[:2])
+        inside = inside.ravel()
+
+        # Distance and direction to the nearest edge, a block of points at a time
+        distances = np.empty(len(points))
+        directions = np.empty((len(points), 2))
+        start_x = segments[:, 0, 0]
+        start_z = segments[:, 0, 1]
+        delta_x = segments[:, 1, 0] - start_x
+        delta_z = segments[:, 1, 1] - start_z
+        squared = np.maximum(delta_x * delta_x + delta_z * delta_z, 1e-12)
+        block = max(1, 2 ** 21 // max(len(segments), 1))
+        for first in range(0, len(points), block):
+            px = points[first:first + block, 0, None] - start_x
+            pz = points[first:first + block, 1, None] - start_z
+            t = np.clip((px * delta_x + pz * delta_z) / squared, 0, 1)
+            px -= t * delta_x
+            pz -= t * delta_z
+            nearest = np.argmin(px * px + pz * pz, axis = 1)
+            index = np.arange(len(nearest))
+            offset_x = px[index, nearest]
+            offset_z = pz[index, nearest]
+            distances[first:first + block] = np.sqrt(offset_x * offset_x + offset_z * offset_z)
+            directions[first:first + block, 0] = offset_x
+            directions[first:first + block, 1] = offset_z
+
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            directions /= distances[:, None]
+        directions[~np.isfinite(directions)] = 0
+        distances[inside] *= -1
+        directions[inside] *= -1
+
+        return cls(
+            origin_x, origin_z, cell_size,
+            distances.reshape(rows, columns).astype(np.float32),
+            directions.reshape(rows, columns, 2).astype(np.float32),
+            low[1], high[1]
+        )
+
+    def distance(self, x, z):
+        """
+        The signed distance to the nearest wall and the gradient (x, z) at a point
+        """
+        gx = (x - self.origin_x) / self.cell_size
+        gz = (z - self.origin_z) / self.cell_size
+        column = int(gx // 1)
+        row = int(gz // 1)
+        if column < 0 or row < 0 or column >= self.columns - 1 or row >= self.rows - 1:
+            return self.outside, 0.0, 0.0
+        fx = gx - column
+        fz = gz - row
+
+        d = self.distances[row:row + 2, column:column + 2]
+        g = self.gradients[row:row + 2, column:column + 2]
+        w00 = (1 - fx) * (1 - fz)
+        w01 = fx * (1 - fz)
+        w10 = (1 - fx) * fz
+        w11 = fx * fz
+        distance = d[0, 0] * w00 + d[0, 1] * w01 + d[1, 0] * w10 + d[1, 1] * w11
+        grad_x = g[0, 0, 0] * w00 + g[0, 1, 0] * w01 + g[1, 0, 0] * w10 + g[1, 1, 0] * w11
+        grad_z = g[0, 0, 1] * w00 + g[0, 1, 1] * w01 + g[1, 0, 1] * w10 + g[1, 1, 1] * w11
+        return float(distance), float(grad_x), float(grad_z)
+
+    def distance_many(self, x, z):
+        """
+        distance() for arrays of points, returns (distances, gradients)
+        """
+        x = np.asarray(x, dtype = np.float64)
+        z = np.asarray(z, dtype = np.float64)
+        gx = (x - self.origin_x) / self.cell_size
+        gz = (z - self.origin_z) / self.cell_size
+        column = np.floor(gx).astype(np.int64)
+        row = np.floor(gz).astype(np.int64)
+        outside = (column < 0) | (row < 0) | (column >= self.columns - 1) | (row >= self.rows - 1)
+        column = np.clip(column, 0, self.columns - 2)
+        row = np.clip(row, 0, self.rows - 2)
+        fx = np.clip(gx - column, 0, 1)
+        fz = np.clip(gz - row, 0, 1)
+
+        distance = np.zeros_like(x)
+        gradient = np.zeros(x.shape + (2, ))
+        for row_offset, column_offset, weight in (
+            (0, 0, (1 - fx) * (1 - fz)),
+            (0, 1, fx * (1 - fz)),
+            (1, 0, (1 - fx) * fz),
+            (1, 1, fx * fz),
+        ):
+            distance += self.distances[row + row_offset, column + column_offset] * weight
+            gradient += self.gradients[row + row_offset, column + column_offset] * weight[..., None]
+
+        distance = np.where(outside, self.outside, distance)
+        gradient[outside] = 0
+        return distance, gradient
+
+    def move(self, x, y, z, dx, dz, radius):
+        """
+        Moves a circle by (dx, dz) and pushes it back out of the walls, sliding along them
+        """
+        x += dx
+        z += dz
+        if y < self.y_min or y > self.y_max:
+            return x, z
+        for i in range(ITERATIONS):
+            distance, grad_x, grad_z = self.distance(x, z)
+            if distance >= radius:
+                break
+            length = math.sqrt(grad_x * grad_x + grad_z * grad_z)
+            if length < 1e-6:
+                # Exactly between two walls, undo the move
+                return x - dx, z - dz
+            push = (radius - distance) / length
+            x += grad_x / length * push
+            z += grad_z / length * push
+        return x, z
+
+    def move_many(self, x, y, z, dx, dz, radius):
+        """
+        move() for arrays of cars, returns the new (x, z) arrays
+        """
+        x = np.asarray(x, dtype = np.float64) + dx
+        z = np.asarray(z, dtype = np.float64) + dz
+        y = np.asarray(y, dtype = np.float64)
+        active = (y >= self.y_min) & (y <= self.y_max)
+        for i in range(ITERATIONS):
+            distance, gradient = self.distance_many(x, z)
+            length = np.linalg.norm(gradient, axis = -1)
+            inside = active & (distance < radius)
+            # Exactly between two walls, undo the move like move() does
+            between = inside & (length < 1e-6)
+            if between.any():
+                x = np.where(between, x - dx, x)
+                z = np.where(between, z - dz, z)
+                active = active & ~between
+                inside &= ~between
+            push = np.where(inside, (radius - distance) / np.maximum(length, 1e-6), 0)
+            if not push.any():
+                break
+            x = x + gradient[..., 0] / np.maximum(length, 1e-6) * push
+            z = z + gradient[..., 1] / np.maximum(length, 1e-6) * push
+        return x, z
+
+    def save(self, path, key = ""):
+        save_cache(
+            path, key,
+            grid = np.array((self.origin_x, self.origin_z, self.cell_size, self.y_min, self.y_max)),
+            distances = self.distances,
+            gradients = self.gradients.astype(np.float16)
+        )
+
+    @classmethod
+    def load(cls, path, key = None):
+        """
+        Loads a saved field, or returns None if it's missing or was baked from something else
+        """
+        def read(data):
+            origin_x, origin_z, cell_size, y_min, y_max = data["grid"]
+            return cls(origin_x, origin_z, cell_size, data["distances"], data["gradients"].astype(np.float32), y_min, y_max)
+        return load_cache(path, read, key)
+
+def _in_triangle(points, a, b, c):
+    """
+    Which 2D points are inside the triangle abc
+    """
+    area = (b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])
+    if abs(area) < 1e-12:
+        return np.zeros(len(points), dtype = bool)
+    x = points[:, 0]
+    z = points[:, 1]
+    u = ((b[0] - x) * (c[1] - z) - (c[0] - x) * (b[1] - z)) / area
+    v = ((c[0] - x) * (a[1] - z) - (a[0] - x) * (c[1] - z)) / area
+    return (u >= 0) & (v >= 0) & (u + v <= 1)
+
+class TrackWalls(BakedCache):
+    """
+    The wall field of one track's bounds model, baked or loaded from the cache the first time it's needed
+    """
+    description = "wall field"
+
+    def __init__(self, model, position = (0, 0, 0), rotation_y = 0, scale = 1, cell_size = CELL_SIZE):
+        super().__init__(os.path.join(CACHE_FOLDER, os.path.splitext(model)[0] + ".npz"))
+        self.model = model
+        self.position = position
+        self.rotation_y = rotation_y
+        self.scale = scale
+        self.cell_size = cell_size
+
+    def key(self):
+        return f"{VERSION}|{source_stamp(self.model)}|{self.position}|{self.rotation_y}|{self.scale}|{self.cell_size}"
+
+    def bake(self):
+        mesh = load_obj(self.model)
+        points = transform_points(mesh.vertices, self.position, self.rotation_y, self.scale)
+        return WallField.bake(points[mesh.triangles], self.cell_size)
+
+    def load(self, key):
+        return WallField.load(self.path, key)
+
+    def save(self, field, key):
+        field.save(self.path, key)
+
+    def distance(self, x, z):
+        return self.get().distance(x, z)
+
+    def move(self, x, y, z, dx, dz, radius):
+        return self.get().move(x, y, z, dx, dz, radius)
+
+    def move_many(self, x, y, z, dx, dz, radius):
+        return self.get().move_many(x, y, z, dx, dz, radius)
+
+# From the track specs, so they match the boundaries models
+TRACK_WALLS = {
+    name: TrackWalls(spec["boundaries"]["model"], position = spec["boundaries"]["position"], rotation_y = spec["boundaries"]["rotation_y"], scale = spec["boundaries"]["scale"])
+    for name, spec in TRACK_SPECS.items()
+}
+
+def track_walls(name):
+    return TRACK_WALLS[name]
+
+if __name__ == "__main__":
+    import time
+
+    for name, walls in TRACK_WALLS.items():
+        if os.path.isfile(walls.path):
+            os.remove(walls.path)
+        start = time.perf_counter()
+        field = walls.get()
+        print(f"{name}: {field.columns}x{field.rows} nodes in {time.perf_counter() - start:.2f}s")
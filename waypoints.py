@@ -0,0 +1,14 @@
+"""
+The AI's path points of every track, stored once and shared by every AI.
+
+Each row is x, y, z and the rotation_y the point was placed with, in driving
+order, from the track specs. The racing lines are built from these (see
+racing_line.py).
+"""
+import numpy as np
+
+from track_definitions import TRACK_SPECS
+
+TRACK_WAYPOINTS = {
+    name: np.array(spec["waypoints"], dtype = np.float64) for name, spec in TRACK_SPECS.items()
+}